@@ -1,12 +1,19 @@
 # PuffinPyEditor/app_core/completion_manager.py
 import os
 import sys
+import json
+import time
+import threading
 import shutil
 import html
-from typing import Any, Optional, TYPE_CHECKING
-from PyQt6.QtCore import QObject, QThread, pyqtSignal
+from collections import OrderedDict, deque
+from itertools import count
+from statistics import median
+from typing import Any, Deque, Dict, List, Optional, Tuple, TYPE_CHECKING
+from PyQt6.QtCore import QObject, QThread, QProcess, pyqtSignal
 import jedi
 from .settings_manager import settings_manager
+from .jedi_server import JediServer
 from utils.logger import log
 
 # Use this for type hinting to avoid circular dependencies if they ever arise
@@ -72,17 +79,42 @@ def find_python_interpreter_for_jedi() -> str:
     return ""
 
 
+class LatestRequests:
+    """
+    The newest pending request per operation for the in-process JediWorker.
+    Older requests are simply overwritten, so a burst of keystrokes leaves
+    the worker one job instead of a backlog. Shared across threads.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending: Dict[str, dict] = {}
+        self._newest_id: Dict[str, int] = {}
+
+    def put(self, request: dict):
+        with self._lock:
+            self._pending[request['op']] = request
+            self._newest_id[request['op']] = request['id']
+
+    def take(self, op: str) -> Optional[dict]:
+        with self._lock:
+            return self._pending.pop(op, None)
+
+    def has_newer(self, op: str, request_id: int) -> bool:
+        return self._newest_id.get(op, request_id) != request_id
+
+
 class JediWorker(QObject):
     """
-    Worker that runs Jedi operations in a separate thread.
+    Worker that runs Jedi operations in a separate thread. It answers the
+    same requests as jedi_server.py, with the same JediServer handlers.
     """
-    completions_ready = pyqtSignal(list)
-    definition_ready = pyqtSignal(str, int, int)
-    signature_ready = pyqtSignal(object)
+    result_ready = pyqtSignal(str, int, object, float)  # op, request id, result, milliseconds in Jedi
 
-    def __init__(self):
+    def __init__(self, requests: LatestRequests):
         super().__init__()
         self.project: Optional[jedi.Project] = None
+        self.server: Optional[JediServer] = None
+        self.requests = requests
 
     def set_project(self, project_path: str):
         """Initializes the Jedi project environment."""
@@ -93,7 +125,7 @@ class JediWorker(QObject):
                     "JediWorker could not be initialized: No valid "
                     "Python interpreter found."
                 )
-                self.project = None
+                self.project = self.server = None
                 return
 
             if project_path and os.path.isdir(project_path):
@@ -116,134 +148,437 @@ class JediWorker(QObject):
                     f"interpreter: {python_executable}"
                 )
 
+            self.server = JediServer(jedi, self.project)
+
         except Exception as e:
             log.error(f"Failed to initialize Jedi project: {e}", exc_info=True)
-            self.project = None
+            self.project = self.server = None
 
-    def get_completions(self, source: str, line: int, col: int, filepath: str):
-        """Generates code completions."""
-        if not self.project:
-            self.completions_ready.emit([])
+    def process_latest(self, op: str):
+        """Runs the newest pending request for op, if an earlier wake-up has not already taken it."""
+        if (request := self.requests.take(op)) is None:
             return
-        try:
-            script = jedi.Script(
-                code=source, path=filepath, project=self.project
-            )
-            completions = script.complete(line=line, column=col)
-            completion_data = [{
-                'name': c.name,
-                'type': c.type,
-                'description': c.description,
-                'docstring': c.docstring(raw=True)
-            } for c in completions]
-            self.completions_ready.emit(completion_data)
-        except Exception as e:
-            log.error(f"Error getting Jedi completions: {e}", exc_info=False)
-            self.completions_ready.emit([])
+        if not self.server:
+            self.result_ready.emit(op, request['id'], None, 0.0)
+            return
+        reply = self.server.handle(request, lambda: self.requests.has_newer(op, request['id']))
+        if reply.get('cancelled'):
+            return
+        if reply['error']:
+            log.error(f"Error during Jedi '{op}': {reply['error']}", exc_info=False)
+        self.result_ready.emit(op, request['id'], reply['result'], reply['elapsed_ms'])
 
-    def get_definition(self, source: str, line: int, col: int, filepath: str):
-        """Finds the definition of a symbol."""
-        if not self.project:
-            self.definition_ready.emit(None, -1, -1)
+
+SERVER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "jedi_server.py")
+
+
+class JediServerProcess(QObject):
+    """
+    One jedi_server.py child process for a project and role. Requests are
+    written as soon as they arrive. The server itself drops or stops the
+    ones a newer request of the same operation supersedes. Until the server
+    reports ready, only the newest request per operation is kept.
+    """
+    reply_received = pyqtSignal(dict, dict)  # request, reply
+    died = pyqtSignal(object, list)  # this process, requests that got no reply
+
+    def __init__(self, project_path: str, role: str, parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self.project_path, self.role = project_path, role
+        self.ready = False
+        self._dead = False
+        self._buffer = b""
+        self._in_flight: Dict[int, dict] = {}
+        self._waiting: Dict[str, dict] = {}
+        self.process = QProcess(self)
+        self.process.readyReadStandardOutput.connect(self._read_stdout)
+        self.process.readyReadStandardError.connect(self._read_stderr)
+        self.process.finished.connect(self._on_finished)
+        self.process.errorOccurred.connect(self._on_error)
+
+    def start(self):
+        self.process.start(sys.executable, ["-u", SERVER_SCRIPT, self.project_path,
+                                            find_python_interpreter_for_jedi()])
+        log.info(f"Started Jedi server ({self.role}) for project: {self.project_path or '<none>'}")
+
+    def submit(self, request: dict):
+        if self.ready:
+            self._write(request)
+        else:
+            self._waiting.pop(request['op'], None)
+            self._waiting[request['op']] = request
+
+    def _write(self, request: dict):
+        self._in_flight[request['id']] = request
+        self.process.write((json.dumps(request) + "\n").encode('utf-8'))
+
+    def _read_stdout(self):
+        self._buffer += bytes(self.process.readAllStandardOutput())
+        *lines, self._buffer = self._buffer.split(b"\n")
+        for line in lines:
+            try:
+                reply = json.loads(line)
+            except ValueError:
+                log.warning(f"Jedi server sent an unreadable line: {line[:200]!r}")
+                continue
+            if reply.get('ready'):
+                self.ready = True
+                waiting, self._waiting = self._waiting, {}
+                for request in waiting.values():
+                    self._write(request)
+            elif (request := self._in_flight.pop(reply.get('id'), None)) is not None:
+                self.reply_received.emit(request, reply)
+
+    def _read_stderr(self):
+        if text := bytes(self.process.readAllStandardError()).decode('utf-8', errors='replace').strip():
+            log.warning(f"Jedi server ({self.role}): {text}")
+
+    def _on_error(self, error: QProcess.ProcessError):
+        if error == QProcess.ProcessError.FailedToStart:
+            log.error(f"Jedi server ({self.role}) failed to start: {self.process.errorString()}")
+            self._on_finished()
+
+    def _on_finished(self, *_):
+        if self._dead:
             return
-        try:
-            script = jedi.Script(
-                code=source, path=filepath, project=self.project
-            )
-            definitions = script.goto(line=line, column=col)
-            if definitions:
-                d = definitions[0]
-                log.info(
-                    f"Jedi found definition for '{d.name}' at "
-                    f"{d.module_path}:{d.line}:{d.column}"
-                )
-                self.definition_ready.emit(
-                    str(d.module_path), d.line, d.column
-                )
-            else:
-                log.info("Jedi could not find a definition.")
-                self.definition_ready.emit(None, -1, -1)
-        except Exception as e:
-            log.error(f"Error getting Jedi definition: {e}", exc_info=False)
-            self.definition_ready.emit(None, -1, -1)
+        self._dead = True
+        orphaned = list(self._in_flight.values()) + list(self._waiting.values())
+        self._in_flight, self._waiting = {}, {}
+        self.died.emit(self, orphaned)
 
-    def get_signature(self, source: str, line: int, col: int, filepath: str):
-        """Gets signature information for a function call."""
-        if not self.project:
-            self.signature_ready.emit(None)
+    def stop(self):
+        self._dead = True
+        if self.process.state() != QProcess.ProcessState.NotRunning:
+            self.process.closeWriteChannel()  # The server exits when stdin closes
+            if not self.process.waitForFinished(1000):
+                self.process.kill()
+                self.process.waitForFinished(500)
+
+
+class JediServerPool(QObject):
+    """
+    Keeps long-lived Jedi server processes for the MAX_PROJECTS most recently
+    used projects. Each project gets two: one for completions and one for
+    lookups (definitions and signatures), so a slow goto never delays typing.
+    A process that dies is restarted on the next request, unless it crashed
+    MAX_CRASHES times within CRASH_WINDOW_SECONDS, which marks the pool broken.
+    """
+    result_ready = pyqtSignal(str, int, object, float)  # op, request id, result, milliseconds in Jedi
+    ROLE_FOR_OP = {'complete': 'completion', 'docstring': 'completion', 'goto': 'lookup', 'signatures': 'lookup'}
+    MAX_PROJECTS = 3
+    MAX_CRASHES = 3
+    CRASH_WINDOW_SECONDS = 60.0
+
+    def __init__(self, parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self.project_path = ""
+        self.processes: "OrderedDict[Tuple[str, str], JediServerProcess]" = OrderedDict()
+        self._crash_times: Deque[float] = deque(maxlen=self.MAX_CRASHES)
+
+    @staticmethod
+    def is_supported() -> bool:
+        # A frozen build has no interpreter to run the server script with.
+        return not getattr(sys, 'frozen', False) and os.path.exists(SERVER_SCRIPT)
+
+    @property
+    def is_broken(self) -> bool:
+        return (len(self._crash_times) == self.MAX_CRASHES
+                and time.monotonic() - self._crash_times[0] < self.CRASH_WINDOW_SECONDS)
+
+    def set_project(self, project_path: str):
+        """Switches to a project and starts its completion server so it is warm before the first request."""
+        self.project_path = project_path or ""
+        key = (self.project_path, self.ROLE_FOR_OP['complete'])
+        if self.is_supported() and not self.is_broken and key not in self.processes:
+            self._spawn(key)
+
+    def submit(self, request: dict) -> bool:
+        """Queues a request. Returns False when the caller should fall back to in-process Jedi."""
+        if not self.is_supported() or self.is_broken:
+            return False
+        key = (self.project_path, self.ROLE_FOR_OP[request['op']])
+        if (server := self.processes.get(key)) is None:
+            server = self._spawn(key)
+        self.processes.move_to_end(key)
+        server.submit(request)
+        return True
+
+    def _spawn(self, key: Tuple[str, str]) -> JediServerProcess:
+        server = JediServerProcess(*key, parent=self)
+        server.reply_received.connect(self._on_reply)
+        server.died.connect(self._on_died)
+        self.processes[key] = server
+        # Retire the least recently used project's processes beyond the limit.
+        projects = list(dict.fromkeys(project for project, _role in reversed(self.processes)))
+        for (project, role), stale in list(self.processes.items()):
+            if project not in projects[:self.MAX_PROJECTS]:
+                del self.processes[(project, role)]
+                stale.stop()
+                stale.deleteLater()
+        server.start()
+        return server
+
+    def _on_reply(self, request: dict, reply: dict):
+        if reply.get('cancelled'):
+            return  # Superseded by a newer request, which will answer instead
+        if error := reply.get('error'):
+            log.error(f"Jedi server error during '{request['op']}': {error}")
+        self.result_ready.emit(request['op'], request['id'], reply.get('result'), reply.get('elapsed_ms', 0.0))
+
+    def _on_died(self, server: JediServerProcess, orphaned: List[dict]):
+        key = (server.project_path, server.role)
+        if self.processes.get(key) is server:
+            del self.processes[key]
+        self._crash_times.append(time.monotonic())
+        log.warning(f"Jedi server ({server.role}) for {server.project_path or '<none>'} exited; "
+                    f"it will be restarted on the next request.")
+        if self.is_broken:
+            log.error("Jedi servers keep crashing; using in-process completion for now.")
+        server.deleteLater()
+        for request in orphaned:
+            self.result_ready.emit(request['op'], request['id'], None, 0.0)
+
+    def shutdown(self):
+        for server in self.processes.values():
+            server.stop()
+        self.processes.clear()
+
+
+class LatencyStats:
+    """
+    Latency samples per operation for get_latency_stats(): from the request
+    (typically a keystroke) to its result being emitted, and the part of
+    that spent inside Jedi. Also counts requests dropped as superseded.
+    """
+    MAX_SAMPLES = 200
+
+    def __init__(self):
+        self._samples: Dict[str, Deque[Tuple[float, float]]] = {}
+        self._superseded: Dict[str, int] = {}
+
+    def record(self, op: str, round_trip_ms: float, server_ms: float):
+        self._samples.setdefault(op, deque(maxlen=self.MAX_SAMPLES)).append((round_trip_ms, server_ms))
+
+    def record_superseded(self, op: str):
+        self._superseded[op] = self._superseded.get(op, 0) + 1
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        result = {}
+        for op, samples in self._samples.items():
+            round_trips = sorted(sample[0] for sample in samples)
+            result[op] = {
+                'count': len(round_trips),
+                'p50_ms': round(median(round_trips), 2),
+                'p95_ms': round(round_trips[min(len(round_trips) - 1, int(len(round_trips) * 0.95))], 2),
+                'max_ms': round(round_trips[-1], 2),
+                'server_p50_ms': round(median(sample[1] for sample in samples), 2),
+                'superseded': self._superseded.get(op, 0),
+            }
+        return result
+
+
+class CompletionCache:
+    """
+    The last completion list Jedi produced, with the document around it.
+    While the user keeps typing the identifier it was made for, later
+    requests are answered by narrowing that list, without asking Jedi. Any
+    other edit, or moving to another line or file, is a miss. Docstrings of
+    its items are resolved one at a time and kept here.
+    """
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.request: Optional[dict] = None
+        self.docstrings: Dict[str, str] = {}
+        self._completions: List[dict] = []
+        self._head = self._prefix = self._tail = ""
+        self._prefix_col = 0
+
+    @staticmethod
+    def _offset_of(source: str, line: int, col: int) -> int:
+        offset = 0
+        for _ in range(line - 1):
+            offset = source.find('\n', offset) + 1
+            if not offset:
+                return -1
+        return offset + col if offset + col <= len(source) else -1
+
+    @staticmethod
+    def _is_identifier_text(text: str) -> bool:
+        return all(char.isalnum() or char == '_' for char in text)
+
+    def store(self, request: dict, completions: List[dict]):
+        source = request['source']
+        if (cursor := self._offset_of(source, request['line'], request['col'])) < 0:
+            self.clear()
             return
-        try:
-            script = jedi.Script(
-                code=source, path=filepath, project=self.project
-            )
-            signatures = script.get_signatures(line=line, column=col)
-            self.signature_ready.emit(signatures[0] if signatures else None)
-        except Exception as e:
-            log.error(f"Error getting Jedi signature: {e}", exc_info=False)
-            try:
-                self.signature_ready.emit(None)
-            except RuntimeError:
-                log.warning(
-                    "JediWorker was likely deleted during an exception. "
-                    "Ignoring signal emit error."
-                )
+        start = cursor
+        while start > 0 and self._is_identifier_text(source[start - 1]):
+            start -= 1
+        self.request, self.docstrings, self._completions = request, {}, completions
+        self._head, self._prefix, self._tail = source[:start], source[start:cursor], source[cursor:]
+        self._prefix_col = request['col'] - (cursor - start)
+
+    def narrow(self, source: str, line: int, col: int, filepath: str) -> Optional[List[dict]]:
+        """The stored completions still matching the identifier at the cursor, or None on a miss."""
+        request = self.request
+        if request is None or request['path'] != (filepath or "") or request['line'] != line:
+            return None
+        cursor = len(self._head) + col - self._prefix_col
+        if (cursor < len(self._head) or len(source) - cursor != len(self._tail)
+                or not source.startswith(self._head) or not source.endswith(self._tail)):
+            return None
+        prefix = source[len(self._head):cursor]
+        if not prefix.startswith(self._prefix) or not self._is_identifier_text(prefix):
+            return None
+        # Jedi matches prefixes case-insensitively.
+        lowered = prefix.lower()
+        return [completion for completion in self._completions if completion['name'].lower().startswith(lowered)]
 
 
 class CompletionManager(QObject):
     """
-    Manages code completion, definition finding, and hover tooltips
-    by delegating to a JediWorker on a background thread.
+    Manages code completion, definition finding, and hover tooltips.
+    Requests go to a JediServerPool of long-lived processes; a JediWorker on
+    a background thread serves them in-process when the pool cannot.
+
+    Every request gets an id, and only the newest request per operation is
+    allowed to produce a result. Superseded ones are dropped before they run
+    where possible, stopped while serializing where not, and their late
+    results are discarded. Callers can pass the document revision so that
+    repeating a request for an unchanged document and position is a no-op.
+
+    Completions arrive without docstrings; request_docstring() resolves the
+    one for the item the user is looking at, answered by docstring_ready.
     """
     completions_available = pyqtSignal(list)
+    docstring_ready = pyqtSignal(str, str)  # completion name, docstring
     definition_found = pyqtSignal(str, int, int)
     hover_tip_ready = pyqtSignal(str)
 
-    _completions_requested = pyqtSignal(str, int, int, str)
-    _definition_requested = pyqtSignal(str, int, int, str)
-    _signature_requested = pyqtSignal(str, int, int, str)
+    _work_available = pyqtSignal(str)
     _project_path_changed = pyqtSignal(str)
 
     def __init__(self, theme_manager: 'ThemeManager', parent: Optional[QObject] = None):
         super().__init__(parent)
         self.theme_manager = theme_manager
         self.thread = QThread()
-        self.worker = JediWorker()
+        self._fallback_requests = LatestRequests()
+        self.worker = JediWorker(self._fallback_requests)
         self.worker.moveToThread(self.thread)
 
         # Connect signals to worker slots
-        self._completions_requested.connect(self.worker.get_completions)
-        self._definition_requested.connect(self.worker.get_definition)
-        self._signature_requested.connect(self.worker.get_signature)
+        self._work_available.connect(self.worker.process_latest)
         self._project_path_changed.connect(self.worker.set_project)
 
         # Connect worker signals to manager slots
-        self.worker.completions_ready.connect(self.completions_available)
-        self.worker.definition_ready.connect(self.definition_found)
-        self.worker.signature_ready.connect(self._format_signature_for_tooltip)
+        self.worker.result_ready.connect(self._deliver)
 
         self.thread.start()
         log.info("CompletionManager background thread started.")
 
+        self.project_path = ""
+        # The in-process worker only builds a jedi.Project once it is actually needed.
+        self._fallback_project_path: Optional[str] = None
+        self._ids = count(1)
+        self._latest: Dict[str, dict] = {}  # op -> the newest request's bookkeeping
+        self.latency = LatencyStats()
+        self.completion_cache = CompletionCache()
+        self.server_pool = JediServerPool(self)
+        self.server_pool.result_ready.connect(self._deliver)
+
     def update_project_path(self, project_path: str):
-        self._project_path_changed.emit(project_path)
+        self.project_path = project_path or ""
+        self.completion_cache.clear()
+        self.server_pool.set_project(self.project_path)
+        if self._fallback_project_path is not None:
+            self._fallback_project_path = self.project_path
+            self._project_path_changed.emit(self.project_path)
 
     def request_completions(
-        self, source: str, line: int, col: int, filepath: str
+        self, source: str, line: int, col: int, filepath: str, revision: Optional[int] = None
     ):
-        self._completions_requested.emit(source, line, col, filepath)
+        if (request_id := self._begin('complete', (revision, filepath, line, col))) is None:
+            return
+        if (narrowed := self.completion_cache.narrow(source, line, col, filepath)) is not None:
+            self._deliver('complete', request_id, narrowed, 0.0)
+        else:
+            self._submit('complete', request_id, source, line, col, filepath)
 
     def request_definition(
-        self, source: str, line: int, col: int, filepath: str
+        self, source: str, line: int, col: int, filepath: str, revision: Optional[int] = None
     ):
-        self._definition_requested.emit(source, line, col, filepath)
+        if (request_id := self._begin('goto', (revision, filepath, line, col))) is not None:
+            self._submit('goto', request_id, source, line, col, filepath)
 
     def request_signature(
-        self, source: str, line: int, col: int, filepath: str
+        self, source: str, line: int, col: int, filepath: str, revision: Optional[int] = None
     ):
-        self._signature_requested.emit(source, line, col, filepath)
-
-    def _format_signature_for_tooltip(self, signature: Optional[Any]):
-        """Formats a Jedi signature object into a themed HTML tooltip."""
+        if (request_id := self._begin('signatures', (revision, filepath, line, col))) is not None:
+            self._submit('signatures', request_id, source, line, col, filepath)
+
+    def request_docstring(self, name: str):
+        """Resolves the docstring of an item from the last completion list, e.g. the highlighted one."""
+        base = self.completion_cache.request
+        if base is None:
+            self.docstring_ready.emit(name, "")
+        elif name in self.completion_cache.docstrings:
+            self.docstring_ready.emit(name, self.completion_cache.docstrings[name])
+        elif (request_id := self._begin('docstring', (base['id'], name))) is not None:
+            self._submit('docstring', request_id, base['source'], base['line'], base['col'], base['path'],
+                         name=name)
+            self._latest['docstring']['base'] = base
+
+    def _begin(self, op: str, key: tuple) -> Optional[int]:
+        """Makes a new request the latest for op. Returns its id, or None if the pending one already matches."""
+        if (latest := self._latest.get(op)) and latest['pending']:
+            if key[0] is not None and latest['key'] == key:
+                return None  # The running request already answers this document state and position
+            self.latency.record_superseded(op)
+        request_id = next(self._ids)
+        self._latest[op] = {'id': request_id, 'key': key, 'pending': True, 'requested_at': time.perf_counter()}
+        return request_id
+
+    def _submit(self, op: str, request_id: int, source: str, line: int, col: int, filepath: str, **extra):
+        request = {'id': request_id, 'op': op, 'source': source, 'line': line, 'col': col,
+                   'path': filepath or "", **extra}
+        self._latest[op]['request'] = request
+        if not self.server_pool.submit(request):
+            if self._fallback_project_path != self.project_path:
+                self._fallback_project_path = self.project_path
+                self._project_path_changed.emit(self.project_path)
+            self._fallback_requests.put(request)
+            self._work_available.emit(op)
+
+    def _deliver(self, op: str, request_id: int, result: Any, jedi_ms: float):
+        latest = self._latest.get(op)
+        if not latest or latest['id'] != request_id:
+            return  # A newer request has been made since; its result is the one that matters
+        latest['pending'] = False
+        self.latency.record(op, (time.perf_counter() - latest['requested_at']) * 1000, jedi_ms)
+        if op == 'complete':
+            if 'request' in latest and result is not None:
+                self.completion_cache.store(latest['request'], result)
+            self.completions_available.emit(result or [])
+        elif op == 'docstring':
+            if self.completion_cache.request is latest['base'] and result is not None:
+                self.completion_cache.docstrings[latest['request']['name']] = result
+            self.docstring_ready.emit(latest['request']['name'], result or "")
+        elif op == 'goto':
+            if result:
+                log.info(f"Jedi found definition for '{result['name']}' at "
+                         f"{result['path']}:{result['line']}:{result['col']}")
+            self.definition_found.emit(*((result['path'], result['line'], result['col']) if result else ("", -1, -1)))
+        elif op == 'signatures':
+            self._format_signature_for_tooltip(result)
+
+    def get_latency_stats(self) -> Dict[str, Dict[str, float]]:
+        """Per operation: result count, p50/p95/max request-to-result time, median time in Jedi (ms) and superseded requests."""
+        return self.latency.summary()
+
+    def _format_signature_for_tooltip(self, signature: Optional[Dict[str, Any]]):
+        """Formats a signature (as made by jedi_server.signature_to_dict) into a themed HTML tooltip."""
         if not signature:
             self.hover_tip_ready.emit("")
             return
@@ -256,9 +591,9 @@ class CompletionManager(QObject):
             doc_fg = colors.get('syntax.comment', '#88929b')
             border = colors.get('input.border', '#555555')
 
-            params_str = ', '.join(p.description for p in signature.params)
-            header = f"def {signature.name}({params_str})"
-            docstring = signature.docstring(raw=True).strip()
+            params_str = ', '.join(signature['params'])
+            header = f"def {signature['name']}({params_str})"
+            docstring = signature['docstring'].strip()
 
             # Escape HTML characters in the docstring for safe rendering
             doc_html = html.escape(docstring)
@@ -289,14 +624,15 @@ class CompletionManager(QObject):
             self.hover_tip_ready.emit("")
 
     def shutdown(self):
-        """Gracefully shuts down the Jedi worker thread."""
+        """Gracefully shuts down the Jedi server processes and worker thread."""
+        if stats := self.get_latency_stats():
+            log.info(f"Completion latency this session: {stats}")
+        self.server_pool.shutdown()
         if self.thread and self.thread.isRunning():
             log.info("Shutting down CompletionManager thread.")
             # Disconnect signals to prevent any more work from being sent
             try:
-                self._completions_requested.disconnect()
-                self._definition_requested.disconnect()
-                self._signature_requested.disconnect()
+                self._work_available.disconnect()
                 self._project_path_changed.disconnect()
             except TypeError:
                 pass  # Signals may already be disconnected
@@ -13,6 +13,37 @@ from PyQt6.QtCore import QUrl, pyqtSignal, QObject, Qt, QRunnable, QThreadPool
 from .settings_manager import settings_manager
 from utils.logger import log
 from utils.helpers import clean_git_conflict_markers
+from .text_decoding import read_file_bytes_and_decode
+
+
+class FileLoadWorkerSignals(QObject):
+    """Defines signals available from a running FileLoadWorker."""
+    finished = pyqtSignal(str, str, str)  # filepath, content, encoding
+    error = pyqtSignal(str, str)  # filepath, error message
+
+
+class FileLoadWorker(QRunnable):
+    """
+    A QRunnable worker that reads and decodes a file off the UI thread.
+    Line endings are normalised to '\\n' here so the editor can insert the
+    text in arbitrary chunks without splitting a '\\r\\n' pair.
+    """
+    def __init__(self, filepath: str):
+        super().__init__()
+        self.filepath = filepath
+        self.signals = FileLoadWorkerSignals()
+
+    def run(self):
+        try:
+            content, encoding = read_file_bytes_and_decode(self.filepath)
+            if '\r' in content:
+                content = content.replace('\r\n', '\n').replace('\r', '\n')
+            log.info(f"Read file {self.filepath} in the background with encoding {encoding}")
+            self.signals.finished.emit(self.filepath, content, encoding)
+        except (IOError, OSError, ValueError) as e:
+            log.error(f"Failed to read file {self.filepath}: {e}", exc_info=True)
+            self.signals.error.emit(self.filepath, str(e))
+
 
 # --- NEW: Background Worker for BOM Removal ---
 class BOMWorkerSignals(QObject):
@@ -137,24 +168,30 @@ class FileHandler(QObject):
         self._internal_clipboard: Dict[str, Optional[str]] = { "operation": None, "path": None }
 
     def _read_with_encoding_detection(self, filepath: str) -> Tuple[Optional[str], Optional[str]]:
-        """Tries to read a file with several common encodings."""
-        for encoding in self.COMMON_ENCODINGS:
-            try:
-                with open(filepath, 'r', encoding=encoding) as f:
-                    content = f.read()
-                log.info(f"Successfully read file {filepath} with encoding {encoding}")
-                return content, encoding
-            except (UnicodeDecodeError, TypeError):
-                continue
-        
-        # As a last resort, try to read with 'ignore' errors
+        """Reads a file once and detects its encoding from its BOM or by decoding it."""
         try:
-            with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
-            log.warning(f"Read file {filepath} with UTF-8, ignoring errors. Some characters may be lost.")
-            return content, 'utf-8' # Treat as utf-8 but it's lossy
-        except Exception:
+            content, encoding = read_file_bytes_and_decode(filepath)
+        except (IOError, OSError, ValueError) as e:
+            log.error(f"Failed to read file {filepath}: {e}")
             return None, None
+        log.info(f"Successfully read file {filepath} with encoding {encoding}")
+        return content, encoding
+
+    @staticmethod
+    def _is_at_least_setting_mb(filepath: str, setting_key: str, default_mb: int) -> bool:
+        threshold_mb = settings_manager.get(setting_key, default_mb)
+        try:
+            return bool(threshold_mb) and os.path.getsize(filepath) >= threshold_mb * 1024 * 1024
+        except OSError:
+            return False
+
+    def should_load_async(self, filepath: str) -> bool:
+        """Whether a file is large enough to be opened with FileLoadWorker instead of on the UI thread."""
+        return self._is_at_least_setting_mb(filepath, "async_open_threshold_mb", 2)
+
+    def should_open_in_viewer(self, filepath: str) -> bool:
+        """Whether a file is large enough to open in the read-only LargeFileViewer instead of an editor."""
+        return self._is_at_least_setting_mb(filepath, "large_file_viewer_threshold_mb", 100)
 
     def new_file(self) -> Dict[str, Optional[str]]:
         log.info("FileHandler: new_file action invoked.")
@@ -165,6 +202,9 @@ class FileHandler(QObject):
         filepath, _ = QFileDialog.getOpenFileName(self.parent_window, "Open File", last_dir, "All Supported Files (*.py *.pyw *.txt *.md *.json *.js *.html *.css *.c *.cpp *.h *.hpp *.cs *.rs);;All Files (*)")
         if not filepath: return None, None, None, None
         settings_manager.set("last_opened_directory", os.path.dirname(filepath))
+        if self.should_load_async(filepath) or self.should_open_in_viewer(filepath):
+            # Large files are read by the caller in the background (see FileLoadWorker) or viewed in place.
+            return filepath, None, None, None
         try:
             original_content, detected_encoding = self._read_with_encoding_detection(filepath)
             if original_content is None:
@@ -0,0 +1,410 @@
+# PuffinPyEditor/app_core/file_watcher.py
+"""
+One recursive file watcher for every open project.
+
+FileWatchService watches each project root and everything below it, except
+directories nobody looks into (hidden ones, __pycache__, venv,
+node_modules; of .git only the top level, so commits and checkouts made
+outside the editor are noticed). Events are collected on a background
+thread, coalesced, and published on the UI thread as a ChangeSet at most
+once per debounce window, so a `git checkout` touching thousands of files
+arrives as one batch.
+
+On Linux the watcher uses inotify directly. Where inotify is unavailable,
+or a project would exceed the inotify watch limit, that project is polled
+instead by comparing directory snapshots.
+"""
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+from utils.logger import log
+from app_core.settings_manager import settings_manager
+
+# Directories whose names start with one of these are not watched.
+UNWATCHED_DIR_PREFIXES = ('.', '__pycache__', 'venv', 'node_modules')
+GIT_DIR = '.git'
+
+CREATED, MODIFIED, DELETED, OVERFLOW = 'created', 'modified', 'deleted', 'overflow'
+
+EventCallback = Callable[[List[Tuple[str, str]]], None]  # [(kind, path), ...]
+
+
+@dataclass
+class ChangeSet:
+    """What changed on disk during one debounce window. Paths are normalized."""
+    created: Set[str] = field(default_factory=set)
+    modified: Set[str] = field(default_factory=set)
+    deleted: Set[str] = field(default_factory=set)
+    overflowed: bool = False  # Events were lost; consumers should re-read everything they show
+
+    @property
+    def directories(self) -> Set[str]:
+        """Directories whose listing changed."""
+        return {os.path.dirname(path) for path in self.created | self.deleted}
+
+    def all_paths(self) -> Set[str]:
+        return self.created | self.modified | self.deleted
+
+    def touches(self, root: str) -> bool:
+        root = os.path.normpath(root)
+        prefix = root + os.sep
+        return self.overflowed or any(p == root or p.startswith(prefix) for p in self.all_paths())
+
+
+def watched_directories(root: str) -> Iterator[str]:
+    """root and every directory below it that should be watched; .git at the top only, not its contents."""
+    if os.path.isdir(git_dir := os.path.join(root, GIT_DIR)):
+        yield git_dir
+    stack = [root]
+    while stack:
+        path = stack.pop()
+        yield path
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False) and not entry.name.startswith(UNWATCHED_DIR_PREFIXES):
+                            stack.append(entry.path)
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+
+
+def is_watched_dir_name(name: str) -> bool:
+    return not name.startswith(UNWATCHED_DIR_PREFIXES)
+
+
+class WatchLimitReached(OSError):
+    """The system's inotify watch limit does not allow watching a whole project."""
+
+
+class InotifyWatcher:
+    """
+    inotify through ctypes, one watch per directory. Roots are added and
+    removed on the watcher's own thread, which also adds watches for
+    directories as they appear and reports their contents as created.
+    """
+    IN_MODIFY, IN_ATTRIB, IN_CLOSE_WRITE = 0x2, 0x4, 0x8
+    IN_MOVED_FROM, IN_MOVED_TO, IN_CREATE, IN_DELETE = 0x40, 0x80, 0x100, 0x200
+    IN_DELETE_SELF, IN_MOVE_SELF = 0x400, 0x800
+    IN_Q_OVERFLOW, IN_IGNORED, IN_ONLYDIR, IN_ISDIR = 0x4000, 0x8000, 0x01000000, 0x40000000
+    IN_NONBLOCK, IN_CLOEXEC = os.O_NONBLOCK, 0o2000000
+    WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+                  | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
+    EVENT_HEADER = struct.Struct('iIII')
+    READ_SIZE = 64 * 1024
+
+    def __init__(self, on_events: EventCallback, on_limit: Callable[[str], None]):
+        """Raises OSError where inotify is not available."""
+        if not sys.platform.startswith('linux'):
+            raise OSError(errno.ENOSYS, "inotify is only available on Linux")
+        self._libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self._fd = self._libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.on_events, self.on_limit = on_events, on_limit
+        self._wake_read, self._wake_write = os.pipe()
+        self._commands = deque()
+        self._wd_paths: Dict[int, str] = {}
+        self._path_wds: Dict[str, int] = {}
+        self._roots: Set[str] = set()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="InotifyWatcher", daemon=True)
+        self._thread.start()
+
+    def add_root(self, root: str):
+        self._command('add', root)
+
+    def remove_root(self, root: str):
+        self._command('remove', root)
+
+    def stop(self):
+        self._command('stop', None)
+        self._thread.join(2)
+
+    def _command(self, name: str, argument):
+        self._commands.append((name, argument))
+        os.write(self._wake_write, b'x')
+
+    def _run(self):
+        try:
+            while not self._stopped:
+                readable, _, _ = select.select([self._fd, self._wake_read], [], [])
+                if self._wake_read in readable:
+                    os.read(self._wake_read, 4096)
+                    while self._commands and not self._stopped:
+                        self._run_command(*self._commands.popleft())
+                if self._fd in readable and not self._stopped:
+                    self._read_events()
+        except Exception as e:
+            log.error(f"inotify watcher stopped: {e}", exc_info=True)
+        finally:
+            os.close(self._fd)
+            os.close(self._wake_read)
+            os.close(self._wake_write)
+
+    def _run_command(self, name: str, root: Optional[str]):
+        if name == 'stop':
+            self._stopped = True
+        elif name == 'add' and root not in self._roots:
+            self._roots.add(root)
+            try:
+                for path in watched_directories(root):
+                    self._add_watch(path)
+            except WatchLimitReached:
+                self._roots.discard(root)
+                self._remove_watches_under(root)
+                self.on_limit(root)
+        elif name == 'remove' and root in self._roots:
+            self._roots.discard(root)
+            self._remove_watches_under(root)
+
+    def _add_watch(self, path: str):
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), self.WATCH_MASK)
+        if wd < 0:
+            error = ctypes.get_errno()
+            if error == errno.ENOSPC:
+                raise WatchLimitReached(error, f"inotify watch limit reached at {path}")
+            return  # Gone already, or not readable
+        self._wd_paths[wd] = path
+        self._path_wds[path] = wd
+
+    def _remove_watches_under(self, root: str):
+        prefix = root + os.sep
+        for path in [p for p in self._path_wds if p == root or p.startswith(prefix)]:
+            if any(path == r or path.startswith(r + os.sep) for r in self._roots):
+                continue  # Still needed by another open project
+            wd = self._path_wds.pop(path)
+            self._wd_paths.pop(wd, None)
+            self._libc.inotify_rm_watch(self._fd, wd)
+
+    def _read_events(self):
+        try:
+            data = os.read(self._fd, self.READ_SIZE)
+        except BlockingIOError:
+            return
+        events, offset = [], 0
+        while offset + self.EVENT_HEADER.size <= len(data):
+            wd, mask, _, length = self.EVENT_HEADER.unpack_from(data, offset)
+            name = data[offset + self.EVENT_HEADER.size:offset + self.EVENT_HEADER.size + length].rstrip(b'\0')
+            offset += self.EVENT_HEADER.size + length
+            if mask & self.IN_Q_OVERFLOW:
+                events.append((OVERFLOW, ""))
+                continue
+            if mask & self.IN_IGNORED:
+                if (path := self._wd_paths.pop(wd, None)) is not None and self._path_wds.get(path) == wd:
+                    del self._path_wds[path]
+                continue
+            if (directory := self._wd_paths.get(wd)) is None or not name:
+                continue  # Events about a watched directory itself arrive through its parent
+            path = os.path.join(directory, os.fsdecode(name))
+            is_dir = bool(mask & self.IN_ISDIR)
+            if mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                events.append((CREATED, path))
+                if is_dir and os.path.basename(directory) != GIT_DIR and is_watched_dir_name(os.path.basename(path)):
+                    events.extend(self._watch_new_directory(path))
+            elif mask & (self.IN_DELETE | self.IN_MOVED_FROM):
+                events.append((DELETED, path))
+                if is_dir:
+                    self._forget_directory(path)
+            elif mask & (self.IN_MODIFY | self.IN_CLOSE_WRITE | self.IN_ATTRIB):
+                events.append((MODIFIED, path))
+        if events:
+            self.on_events(events)
+
+    def _watch_new_directory(self, path: str) -> List[Tuple[str, str]]:
+        """Watches a directory that just appeared and reports what it already holds."""
+        events = []
+        try:
+            for directory in watched_directories(path):
+                if directory == os.path.join(path, GIT_DIR):
+                    continue
+                self._add_watch(directory)
+                try:
+                    with os.scandir(directory) as it:
+                        events.extend((CREATED, entry.path) for entry in it)
+                except OSError:
+                    continue
+        except WatchLimitReached as e:
+            log.warning(f"{e}; changes below it will only be seen through their parent folder.")
+        return events
+
+    def _forget_directory(self, path: str):
+        prefix = path + os.sep
+        for watched in [p for p in self._path_wds if p == path or p.startswith(prefix)]:
+            wd = self._path_wds.pop(watched)
+            self._wd_paths.pop(wd, None)
+            self._libc.inotify_rm_watch(self._fd, wd)
+
+
+class PollingWatcher:
+    """Finds changes by comparing snapshots of each root's tree, taken every interval_seconds()."""
+
+    def __init__(self, on_events: EventCallback, interval_seconds: Callable[[], float]):
+        self.on_events = on_events
+        self.interval_seconds = interval_seconds
+        self._lock = threading.Lock()
+        self._snapshots: Dict[str, Optional[Dict[str, Tuple[bool, int, int]]]] = {}
+        self._wake = threading.Event()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="PollingWatcher", daemon=True)
+        self._thread.start()
+
+    @property
+    def roots(self) -> Set[str]:
+        with self._lock:
+            return set(self._snapshots)
+
+    def add_root(self, root: str):
+        with self._lock:
+            self._snapshots.setdefault(root, None)
+        self._wake.set()
+
+    def remove_root(self, root: str):
+        with self._lock:
+            self._snapshots.pop(root, None)
+
+    def stop(self):
+        self._stopped = True
+        self._wake.set()
+        self._thread.join(2)
+
+    def _run(self):
+        while not self._stopped:
+            for root in self.roots:
+                if self._stopped:
+                    return
+                snapshot = self._snapshot(root)
+                with self._lock:
+                    if root not in self._snapshots:
+                        continue  # Removed while it was being read
+                    previous, self._snapshots[root] = self._snapshots[root], snapshot
+                if previous is not None and (events := self._diff(previous, snapshot)):
+                    self.on_events(events)
+            self._wake.wait(max(0.5, self.interval_seconds()))
+            self._wake.clear()
+
+    @staticmethod
+    def _snapshot(root: str) -> Dict[str, Tuple[bool, int, int]]:
+        snapshot = {}
+        for directory in watched_directories(root):
+            try:
+                with os.scandir(directory) as it:
+                    for entry in it:
+                        try:
+                            stat = entry.stat(follow_symlinks=False)
+                            snapshot[entry.path] = (entry.is_dir(follow_symlinks=False), stat.st_mtime_ns, stat.st_size)
+                        except OSError:
+                            continue
+            except OSError:
+                continue
+        return snapshot
+
+    @staticmethod
+    def _diff(old: Dict[str, Tuple[bool, int, int]], new: Dict[str, Tuple[bool, int, int]]) -> List[Tuple[str, str]]:
+        events = [(DELETED, path) for path in old.keys() - new.keys()]
+        events.extend((CREATED, path) for path in new.keys() - old.keys())
+        events.extend((MODIFIED, path) for path, entry in new.items()
+                      if (before := old.get(path)) is not None and before != entry and not entry[0])
+        return events
+
+
+class FileWatchService(QObject):
+    """
+    Watches the open projects and publishes coalesced ChangeSets through
+    changes_ready. A batch is published DEBOUNCE_MS after the last event,
+    but never later than MAX_DELAY_MS after its first one.
+    """
+    DEBOUNCE_MS = 200
+    MAX_DELAY_MS = 1000
+
+    changes_ready = pyqtSignal(object)  # ChangeSet
+    _events_received = pyqtSignal(list)  # Emitted from the watcher threads
+
+    def __init__(self, parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self._roots: Set[str] = set()
+        self._pending: Dict[str, Set[str]] = {}
+        self._overflowed = False
+        self._first_event_at = 0.0
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.timeout.connect(self._flush)
+        self._events_received.connect(self._on_events)
+        self._poller: Optional[PollingWatcher] = None
+        self._poller_lock = threading.Lock()  # The inotify thread may start the poller too
+        self._inotify: Optional[InotifyWatcher] = None
+        try:
+            self._inotify = InotifyWatcher(self._events_received.emit, self._on_watch_limit)
+        except OSError as e:
+            log.info(f"Watching projects by polling: {e}")
+
+    def set_roots(self, roots: List[str]):
+        """Watches exactly these project roots from now on."""
+        wanted = {os.path.normpath(root) for root in roots if root and os.path.isdir(root)}
+        for root in self._roots - wanted:
+            if self._inotify:
+                self._inotify.remove_root(root)
+            if self._poller:
+                self._poller.remove_root(root)
+        for root in wanted - self._roots:
+            if self._inotify:
+                self._inotify.add_root(root)
+            else:
+                self._polling_watcher().add_root(root)
+        self._roots = wanted
+
+    def shutdown(self):
+        self._flush_timer.stop()
+        for watcher in (self._inotify, self._poller):
+            if watcher:
+                watcher.stop()
+        self._inotify = self._poller = None
+
+    def _polling_watcher(self) -> PollingWatcher:
+        with self._poller_lock:
+            if self._poller is None:
+                self._poller = PollingWatcher(
+                    self._events_received.emit,
+                    lambda: settings_manager.get("file_watch_poll_interval_seconds", 2))
+            return self._poller
+
+    def _on_watch_limit(self, root: str):
+        # Called on the inotify thread; the poller is thread safe.
+        log.warning(f"Too many folders in {root} for the inotify watch limit; polling it for changes instead.")
+        self._polling_watcher().add_root(root)
+
+    def _on_events(self, events: List[Tuple[str, str]]):
+        if not self._pending and not self._overflowed:
+            self._first_event_at = time.monotonic()
+        for kind, path in events:
+            if kind == OVERFLOW:
+                self._overflowed = True
+            else:
+                self._pending.setdefault(os.path.normpath(path), set()).add(kind)
+        elapsed_ms = (time.monotonic() - self._first_event_at) * 1000
+        self._flush_timer.start(int(max(0, min(self.DEBOUNCE_MS, self.MAX_DELAY_MS - elapsed_ms))))
+
+    def _flush(self):
+        pending, self._pending = self._pending, {}
+        change_set = ChangeSet(overflowed=self._overflowed)
+        self._overflowed = False
+        for path, kinds in pending.items():
+            appeared = CREATED in kinds and DELETED not in kinds
+            if os.path.lexists(path):
+                (change_set.created if appeared else change_set.modified).add(path)
+            elif not appeared:
+                change_set.deleted.add(path)  # Something created and removed within the batch is left out
+        if change_set.all_paths() or change_set.overflowed:
+            self.changes_ready.emit(change_set)
@@ -0,0 +1,292 @@
+# PuffinPyEditor/app_core/find_in_files.py
+"""
+Find in files without an index, for projects the search index has not
+caught up with yet.
+
+walk_project_files() lists a project with os.scandir, skipping what a
+project archive leaves out and whatever the project's .gitignore files
+(and .git/info/exclude) ignore; ProjectFiles applies the same rules to
+single paths. Files are searched in batches by find_in_files_worker,
+memory-mapped and matched with a bytes regular expression, so nothing is
+decoded unless it matches; a file that does is decoded as the editor would,
+by text_decoding.decode_file_bytes. Where a bytes pattern could match
+differently than the str one an indexed search uses, compile_bytes_query()
+returns None and the worker reads and decodes each file instead.
+
+Nothing here imports Qt; find_in_files_worker runs in ProcessPoolExecutor
+children.
+"""
+import mmap
+import os
+import re
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .search_engine import (BINARY_SNIFF_BYTES, MAX_LINE_CHARS, MAX_MATCHES_PER_FILE, MAX_SEARCHED_BYTES, Match,
+                            search_file, sre_parse)
+from .text_decoding import UTF16_BOMS, decode_file_bytes
+
+# Left out of project archives and of searches without an index.
+IGNORED_DIRS = {'__pycache__', '.git', 'venv', '.venv', 'dist', 'build', 'logs'}
+IGNORED_FILES = {'.gitignore', 'puffin_editor_settings.json'}
+
+
+def _glob_to_regex(pattern: str) -> str:
+    """One gitignore glob as a regex over '/'-separated paths."""
+    parts, i = [], 0
+    while i < len(pattern):
+        c = pattern[i]
+        if pattern.startswith('**/', i):
+            parts.append('(?:.*/)?')
+            i += 3
+            continue
+        if pattern.startswith('**', i):
+            parts.append('.*')
+            i += 2
+            continue
+        if c == '*':
+            parts.append('[^/]*')
+        elif c == '?':
+            parts.append('[^/]')
+        elif c == '[' and (end := pattern.find(']', i + 2)) > 0:
+            body = pattern[i + 1:end]
+            parts.append('[' + ('^' + body[1:] if body[0] in '!^' else body) + ']')
+            i = end
+        elif c == '\\' and i + 1 < len(pattern):
+            i += 1
+            parts.append(re.escape(pattern[i]))
+        else:
+            parts.append(re.escape(c))
+        i += 1
+    return ''.join(parts)
+
+
+class GitIgnore:
+    """
+    The rules of one .gitignore file. match() takes a path relative to the
+    file's directory, with '/' separators, and says whether the last rule
+    matching it ignores it (True), re-includes it (False) or whether no rule
+    applies (None).
+    """
+
+    def __init__(self, lines: List[str]):
+        self.rules: List[Tuple['re.Pattern', bool, bool]] = []  # (regex, negated, directories only)
+        for line in lines:
+            line = line.rstrip('\n\r')
+            if not line.endswith('\\ '):
+                line = line.rstrip()
+            if not line or line.startswith('#'):
+                continue
+            negated = line.startswith('!')
+            if negated:
+                line = line[1:]
+            elif line.startswith(('\\#', '\\!')):
+                line = line[1:]
+            dir_only = line.endswith('/')
+            line = line.rstrip('/')
+            if not line:
+                continue
+            # A slash anywhere but the end anchors the pattern to this directory.
+            anchored = '/' in line
+            regex = _glob_to_regex(line.lstrip('/'))
+            try:
+                self.rules.append((re.compile(regex if anchored else f'(?:.*/)?{regex}', re.DOTALL), negated, dir_only))
+            except re.error:
+                continue
+
+    @classmethod
+    def load(cls, *paths: str) -> Optional['GitIgnore']:
+        lines = []
+        for path in paths:
+            try:
+                with open(path, 'rb') as f:
+                    lines.extend(decode_file_bytes(f.read())[0].splitlines())
+            except OSError:
+                continue
+        ignore = cls(lines)
+        return ignore if ignore.rules else None
+
+    def match(self, relative_path: str, is_dir: bool) -> Optional[bool]:
+        for regex, negated, dir_only in reversed(self.rules):
+            if (is_dir or not dir_only) and regex.fullmatch(relative_path):
+                return not negated
+        return None
+
+
+def _is_ignored(ignores: List[Tuple[str, GitIgnore]], path: str, is_dir: bool) -> bool:
+    # The closest .gitignore with a matching rule decides.
+    for base, ignore in reversed(ignores):
+        relative = path[len(base) + 1:].replace(os.sep, '/')
+        if (ignored := ignore.match(relative, is_dir)) is not None:
+            return ignored
+    return False
+
+
+def _root_ignore(root: str) -> Optional[GitIgnore]:
+    return GitIgnore.load(os.path.join(root, '.gitignore'), os.path.join(root, '.git', 'info', 'exclude'))
+
+
+def _skips_dir(name: str, skipped_dir_prefixes: Tuple[str, ...]) -> bool:
+    return name in IGNORED_DIRS or name.startswith(skipped_dir_prefixes)
+
+
+def walk_project_files(project_root: str, skipped_dir_prefixes: Tuple[str, ...] = ()) -> Iterator[Tuple[str, int]]:
+    """
+    (path, size) of every file of a project, in directory order, leaving out
+    directories whose names start with one of skipped_dir_prefixes as well.
+    """
+    root = os.path.normpath(project_root)
+    root_ignore = _root_ignore(root)
+    stack = [(root, [(root, root_ignore)] if root_ignore else [])]
+    while stack:
+        directory, ignores = stack.pop()
+        if directory != root and (ignore := GitIgnore.load(os.path.join(directory, '.gitignore'))):
+            ignores = ignores + [(directory, ignore)]
+        subdirs = []
+        try:
+            with os.scandir(directory) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError:
+            continue
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if not _skips_dir(entry.name, skipped_dir_prefixes) and not _is_ignored(ignores, entry.path, True):
+                        subdirs.append(entry.path)
+                elif entry.is_file() and entry.name not in IGNORED_FILES \
+                        and not _is_ignored(ignores, entry.path, False):
+                    yield entry.path, entry.stat().st_size
+            except OSError:
+                continue
+        stack.extend((d, ignores) for d in reversed(subdirs))
+
+
+class ProjectFiles:
+    """
+    Whether single paths, such as the file watcher reports, are files
+    walk_project_files() would list. Each .gitignore is read once.
+    """
+
+    def __init__(self, project_root: str, skipped_dir_prefixes: Tuple[str, ...] = ()):
+        self.root = os.path.normpath(project_root)
+        self.skipped_dir_prefixes = skipped_dir_prefixes
+        root_ignore = _root_ignore(self.root)
+        self._ignores: Dict[str, List[Tuple[str, GitIgnore]]] = {self.root: [(self.root, root_ignore)] if root_ignore else []}
+
+    def _ignores_in(self, directory: str, parent: List[Tuple[str, GitIgnore]]) -> List[Tuple[str, GitIgnore]]:
+        if (ignores := self._ignores.get(directory)) is None:
+            ignore = GitIgnore.load(os.path.join(directory, '.gitignore'))
+            ignores = self._ignores[directory] = parent + [(directory, ignore)] if ignore else parent
+        return ignores
+
+    def includes(self, path: str) -> bool:
+        path = os.path.normpath(path)
+        if not path.startswith(self.root + os.sep):
+            return False
+        *dir_names, name = path[len(self.root) + 1:].split(os.sep)
+        directory, ignores = self.root, self._ignores[self.root]
+        for dir_name in dir_names:
+            directory = os.path.join(directory, dir_name)
+            if _skips_dir(dir_name, self.skipped_dir_prefixes) or _is_ignored(ignores, directory, True):
+                return False
+            ignores = self._ignores_in(directory, ignores)
+        return name not in IGNORED_FILES and not _is_ignored(ignores, path, False)
+
+
+# Regex nodes that mean something else on bytes once the text is not ASCII: ., \w, \s, \d and
+# their negations, and negated literals and sets, which can match part of a character. (\b and
+# \B are AT nodes; their codes overlap with these, so they are told apart by identity.)
+_TEXT_DEPENDENT_OPS = {sre_parse.ANY, sre_parse.CATEGORY, sre_parse.NOT_LITERAL, sre_parse.NEGATE}
+
+
+def _matches_bytes_like_str(items) -> bool:
+    """Whether a parsed ASCII pattern matches the UTF-8 bytes of any text where it matches the text."""
+    for op, av in items:
+        if op in _TEXT_DEPENDENT_OPS or op is sre_parse.AT and (av is sre_parse.AT_BOUNDARY
+                                                                 or av is sre_parse.AT_NON_BOUNDARY):
+            return False
+        if op is sre_parse.LITERAL and av > 0x7f or op is sre_parse.RANGE and av[1] > 0x7f:
+            return False  # \xe9 is one character in a str pattern, one byte in a bytes pattern
+        if op is sre_parse.IN and not _matches_bytes_like_str(av):
+            return False
+        # Whatever else a node holds: groups, repeats, alternatives, lookarounds.
+        for part in av if isinstance(av, (tuple, list)) and op is not sre_parse.IN else (av,):
+            for subpattern in part if isinstance(part, list) else (part,):
+                if isinstance(subpattern, sre_parse.SubPattern) and not _matches_bytes_like_str(subpattern):
+                    return False
+    return True
+
+
+def compile_bytes_query(query: str, is_regex: bool, case_sensitive: bool, whole_word: bool) -> Optional['re.Pattern']:
+    """
+    compile_query for bytes, or None where bytes could match differently:
+    a query that is not ASCII, whose UTF-8 bytes are not how a Latin-1 file
+    holds it, whole words and regular expressions whose ., \\w, \\b and the
+    like would see only ASCII letters or that use str-only escapes such as \\u.
+    An ASCII pattern matches the same bytes in UTF-8 and Latin-1 files.
+    """
+    if whole_word or not query.isascii():
+        return None
+    if not is_regex:
+        return re.compile(re.escape(query.encode('ascii')), 0 if case_sensitive else re.IGNORECASE)
+    try:
+        if not _matches_bytes_like_str(sre_parse.parse(query, 0 if case_sensitive else re.IGNORECASE)):
+            return None
+        return re.compile(query.encode('ascii'), (0 if case_sensitive else re.IGNORECASE) | re.MULTILINE)
+    except (re.error, RecursionError):
+        return None
+
+
+def _decoded_length(data: bytes, encoding: str) -> int:
+    return len(data.decode(encoding, errors='replace'))
+
+
+def search_file_mapped(path: str, pattern: 're.Pattern') -> Tuple[List[Match], int]:
+    """The matches in a file, memory-mapped, and the bytes searched (0 for skipped files)."""
+    try:
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if not size or size > MAX_SEARCHED_BYTES:
+                return [], 0
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                if data[:2] in UTF16_BOMS:
+                    # No bytes pattern matches UTF-16; the str one it was made from does.
+                    return search_file(path, re.compile(pattern.pattern.decode('ascii'), pattern.flags))
+                if data.find(b'\0', 0, BINARY_SNIFF_BYTES) >= 0:
+                    return [], 0
+                matches: List[Match] = []
+                line, scanned, encoding = 1, 0, None
+                for match in pattern.finditer(data):
+                    start, end = match.span()
+                    if start == end:
+                        continue
+                    line += data[scanned:start].count(b'\n')
+                    scanned = start
+                    line_start = data.rfind(b'\n', 0, start) + 1
+                    line_end = data.find(b'\n', start)
+                    line_end = size if line_end < 0 else line_end
+                    # Columns and lengths are in characters of the text the editor would show.
+                    encoding = encoding or decode_file_bytes(data)[1]
+                    text = data[line_start:min(line_end, line_start + 4 * MAX_LINE_CHARS)]
+                    matches.append((line, _decoded_length(data[line_start:start], encoding),
+                                    _decoded_length(data[start:min(end, line_end)], encoding),
+                                    text.decode(encoding, errors='replace')[:MAX_LINE_CHARS]))
+                    if len(matches) >= MAX_MATCHES_PER_FILE:
+                        break
+                return matches, size
+    except (OSError, ValueError):
+        return [], 0
+
+
+def find_in_files_worker(pattern: 're.Pattern', paths: List[str]) -> Tuple[List[Tuple[str, List[Match]]], int]:
+    """
+    Process pool entry point: [(path, matches), ...] for the files that
+    match, and the bytes searched. A str pattern has each file decoded.
+    """
+    search = search_file_mapped if isinstance(pattern.pattern, bytes) else search_file
+    results, searched = [], 0
+    for path in paths:
+        matches, size = search(path, pattern)
+        searched += size
+        if matches:
+            results.append((path, matches))
+    return results, searched
@@ -0,0 +1,225 @@
+# PuffinPyEditor/app_core/git_status_service.py
+"""
+Per-file git statuses for the open projects, kept up to date in the background.
+
+GitStatusService runs `git status --porcelain=v2 -z` for each repository on
+its own thread pool and publishes only what changed since the previous run
+through statuses_changed. A repository is re-read when the file watcher
+reports a change in its working tree, or when its index or HEAD has moved
+since the last run; otherwise the cached result is kept.
+"""
+import os
+import subprocess
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from PyQt6.QtCore import QObject, QRunnable, QThread, QThreadPool, pyqtSignal
+from utils.logger import log
+
+GIT_DIR = '.git'
+
+
+def parse_porcelain_v2(output: str, project_root: str) -> Dict[str, str]:
+    """
+    Maps the normalized paths in `git status --porcelain=v2 -z` output to a
+    short status: '??' untracked, '!!' ignored, 'M' modified, otherwise the
+    XY code with unchanged sides dropped ('A', 'D', 'R', 'UU', ...).
+    """
+    statuses = {}
+    fields = output.split('\0')
+    i = 0
+    while i < len(fields):
+        entry = fields[i]
+        i += 1
+        if not entry or entry[0] == '#':
+            continue
+        kind = entry[0]
+        if kind in '?!':
+            status, path = kind * 2, entry[2:]
+        elif kind in '12u':
+            # "1 XY sub mH mI mW hH hI path"; renames add a score before the path
+            # and their original path as the next field. Paths may contain spaces.
+            parts = entry.split(' ', {'1': 8, '2': 9, 'u': 10}[kind])
+            if len(parts) < 3:
+                continue
+            xy, path = parts[1].replace('.', ' '), parts[-1]
+            if kind == '2':
+                i += 1
+            status = 'M' if 'M' in xy else xy.strip() or ' '
+        else:
+            continue
+        statuses[os.path.normpath(os.path.join(project_root, path.replace('/', os.sep)))] = status
+    return statuses
+
+
+def read_git_statuses(project_root: str) -> Optional[Dict[str, str]]:
+    """The statuses of one repository, or None if git could not be run."""
+    startupinfo = None
+    if os.name == 'nt':
+        startupinfo = subprocess.STARTUPINFO()
+        startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+    # --ignored=matching includes ignored files that are explicitly listed
+    command = ['git', 'status', '--porcelain=v2', '-z', '--untracked-files=all', '--ignored=matching']
+    try:
+        result = subprocess.run(
+            command, cwd=project_root, startupinfo=startupinfo, capture_output=True, check=True,
+            # Keeps status from rewriting .git/index, which the file watcher would report as a change.
+            env={**os.environ, 'GIT_OPTIONAL_LOCKS': '0'})
+    except (subprocess.CalledProcessError, FileNotFoundError, OSError) as e:
+        log.warning(f"Could not get git status for {project_root}: {e}")
+        return None
+    return parse_porcelain_v2(result.stdout.decode('utf-8', errors='ignore'), project_root)
+
+
+def repo_fingerprint(project_root: str) -> Optional[Tuple]:
+    """
+    What `git status` depends on besides the working tree: the index and the
+    commit HEAD points at. None if the project is not the root of a repository.
+    """
+    git_dir = os.path.join(project_root, GIT_DIR)
+    if not os.path.isdir(git_dir):
+        return None
+
+    def mtime(*parts: str) -> int:
+        try:
+            return os.stat(os.path.join(git_dir, *parts)).st_mtime_ns
+        except OSError:
+            return 0
+
+    try:
+        with open(os.path.join(git_dir, 'HEAD'), encoding='utf-8', errors='ignore') as f:
+            head = f.read().strip()
+    except OSError:
+        head = ''
+    ref = head[5:].strip() if head.startswith('ref:') else ''
+    ref_mtime = mtime(*ref.split('/')) if ref else 0
+    return head, ref_mtime, mtime('packed-refs'), mtime('index')
+
+
+class GitStatusSignals(QObject):
+    # project root, {normalized path: status} or None if git failed
+    finished = pyqtSignal(str, object)
+
+
+class GitStatusWorker(QRunnable):
+    def __init__(self, project_root: str):
+        super().__init__()
+        self.project_root = project_root
+        self.signals = GitStatusSignals()
+
+    def run(self):
+        self.signals.finished.emit(self.project_root, read_git_statuses(self.project_root))
+
+
+class GitStatusService(QObject):
+    """
+    Keeps the git statuses of the open projects. Each repository is read on
+    its own worker, at most one run per repository at a time; requests made
+    while one is running are folded into a single follow-up run.
+    """
+    # {normalized path: status, or None if the file is now clean}
+    statuses_changed = pyqtSignal(object)
+
+    def __init__(self, parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(max(2, QThread.idealThreadCount() // 2))
+        self._roots: List[str] = []
+        self._statuses: Dict[str, Dict[str, str]] = {}
+        self._fingerprints: Dict[str, Tuple] = {}
+        self._dirty: Set[str] = set()
+        self._running: Dict[str, GitStatusWorker] = {}
+        self._rerun: Set[str] = set()
+
+    def set_roots(self, roots: List[str]):
+        """Tracks exactly these project roots from now on; new ones are read right away."""
+        wanted = [os.path.normpath(root) for root in roots if root]
+        removed = set(self._roots) - set(wanted)
+        added = [root for root in wanted if root not in self._roots]
+        self._roots = wanted
+        delta = {}
+        for root in removed:
+            delta.update(dict.fromkeys(self._statuses.pop(root, {}), None))
+            self._fingerprints.pop(root, None)
+            self._dirty.discard(root)
+            self._rerun.discard(root)
+        if delta:
+            self.statuses_changed.emit(delta)
+        self._dirty.update(added)
+        self.refresh(added)
+
+    def statuses(self) -> Dict[str, str]:
+        """Every known status, across all projects."""
+        merged = {}
+        for statuses in self._statuses.values():
+            merged.update(statuses)
+        return merged
+
+    def refresh(self, roots: Optional[Iterable[str]] = None, force: bool = False):
+        """
+        Re-reads the given projects (all by default) whose working tree changed
+        or whose index or HEAD moved since their last run, or all of them if force.
+        """
+        for root in (self._roots if roots is None else [os.path.normpath(r) for r in roots]):
+            if force:
+                self._dirty.add(root)
+            self._schedule(root)
+
+    def on_files_changed(self, change_set):
+        """Marks the projects a ChangeSet touches as changed and re-reads them."""
+        if change_set.overflowed:
+            self.refresh(force=True)
+            return
+        for root in self._roots:
+            prefix = root + os.sep
+            git_prefix = os.path.join(root, GIT_DIR) + os.sep
+            touched = [p for p in change_set.all_paths() if p.startswith(prefix)]
+            if not touched:
+                continue
+            # Changes inside .git only matter through the index and HEAD, which _schedule compares.
+            if any(not p.startswith(git_prefix) for p in touched):
+                self._dirty.add(root)
+            self._schedule(root)
+
+    def shutdown(self):
+        self._roots = []
+        self._pool.clear()
+        self._pool.waitForDone(3000)
+
+    def _schedule(self, root: str):
+        if root not in self._roots:
+            return
+        if root in self._running:
+            self._rerun.add(root)
+            return
+        fingerprint = repo_fingerprint(root)
+        if fingerprint is None:
+            self._dirty.discard(root)
+            if stale := self._statuses.pop(root, None):
+                self.statuses_changed.emit(dict.fromkeys(stale, None))
+            self._fingerprints.pop(root, None)
+            return
+        if root not in self._dirty and self._fingerprints.get(root) == fingerprint:
+            return
+        self._dirty.discard(root)
+        self._fingerprints[root] = fingerprint
+        worker = GitStatusWorker(root)
+        worker.signals.finished.connect(self._on_worker_finished)
+        self._running[root] = worker
+        self._pool.start(worker)
+
+    def _on_worker_finished(self, root: str, statuses: Optional[Dict[str, str]]):
+        self._running.pop(root, None)
+        if root not in self._roots:
+            return
+        if statuses is None:
+            # Try again on the next request instead of trusting this fingerprint.
+            self._fingerprints.pop(root, None)
+        else:
+            old = self._statuses.get(root, {})
+            delta = {path: status for path, status in statuses.items() if old.get(path) != status}
+            delta.update({path: None for path in old if path not in statuses})
+            self._statuses[root] = statuses
+            if delta:
+                self.statuses_changed.emit(delta)
+        if root in self._rerun:
+            self._rerun.discard(root)
+            self._schedule(root)
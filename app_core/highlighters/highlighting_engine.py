@@ -0,0 +1,352 @@
+# PuffinPyEditor/app_core/highlighters/highlighting_engine.py
+"""
+The shared, data-driven core behind the built-in syntax highlighters.
+
+A language is described by a LanguageGrammar: an ordered table of token
+rules, optional multi-line regions (block comments, triple-quoted strings),
+keyword tables and the formats its token kinds map to. The grammar compiles
+everything into one alternation that is scanned once per block, and caches
+the resulting spans per (incoming state, block text). Formats are built once
+per theme and shared by every editor using the same grammar.
+
+GrammarHighlighter also supports a lazy mode for very large documents. Only
+a priority window of blocks (the viewport plus a margin) is formatted
+immediately; every other block is left alone and formatted, top down, in
+time-sliced chunks whenever the event loop is idle. A window further down
+than that fill has reached first carries the end states of the blocks above
+it forward, so multi-line strings and comments still open it correctly.
+"""
+import re
+import time
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
+from PyQt6.QtCore import QTimer
+from PyQt6.QtGui import (QSyntaxHighlighter, QTextCharFormat, QColor, QFont,
+                         QTextBlock, QTextCursor)
+
+if TYPE_CHECKING:
+    from app_core.theme_manager import ThemeManager
+
+# A span is (start, length, kind); a lex result is a block's spans plus the
+# state it hands on to the next block.
+Span = Tuple[int, int, str]
+LexResult = Tuple[Tuple[Span, ...], int]
+
+# (theme color key without the "syntax." prefix, fallback color, style)
+# where style is one of None, "bold", "italic", "bold_italic" or "medium".
+FormatSpec = Tuple[str, str, Optional[str]]
+
+NORMAL_STATE = 0
+IDENTIFIER_PATTERN = r"[A-Za-z_][A-Za-z0-9_]*"
+_CALL_RE = re.compile(r"\s*\(")
+
+
+class LanguageGrammar:
+    """
+    Describes a language as data and lexes blocks of it in a single scan.
+
+    Alternation order is: regions, then token_rules in the given order, then
+    identifiers. When two alternatives match at the same position the first
+    one wins, so put longer or more specific rules first.
+
+    Identifiers are classified in this order: the keywords table, the word
+    following a definition keyword (e.g. the name after `def`), then
+    capitalised words as `type_kind` and words followed by `(` as
+    `call_kind` (or the other way round when types_before_calls is False).
+    """
+    MAX_CACHED_BLOCKS = 50000
+
+    def __init__(self, name: str, formats: Dict[str, FormatSpec],
+                 token_rules: List[Tuple[str, str]],
+                 regions: Optional[List[Tuple[str, str, str]]] = None,
+                 region_prefix: str = "",
+                 keywords: Optional[Dict[str, str]] = None,
+                 definition_keywords: Optional[Dict[str, str]] = None,
+                 identifier_pattern: Optional[str] = IDENTIFIER_PATTERN,
+                 type_kind: Optional[str] = None,
+                 call_kind: Optional[str] = None,
+                 types_before_calls: bool = True,
+                 flags: int = 0):
+        self.name = name
+        self.formats = formats
+        # Each region is (start literal, end literal, kind), optionally preceded
+        # by region_prefix (a pattern, e.g. Python's string prefixes). A block
+        # that ends inside region i hands on state i + 1.
+        self.regions = regions or []
+        self.keywords = keywords or {}
+        self.definition_keywords = definition_keywords or {}
+        self.type_kind = type_kind
+        self.call_kind = call_kind
+        self.types_before_calls = types_before_calls
+
+        alternatives = []
+        prefix = f"(?:{region_prefix})?" if region_prefix else ""
+        for index, (start_literal, _end, _kind) in enumerate(self.regions):
+            alternatives.append(f"(?P<r{index}>{prefix}{re.escape(start_literal)})")
+        self._rule_kinds: Dict[str, str] = {}
+        for index, (kind, pattern) in enumerate(token_rules):
+            self._rule_kinds[f"t{index}"] = kind
+            alternatives.append(f"(?P<t{index}>{pattern})")
+        if identifier_pattern:
+            alternatives.append(f"(?P<identifier>{identifier_pattern})")
+        self._master = re.compile("|".join(alternatives), flags)
+        self._span_cache: Dict[Tuple[int, str], LexResult] = {}
+
+    def lex(self, text: str, state: int) -> LexResult:
+        """Returns the cached spans for a block, lexing it on a cache miss."""
+        key = (state, text)
+        result = self._span_cache.get(key)
+        if result is None:
+            result = self._scan(text, state)
+            if len(self._span_cache) >= self.MAX_CACHED_BLOCKS:
+                # Evict the oldest quarter; dicts keep insertion order.
+                for stale in list(self._span_cache)[:self.MAX_CACHED_BLOCKS // 4]:
+                    del self._span_cache[stale]
+            self._span_cache[key] = result
+        return result
+
+    def clear_cache(self):
+        self._span_cache.clear()
+
+    def end_state(self, text: str, state: int) -> int:
+        """Returns only the state a block hands on, lexing as little as possible."""
+        if state <= 0:
+            if not any(start in text for start, _end, _kind in self.regions):
+                return NORMAL_STATE
+        elif self.regions[state - 1][1] not in text:
+            return state
+        return self.lex(text, state)[1]
+
+    def _scan(self, text: str, state: int) -> LexResult:
+        spans: List[Span] = []
+        length = len(text)
+        pos = 0
+
+        if 0 < state <= len(self.regions):
+            _start, end_literal, kind = self.regions[state - 1]
+            close = text.find(end_literal)
+            if close == -1:
+                return ((0, length, kind),) if length else (), state
+            pos = close + len(end_literal)
+            spans.append((0, pos, kind))
+
+        previous_word = ""
+        search = self._master.search
+        match = search(text, pos)
+        while match:
+            group = match.lastgroup
+            start, end = match.span()
+            if end == start:
+                # Guard against a rule that can match the empty string.
+                match = search(text, end + 1)
+                continue
+            if group == "identifier":
+                kind = self._classify(match.group(group), previous_word, text, end)
+                if kind:
+                    spans.append((start, end - start, kind))
+                previous_word = match.group(group)
+            elif group[0] == "r":
+                index = int(group[1:])
+                _start, end_literal, kind = self.regions[index]
+                close = text.find(end_literal, end)
+                if close == -1:
+                    spans.append((start, length - start, kind))
+                    return tuple(spans), index + 1
+                end = close + len(end_literal)
+                spans.append((start, end - start, kind))
+                previous_word = ""
+            else:
+                spans.append((start, end - start, self._rule_kinds[group]))
+                previous_word = ""
+            match = search(text, end)
+        return tuple(spans), NORMAL_STATE
+
+    def _classify(self, word: str, previous_word: str, text: str, end: int) -> Optional[str]:
+        kind = self.keywords.get(word)
+        if kind:
+            return kind
+        kind = self.definition_keywords.get(previous_word)
+        if kind:
+            return kind
+        is_type = self.type_kind and word[0].isupper()
+        if is_type and self.types_before_calls:
+            return self.type_kind
+        if self.call_kind and _CALL_RE.match(text, end):
+            return self.call_kind
+        if is_type:
+            return self.type_kind
+        return None
+
+
+# Formats are shared across editors: {(grammar name, theme id): (colors, formats)}
+_format_cache: Dict[Tuple[str, str], Tuple[Tuple[str, ...], Dict[str, QTextCharFormat]]] = {}
+
+
+def get_formats(grammar: LanguageGrammar, theme_manager: "ThemeManager") -> Dict[str, QTextCharFormat]:
+    """
+    Returns the QTextCharFormats for a grammar under the current theme,
+    building them only the first time a theme is seen. The resolved colors
+    are kept alongside so a theme edited in place is still picked up.
+    """
+    colors = theme_manager.current_theme_data.get("colors", {})
+    resolved = tuple(colors.get(f"syntax.{key}", fallback)
+                     for key, fallback, _style in grammar.formats.values())
+    cache_key = (grammar.name, theme_manager.current_theme_id)
+    cached = _format_cache.get(cache_key)
+    if cached and cached[0] == resolved:
+        return cached[1]
+
+    formats: Dict[str, QTextCharFormat] = {}
+    for (kind, (_key, _fallback, style)), color in zip(grammar.formats.items(), resolved):
+        fmt = QTextCharFormat()
+        fmt.setForeground(QColor(color))
+        if style in ("bold", "bold_italic"):
+            fmt.setFontWeight(QFont.Weight.Bold)
+        elif style == "medium":
+            fmt.setFontWeight(QFont.Weight.Medium)
+        if style in ("italic", "bold_italic"):
+            fmt.setFontItalic(True)
+        formats[kind] = fmt
+    _format_cache[cache_key] = (resolved, formats)
+    return formats
+
+
+class GrammarHighlighter(QSyntaxHighlighter):
+    """
+    Base class for highlighters driven by a LanguageGrammar. Subclasses only
+    need to set GRAMMAR.
+    """
+    GRAMMAR: LanguageGrammar = None
+    # How long one idle chunk of lazy highlighting may hold the UI thread.
+    LAZY_SLICE_SECONDS = 0.008
+
+    def __init__(self, parent_document, theme_manager: "ThemeManager"):
+        super().__init__(parent_document)
+        self.theme_manager = theme_manager
+        self.formats: Dict[str, QTextCharFormat] = {}
+        self._lazy = False
+        self._forced_block = -1  # The block rehighlightBlock() was called for, not the ones Qt moves on to
+        self._priority_range = (0, -1)
+        self._states_known_up_to = 0  # Blocks above this one hand on up-to-date states
+        self._fill_cursor: Optional[QTextCursor] = None
+        self._fill_timer = QTimer(self)
+        self._fill_timer.setInterval(0)
+        self._fill_timer.timeout.connect(self._fill_next_chunk)
+        self.initialize_formats_and_rules()
+
+    def initialize_formats_and_rules(self):
+        """Fetches the (shared) formats for the current theme."""
+        self.formats = get_formats(self.GRAMMAR, self.theme_manager)
+
+    @property
+    def is_lazy_highlighting(self) -> bool:
+        return self._lazy
+
+    @property
+    def _filled_up_to(self) -> int:
+        """The first block the idle fill has not formatted. A cursor, unlike a block number, follows edits above it."""
+        return self._fill_cursor.blockNumber() if self._fill_cursor is not None else 0
+
+    def begin_lazy_highlighting(self, first_block: int, last_block: int):
+        """
+        Switches to lazy mode before a large text is loaded or rehighlighted.
+        Blocks first_block..last_block are formatted immediately and the rest
+        of the document is filled in from the top while the UI is idle.
+        """
+        self._lazy = True
+        self._priority_range = (first_block, last_block)
+        self._states_known_up_to = 0
+        self._fill_cursor = None
+        self._fill_timer.start()
+
+    def highlight_blocks(self, first_block: int, last_block: int):
+        """
+        Makes blocks first_block..last_block the priority window and formats
+        any of them that lazy mode has not reached yet, e.g. after a scroll.
+        """
+        if not self._lazy or not self.document():
+            return
+        self._priority_range = (first_block, last_block)
+        block, number = self.document().findBlockByNumber(max(0, first_block)), max(0, first_block)
+        while block.isValid() and number <= last_block:
+            if number >= self._filled_up_to and not block.layout().formats():
+                self._rehighlight_now(block)
+            block, number = block.next(), number + 1
+
+    def _rehighlight_now(self, block: QTextBlock):
+        self._forced_block = block.blockNumber()
+        try:
+            self.rehighlightBlock(block)
+        finally:
+            self._forced_block = -1
+
+    def _carry_states(self, number: int):
+        """
+        Makes sure the blocks above block `number` hold their end states,
+        computing only those (no formatting) for any the fill has not reached.
+        """
+        start = max(self._filled_up_to, self._states_known_up_to)
+        if number < start:
+            return
+        if number > start:
+            block = self.document().findBlockByNumber(start)
+            state = block.previous().userState() if start else NORMAL_STATE
+            end_state = self.GRAMMAR.end_state
+            for _ in range(number - start):
+                state = end_state(block.text(), state if state >= 0 else NORMAL_STATE)
+                block.setUserState(state)
+                block = block.next()
+        self._states_known_up_to = number + 1  # The caller sets this block's state
+
+    def _fill_next_chunk(self):
+        doc = self.document()
+        if not self._lazy or doc is None:
+            self._fill_timer.stop()
+            return
+        if self._fill_cursor is None:
+            self._fill_cursor = QTextCursor(doc)
+        block = self._fill_cursor.block()
+        deadline = time.perf_counter() + self.LAZY_SLICE_SECONDS
+        # Blocks filled here are normally off-screen; keep the layout from
+        # asking the editor to repaint its whole viewport for each of them.
+        # Visible blocks are handled by highlight_blocks().
+        layout = doc.documentLayout()
+        layout.blockSignals(True)
+        try:
+            while block.isValid():
+                if not block.layout().formats():
+                    self._rehighlight_now(block)
+                block = block.next()
+                if time.perf_counter() >= deadline:
+                    break
+        finally:
+            layout.blockSignals(False)
+        if block.isValid():
+            self._fill_cursor.setPosition(block.position())
+        else:
+            self._lazy, self._fill_cursor = False, None
+            self._fill_timer.stop()
+
+    def highlightBlock(self, text: str):
+        if self._lazy:
+            number = self.currentBlock().blockNumber()
+            first, last = self._priority_range
+            if number >= self._filled_up_to and number != self._forced_block and not first <= number <= last:
+                # Outside the priority window and the filled prefix nothing is
+                # done, not even the state: leaving it unchanged also stops Qt
+                # from going on to the next block. The idle fill gets here later.
+                self._states_known_up_to = min(self._states_known_up_to, number)
+                return
+            self._carry_states(number)
+        incoming = self.previousBlockState()
+        if incoming < 0:
+            incoming = NORMAL_STATE
+        spans, state = self.GRAMMAR.lex(text, incoming)
+        formats = self.formats
+        for start, length, kind in spans:
+            self.setFormat(start, length, formats[kind])
+        self.setCurrentBlockState(state)
+
+    def rehighlight(self):
+        """Forces a re-highlight of the entire document on theme change."""
+        self.initialize_formats_and_rules()
+        super().rehighlight()
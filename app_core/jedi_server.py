@@ -0,0 +1,213 @@
+# PuffinPyEditor/app_core/jedi_server.py
+"""
+A long-lived Jedi process that answers completion, goto and signature
+requests for one project.
+
+CompletionManager starts one of these per open project and role, so Jedi's
+parsed-module caches stay warm across requests and a crash inside Jedi never
+takes the editor down. The script deliberately imports nothing from the
+application, only the standard library and Jedi.
+
+Protocol: one JSON object per line on stdin,
+    {"id": 7, "op": "complete" | "goto" | "signatures" | "docstring",
+     "source": "...", "line": 1, "col": 0, "path": "...", "name": "..."}
+answered by one JSON object per line on stdout,
+    {"id": 7, "result": ..., "error": null, "elapsed_ms": 3.2}
+Completions are sent without docstrings, which are by far the slowest part
+to compute for large namespaces. A "docstring" request with the same
+source and position plus a completion's name resolves one of them.
+Requests are read on a separate thread. A newer request for the same op
+supersedes older ones: queued ones are skipped and a running one stops at
+its next checkpoint. Either way the older request is answered with
+    {"id": 7, "cancelled": true}
+
+Run: python jedi_server.py <project path or ""> <interpreter for Jedi or "">
+"""
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+# Modules most Python files touch; parsing them up front makes the first
+# completion in a session as fast as the rest.
+PRELOAD_MODULES = ['builtins', 'os', 'sys', 're', 'typing', 'collections', 'json']
+MAX_CACHED_SCRIPTS = 16
+CANCEL_CHECK_EVERY = 25  # Completions serialized between checks for a superseding request
+
+
+class Cancelled(Exception):
+    """Raised inside a request handler once a newer request has superseded it."""
+
+
+def create_project(jedi, project_path: str, python_executable: str):
+    if project_path and os.path.isdir(project_path):
+        if python_executable:
+            return jedi.Project(path=project_path, environment_path=python_executable)
+        return jedi.Project(path=project_path)
+    home = os.path.expanduser("~")
+    if python_executable:
+        return jedi.Project(home, environment=jedi.create_environment(python_executable, safe=False))
+    return jedi.Project(home)
+
+
+def completion_to_dict(completion) -> dict:
+    return {'name': completion.name, 'type': completion.type, 'description': completion.description}
+
+
+def completions_to_dicts(completions, should_stop=lambda: False) -> list:
+    """Serializes completions, stopping early when asked."""
+    result = []
+    for index, completion in enumerate(completions):
+        if index % CANCEL_CHECK_EVERY == 0 and should_stop():
+            raise Cancelled()
+        result.append(completion_to_dict(completion))
+    return result
+
+
+def definition_to_dict(definition) -> dict:
+    return {'path': str(definition.module_path) if definition.module_path else '',
+            'line': -1 if definition.line is None else definition.line,
+            'col': -1 if definition.column is None else definition.column, 'name': definition.name}
+
+
+def signature_to_dict(signature) -> dict:
+    return {'name': signature.name, 'params': [p.description for p in signature.params],
+            'docstring': signature.docstring(raw=True), 'index': signature.index}
+
+
+class JediServer:
+    def __init__(self, jedi, project):
+        self.jedi = jedi
+        self.project = project
+        # The last Script per file. Completing and then looking up a definition
+        # in unchanged code reuses the same inference state.
+        self._scripts = {}
+        # The last completions by name, kept for "docstring" requests about them.
+        self._completions_key = None
+        self._completions = {}
+
+    def _script(self, source: str, path: str):
+        cached = self._scripts.get(path)
+        if cached and cached[0] == source:
+            return cached[1]
+        script = self.jedi.Script(code=source, path=path or None, project=self.project)
+        self._scripts.pop(path, None)
+        if len(self._scripts) >= MAX_CACHED_SCRIPTS:
+            del self._scripts[next(iter(self._scripts))]
+        self._scripts[path] = (source, script)
+        return script
+
+    def complete(self, request: dict, should_stop):
+        completions = self._script(request['source'], request['path']).complete(
+            line=request['line'], column=request['col'])
+        self._completions_key = (request['path'], request['line'], request['col'], request['source'])
+        self._completions = {completion.name: completion for completion in completions}
+        return completions_to_dicts(completions, should_stop)
+
+    def docstring(self, request: dict, should_stop):
+        if self._completions_key != (request['path'], request['line'], request['col'], request['source']):
+            self.complete(request, should_stop)
+        completion = self._completions.get(request['name'])
+        return completion.docstring(raw=True) if completion else ""
+
+    def goto(self, request: dict, should_stop):
+        definitions = self._script(request['source'], request['path']).goto(
+            line=request['line'], column=request['col'])
+        return definition_to_dict(definitions[0]) if definitions else None
+
+    def signatures(self, request: dict, should_stop):
+        signatures = self._script(request['source'], request['path']).get_signatures(
+            line=request['line'], column=request['col'])
+        return signature_to_dict(signatures[0]) if signatures else None
+
+    def handle(self, request: dict, should_stop=lambda: False) -> dict:
+        start = time.perf_counter()
+        reply = {'id': request.get('id'), 'result': None, 'error': None}
+        try:
+            handler = {'complete': self.complete, 'goto': self.goto, 'signatures': self.signatures,
+                       'docstring': self.docstring}.get(request.get('op'))
+            if handler is None:
+                raise ValueError(f"Unknown operation: {request.get('op')!r}")
+            reply['result'] = handler(request, should_stop)
+            if should_stop():
+                raise Cancelled()
+        except Cancelled:
+            return {'id': request.get('id'), 'cancelled': True}
+        except Exception as e:  # Jedi can raise almost anything on odd code; report it and keep serving.
+            reply['error'] = f"{type(e).__name__}: {e}"
+        reply['elapsed_ms'] = round((time.perf_counter() - start) * 1000, 2)
+        return reply
+
+
+class RequestQueue:
+    """Requests read from stdin by a background thread, tracking the newest id per op."""
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._requests = deque()
+        self._newest = {}
+        self._closed = False
+
+    def put(self, request: dict):
+        with self._condition:
+            self._newest[request.get('op')] = request.get('id')
+            self._requests.append(request)
+            self._condition.notify()
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+
+    def get(self):
+        """Blocks for the next request; None once stdin is closed and the queue drained."""
+        with self._condition:
+            while not self._requests and not self._closed:
+                self._condition.wait()
+            return self._requests.popleft() if self._requests else None
+
+    def is_superseded(self, request: dict) -> bool:
+        return self._newest.get(request.get('op')) != request.get('id')
+
+
+def read_requests(queue: RequestQueue):
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        try:
+            queue.put(json.loads(line))
+        except ValueError as e:
+            print(f"jedi_server: bad request: {e}", file=sys.stderr, flush=True)
+    queue.close()
+
+
+def write_reply(reply: dict):
+    sys.stdout.write(json.dumps(reply) + "\n")
+    sys.stdout.flush()
+
+
+def main(argv) -> int:
+    project_path = argv[1] if len(argv) > 1 else ""
+    python_executable = argv[2] if len(argv) > 2 else ""
+    sys.stdin.reconfigure(encoding='utf-8')
+    import jedi
+    server = JediServer(jedi, create_project(jedi, project_path, python_executable))
+    try:
+        jedi.preload_module(*PRELOAD_MODULES)
+    except Exception as e:
+        print(f"jedi_server: preload failed: {e}", file=sys.stderr, flush=True)
+    # Tells the client the caches are warm and requests will be served promptly.
+    write_reply({'id': None, 'ready': True})
+    queue = RequestQueue()
+    threading.Thread(target=read_requests, args=(queue,), daemon=True).start()
+    while (request := queue.get()) is not None:
+        if queue.is_superseded(request):
+            write_reply({'id': request.get('id'), 'cancelled': True})
+            continue
+        write_reply(server.handle(request, lambda: queue.is_superseded(request)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
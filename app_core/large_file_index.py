@@ -0,0 +1,213 @@
+# PuffinPyEditor/app_core/large_file_index.py
+"""
+Random access to the lines of files too large to load into an editor.
+
+The file is memory-mapped and never decoded as a whole. A background worker
+records the byte offset of every CHECKPOINT_LINES-th line start. To reach any
+line, a lookup jumps to the nearest checkpoint and skips at most
+CHECKPOINT_LINES - 1 newlines. The index therefore costs a few bytes per
+hundred lines, even for files with hundreds of millions of lines.
+"""
+import codecs
+import mmap
+import os
+import re
+from array import array
+from bisect import bisect_right
+from typing import List, Optional, Tuple
+from PyQt6.QtCore import QObject, QRunnable, pyqtSignal
+
+from utils.logger import log
+
+CHECKPOINT_LINES = 64
+# One match per CHECKPOINT_LINES complete lines, so the scan stays in C. Only the
+# last match, ending on the file's last newline, may hold fewer lines.
+_CHECKPOINT_RE = re.compile(rb"(?:[^\n]*\n){1,%d}" % CHECKPOINT_LINES)
+# BOMs of encodings whose newline is a single b'\n' byte.
+_ASCII_COMPATIBLE_BOMS = [(b'\xef\xbb\xbf', 'utf-8')]
+_UNSUPPORTED_BOMS = (b'\xff\xfe', b'\xfe\xff')
+
+
+class LargeFileIndex:
+    """
+    A memory-mapped file and its checkpoint line index. Reads are safe while
+    LineIndexWorker is still building it; line_count() then only covers the
+    lines indexed so far.
+    """
+    MAX_LINE_CHARS = 10000  # Longer lines are cut when read for display
+    SAMPLE_BYTES = 65536  # How much of a BOM-less file is decoded to choose between UTF-8 and Latin-1
+    SEARCH_WINDOW_BYTES = 1 << 20  # Backward searches scan this much at a time
+
+    def __init__(self, filepath: str):
+        self.filepath = filepath
+        self._file = open(filepath, 'rb')
+        self.size = os.fstat(self._file.fileno()).st_size
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else b''
+        head = bytes(self._map[:3])
+        if head.startswith(_UNSUPPORTED_BOMS):
+            self.close()
+            raise ValueError("UTF-16 files cannot be opened in the large file viewer.")
+        self.encoding, self._data_start = 'utf-8', 0
+        for bom, encoding in _ASCII_COMPATIBLE_BOMS:
+            if head.startswith(bom): self.encoding, self._data_start = encoding, len(bom)
+        if not self._data_start:
+            sample = bytes(self._map[:self.SAMPLE_BYTES])
+            try:
+                sample.decode('utf-8')
+            except UnicodeDecodeError as e:
+                # A multi-byte character cut off by the end of the sample is not an error.
+                if e.start < len(sample) - 3: self.encoding = 'latin-1'
+        self._checkpoints = array('Q', [self._data_start])
+        self._total_lines: Optional[int] = None
+
+    @property
+    def is_complete(self) -> bool:
+        return self._total_lines is not None
+
+    def line_count(self) -> int:
+        if self._total_lines is not None: return self._total_lines
+        return (len(self._checkpoints) - 1) * CHECKPOINT_LINES
+
+    def build(self, should_stop=lambda: False, progress=None, report_every: int = 16384):
+        """
+        Builds the index; called from LineIndexWorker. Returns False if stopped
+        early. The scan ends at the last newline, so every attempt to match
+        succeeds and the regex never rescans the remaining text from each
+        position of a tail too short for a full match.
+        """
+        checkpoints, data = self._checkpoints, self._map
+        end = data.rfind(b'\n', self._data_start) + 1
+        match = None
+        for count, match in enumerate(_CHECKPOINT_RE.finditer(data, self._data_start, end), 1):
+            checkpoints.append(match.end())
+            if count % report_every == 0:
+                if should_stop(): return False
+                if progress: progress(checkpoints[-1])
+        if match is not None and data[match.start():match.end()].count(b'\n') < CHECKPOINT_LINES:
+            checkpoints.pop()
+        tail = data[checkpoints[-1]:]
+        self._total_lines = (len(checkpoints) - 1) * CHECKPOINT_LINES + tail.count(b'\n') + 1
+        return True
+
+    def _line_start(self, line: int) -> int:
+        checkpoint, remainder = divmod(line, CHECKPOINT_LINES)
+        pos, data = self._checkpoints[checkpoint], self._map
+        for _ in range(remainder):
+            pos = data.find(b'\n', pos) + 1
+        return pos
+
+    def _decode(self, raw: bytes) -> str:
+        return raw.rstrip(b'\r').decode(self.encoding, errors='replace')
+
+    def lines(self, first: int, count: int) -> List[str]:
+        """Returns up to count lines starting at line first (0-based)."""
+        first, last = max(0, first), min(first + count, self.line_count())
+        if first >= last or not self.size: return [''] if first == 0 and not self.size else []
+        result, data, limit = [], self._map, self.MAX_LINE_CHARS * 4
+        pos = self._line_start(first)
+        for _ in range(last - first):
+            end = data.find(b'\n', pos)
+            stop = self.size if end == -1 else end
+            result.append(self._decode(data[pos:min(stop, pos + limit)])[:self.MAX_LINE_CHARS])
+            if end == -1: break
+            pos = end + 1
+        return result
+
+    def line(self, line: int) -> str:
+        found = self.lines(line, 1)
+        return found[0] if found else ''
+
+    def indexed_bytes(self) -> int:
+        """How far into the file line numbers are known: all of it once indexing is complete."""
+        return self.size if self._total_lines is not None else self._checkpoints[-1]
+
+    def _char_count(self, start: int, end: int) -> int:
+        """How many characters the bytes from start to end decode to, a window at a time."""
+        decoder, count = codecs.getincrementaldecoder(self.encoding)(errors='replace'), 0
+        for pos in range(start, end, self.SEARCH_WINDOW_BYTES):
+            count += len(decoder.decode(self._map[pos:min(end, pos + self.SEARCH_WINDOW_BYTES)]))
+        return count + len(decoder.decode(b'', final=True))
+
+    def position_of_offset(self, offset: int) -> Tuple[int, int]:
+        """Converts a byte offset inside the indexed bytes into (line, column), both 0-based."""
+        checkpoint = bisect_right(self._checkpoints, offset) - 1
+        pos, line, data = self._checkpoints[checkpoint], checkpoint * CHECKPOINT_LINES, self._map
+        # Fewer than CHECKPOINT_LINES newlines to skip; the lines themselves may be any length.
+        while (end := data.find(b'\n', pos, offset)) != -1:
+            pos, line = end + 1, line + 1
+        return line, self._char_count(pos, offset)
+
+    def find(self, text: str, start: Tuple[int, int], case_sensitive: bool = False,
+             backwards: bool = False) -> Optional[Tuple[int, int, int]]:
+        """
+        Searches from start (line, column) and returns (line, column, length)
+        of the next match, or None. The search runs on the raw bytes, so
+        case-insensitive matching only folds ASCII letters. While the index
+        is being built, only matches starting in the indexed lines are found.
+        """
+        if not text or not self.size: return None
+        needle = text.encode(self.encoding, errors='replace')
+        pattern = re.compile(re.escape(needle), 0 if case_sensitive else re.IGNORECASE)
+        line, column = start
+        line_start = self._line_start(min(line, max(0, self.line_count() - 1)))
+        offset = line_start + len(self.line(line)[:column].encode(self.encoding, errors='replace'))
+        if backwards:
+            match = self._search_backwards(pattern, len(needle), offset)
+        else:
+            match = pattern.search(self._map, offset, self.indexed_bytes() + len(needle) - 1)
+        if match is None: return None
+        found_line, found_column = self.position_of_offset(match.start())
+        return found_line, found_column, len(text)
+
+    def _search_backwards(self, pattern, needle_length: int, offset: int):
+        window = max(self.SEARCH_WINDOW_BYTES, needle_length * 4)
+        end = offset
+        while True:
+            begin = max(self._data_start, end - window)
+            last = None
+            for last in pattern.finditer(self._map, begin, end): pass
+            if last is not None or begin == self._data_start: return last
+            # Overlap so a match straddling the window edge is found in the next window.
+            end = begin + needle_length - 1
+
+    def close(self):
+        if isinstance(self._map, mmap.mmap): self._map.close()
+        self._map = b''
+        self._file.close()
+
+
+class LineIndexWorkerSignals(QObject):
+    """Defines signals available from a running LineIndexWorker."""
+    progress = pyqtSignal(int)  # bytes indexed so far
+    finished = pyqtSignal(int)  # total line count, or -1 if cancelled or failed
+
+
+class LineIndexWorker(QRunnable):
+    """
+    A QRunnable worker that builds a LargeFileIndex in the background. The
+    scan holds the file mapping, so a worker cancelled by a closing viewer
+    closes the index itself once the scan has stopped.
+    """
+    def __init__(self, index: LargeFileIndex):
+        super().__init__()
+        self.index = index
+        self.signals = LineIndexWorkerSignals()
+        self.is_cancelled = False
+        self.is_done = False
+
+    def run(self):
+        try:
+            completed = self.index.build(lambda: self.is_cancelled, self.signals.progress.emit)
+        except (ValueError, OSError) as e:
+            log.warning(f"Line indexing of {self.index.filepath} stopped: {e}")
+            completed = False
+        self.is_done = True
+        if self.is_cancelled:
+            self.index.close()
+            return
+        if completed:
+            log.info(f"Indexed {self.index.line_count()} lines of {self.index.filepath}")
+        self.signals.finished.emit(self.index.line_count() if completed else -1)
+
+    def cancel(self):
+        self.is_cancelled = True
@@ -0,0 +1,208 @@
+# PuffinPyEditor/app_core/lint_engine.py
+"""
+flake8 run in-process, and the persistent per-file cache that lets a
+project lint only re-check files that changed.
+
+Nothing here imports Qt. lint_files_in_worker runs in ProcessPoolExecutor
+children, each of which loads flake8 once per config and keeps it for
+every later batch it is handed.
+"""
+import configparser
+import hashlib
+import json
+import logging
+import os
+from typing import Dict, List, Optional, Tuple
+
+from utils.logger import log, get_app_data_path
+
+LINT_CACHE_FILE = os.path.join(get_app_data_path(), "lint_cache.json")
+# Files flake8 reads its options from, in the order it looks for them.
+FLAKE8_CONFIG_FILES = ("setup.cfg", "tox.ini", ".flake8")
+
+
+class InProcessFlake8:
+    """
+    flake8 loaded once into this process. Option parsing, config discovery
+    and plugin loading happen when it is created; each lint afterwards only
+    runs the loaded checkers over the given source, so the editor's buffer
+    is checked as it is, unsaved changes included. With no config_path,
+    flake8 looks for its config from the working directory as usual.
+    Raises ImportError if flake8 is not importable here.
+    """
+    def __init__(self, config_path: Optional[str] = None):
+        from flake8 import checker, processor
+        from flake8.main.application import Application
+
+        class BufferFileChecker(checker.FileChecker):
+            """Checks lines handed to it instead of reading the file."""
+            def __init__(self, *, lines: List[str], **kwargs):
+                self._lines = lines
+                super().__init__(**kwargs)
+
+            def _make_processor(self):
+                return processor.FileProcessor(self.filename, self.options, lines=self._lines)
+
+        self._checker_class = BufferFileChecker
+        self._app = Application()
+        # -qq selects flake8's silent formatter: results are collected below, never printed.
+        self._app.initialize(["-qq"] + (["--config", config_path] if config_path else []))
+
+    def discover(self, path: str) -> List[str]:
+        """The Python files under path that flake8 would check, honouring its exclude options."""
+        from flake8.discover_files import expand_paths
+        options = self._app.options
+        return [os.path.normpath(os.path.abspath(found)) for found in expand_paths(
+            paths=[path], stdin_display_name=options.stdin_display_name,
+            filename_patterns=options.filename, exclude=options.exclude)]
+
+    def would_discover(self, project_path: str, filepath: str) -> bool:
+        """Whether discover(project_path) would include filepath, without walking the project."""
+        from flake8 import utils
+        options, logger = self._app.options, logging.getLogger("flake8.discover_files")
+        relative = os.path.relpath(filepath, project_path)
+        if relative == os.curdir or relative.startswith(os.pardir + os.sep):
+            return False
+        current = project_path
+        for part in relative.split(os.sep):
+            current = os.path.join(current, part)
+            if utils.matches_filename(current, patterns=options.exclude,
+                                      log_message='"%(path)s" has %(whether)sbeen excluded', logger=logger):
+                return False
+        return utils.fnmatch(filepath, options.filename)
+
+    def lint(self, filepath: str, source: str) -> List[Dict]:
+        file_checker = self._checker_class(
+            lines=source.splitlines(keepends=True), filename=filepath,
+            plugins=self._app.plugins.checkers, options=self._app.options)
+        _, results, _ = file_checker.run_checks()
+        style_guide = self._app.guide.style_guide_for(filepath)
+        problems = []
+        for code, line, col, text, physical_line in sorted(results, key=lambda r: (r[1], r[2])):
+            # handle_error applies select/ignore, per-file ignores and noqa comments.
+            if style_guide.handle_error(code, filepath, line, col, text, physical_line):
+                problems.append({"line": line, "col": (col or 0) + 1, "code": code, "description": text})
+        return problems
+
+
+def find_flake8_config(project_path: str) -> Optional[str]:
+    """The first of a project's root config files with a [flake8] section, as flake8 would pick it."""
+    for name in FLAKE8_CONFIG_FILES:
+        path = os.path.join(project_path, name)
+        if not os.path.isfile(path):
+            continue
+        parser = configparser.RawConfigParser()
+        try:
+            parser.read(path, encoding='utf-8')
+        except (configparser.Error, UnicodeDecodeError):
+            continue
+        if parser.has_section("flake8"):
+            return path
+    return None
+
+
+def config_fingerprint(config_path: Optional[str]) -> str:
+    """Changes whenever cached results could be wrong: another flake8 or config."""
+    import flake8
+    digest = hashlib.sha1(flake8.__version__.encode())
+    if config_path:
+        try:
+            with open(config_path, 'rb') as f:
+                digest.update(f.read())
+        except OSError:
+            pass
+    return digest.hexdigest()
+
+
+def read_and_hash(filepath: str) -> Tuple[str, str]:
+    """Returns (text, content hash) of a source file."""
+    with open(filepath, 'rb') as f:
+        data = f.read()
+    return data.decode('utf-8', errors='replace'), hashlib.sha1(data).hexdigest()
+
+
+_worker_linters: Dict[Optional[str], InProcessFlake8] = {}
+
+
+def lint_files_in_worker(config_path: Optional[str], filepaths: List[str]) -> Dict[str, Tuple[str, List[Dict]]]:
+    """Process pool entry point: {path: (content hash, problems)} for a batch of files."""
+    if (linter := _worker_linters.get(config_path)) is None:
+        linter = _worker_linters[config_path] = InProcessFlake8(config_path)
+    results = {}
+    for filepath in filepaths:
+        try:
+            source, digest = read_and_hash(filepath)
+            results[filepath] = (digest, linter.lint(filepath, source))
+        except OSError:
+            continue  # Deleted or unreadable since it was discovered
+    return results
+
+
+class LintCache:
+    """
+    Lint results per file, kept across sessions in LINT_CACHE_FILE. An entry
+    is reused while the file's size and mtime are unchanged; if they changed
+    but the content hash did not (a touch, a checkout), it is reused too.
+    Every entry also records the config fingerprint it was made under.
+    """
+    MAX_ENTRIES = 50000
+
+    def __init__(self, path: str = LINT_CACHE_FILE):
+        self.path = path
+        self._entries: Dict[str, dict] = {}
+        self._dirty = False
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                if isinstance(data := json.load(f), dict):
+                    self._entries = data
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            log.warning(f"Ignoring unreadable lint cache {path}: {e}")
+
+    def lookup(self, filepath: str, stat: os.stat_result, fingerprint: str) -> Optional[List[Dict]]:
+        entry = self._entries.get(filepath)
+        if (entry and entry['config'] == fingerprint and entry['size'] == stat.st_size
+                and entry['mtime_ns'] == stat.st_mtime_ns):
+            return entry['problems']
+        return None
+
+    def lookup_by_hash(self, filepath: str, stat: os.stat_result, fingerprint: str,
+                       digest: str) -> Optional[List[Dict]]:
+        entry = self._entries.get(filepath)
+        if entry and entry['config'] == fingerprint and entry['hash'] == digest:
+            entry['size'], entry['mtime_ns'] = stat.st_size, stat.st_mtime_ns
+            self._dirty = True
+            return entry['problems']
+        return None
+
+    def store(self, filepath: str, stat: os.stat_result, fingerprint: str, digest: str, problems: List[Dict]):
+        self._entries.pop(filepath, None)
+        self._entries[filepath] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'hash': digest,
+                                   'config': fingerprint, 'problems': problems}
+        while len(self._entries) > self.MAX_ENTRIES:
+            del self._entries[next(iter(self._entries))]
+        self._dirty = True
+
+    def forget_under(self, paths: List[str]) -> List[str]:
+        """Drops the entries for these files and everything below these folders; returns the files dropped."""
+        prefixes = tuple(path + os.sep for path in paths)
+        targets = set(paths)
+        forgotten = [path for path in self._entries if path in targets or path.startswith(prefixes)]
+        for path in forgotten:
+            del self._entries[path]
+        self._dirty = self._dirty or bool(forgotten)
+        return forgotten
+
+    def save(self):
+        if not self._dirty:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            temp_path = self.path + ".tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._entries, f)
+            os.replace(temp_path, self.path)
+            self._dirty = False
+        except OSError as e:
+            log.error(f"Could not save lint cache {self.path}: {e}")
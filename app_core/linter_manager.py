@@ -3,9 +3,17 @@ import subprocess
 import os
 import sys
 import shutil
-from typing import List, Dict, Optional
+import time
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from statistics import median
+from typing import Deque, Iterator, List, Dict, Optional, Set
 from PyQt6.QtCore import QObject, QThread, pyqtSignal
 from utils.logger import log
+from .file_watcher import ChangeSet
+from .lint_engine import (FLAKE8_CONFIG_FILES, InProcessFlake8, LintCache, config_fingerprint, find_flake8_config,
+                          lint_files_in_worker, read_and_hash)
 
 # Use a very unlikely string as a delimiter
 SAFE_DELIMITER = "|||PUFFIN_LINT|||"
@@ -15,27 +23,82 @@ class LinterRunner(QObject):
     """
     A worker QObject that runs flake8 in a separate thread to avoid
     blocking the main UI.
+
+    Project lints are incremental: files whose results are in the LintCache
+    come back without being checked, and changed files are linted across a
+    process pool when there are enough of them to be worth it. Results are
+    streamed through project_lint_partial_results as batches finish, before
+    project_lint_results_ready delivers the whole set.
     """
+    POOL_MIN_FILES = 8  # Fewer changed files than this are linted on this thread
+    BATCHES_PER_WORKER = 4
+    MAX_BATCH_FILES = 8  # Small batches so the first results arrive quickly
     lint_results_ready = pyqtSignal(list)
+    buffer_lint_finished = pyqtSignal(int, list)  # request id, problems
     project_lint_results_ready = pyqtSignal(dict)
+    project_lint_partial_results = pyqtSignal(dict)  # path -> problems, an empty list for a clean file
+    project_lint_progress = pyqtSignal(int, int)  # files done, files total
     error_occurred = pyqtSignal(str)
 
+    def __init__(self):
+        super().__init__()
+        self.latest_buffer_request = 0  # Set by LinterManager; older buffer lints are skipped
+        self._flake8: Optional[InProcessFlake8] = None
+        self._flake8_failed = False
+        self._project_linters: Dict[Optional[str], InProcessFlake8] = {}
+        self._cache: Optional[LintCache] = None
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_workers = 0
+
+    def _in_process_flake8(self) -> Optional[InProcessFlake8]:
+        if self._flake8 is None and not self._flake8_failed:
+            try:
+                start = time.perf_counter()
+                self._flake8 = InProcessFlake8()
+                log.info(f"Loaded flake8 in-process in {(time.perf_counter() - start) * 1000:.0f} ms")
+            except ImportError:
+                log.warning("flake8 cannot be imported; linting will run the flake8 executable instead.")
+                self._flake8_failed = True
+            except (Exception, SystemExit) as e:
+                log.error(f"Could not load flake8 in-process: {e}", exc_info=True)
+                self._flake8_failed = True
+        return self._flake8
+
+    def run_linter_on_buffer(self, request_id: int, filepath: str, source: str):
+        """Lints unsaved editor text in-process, falling back to linting the file on disk."""
+        if request_id != self.latest_buffer_request:
+            return  # A newer edit has already asked for another lint
+        if (linter := self._in_process_flake8()) is None:
+            if (results := self._lint_file_with_executable(filepath)) is not None:
+                self.buffer_lint_finished.emit(request_id, results)
+            return
+        try:
+            results = linter.lint(filepath, source)
+        except Exception as e:
+            log.error(f"Exception while linting {filepath} in-process: {e}", exc_info=True)
+            results = []
+        self.buffer_lint_finished.emit(request_id, results)
+
     def _find_flake8_executable(self) -> Optional[str]:
         """Finds the path to the flake8 executable."""
         return shutil.which("flake8")
 
     def run_linter_on_file(self, filepath: str):
         """Runs flake8 on a single file and emits the results."""
+        if (results := self._lint_file_with_executable(filepath)) is not None:
+            self.lint_results_ready.emit(results)
+
+    def _lint_file_with_executable(self, filepath: str) -> Optional[List[Dict]]:
+        """Runs the flake8 executable on a saved file. Returns None if it is missing."""
         if not filepath or not os.path.exists(filepath):
-            self.lint_results_ready.emit([])
-            return
+            return []
 
         flake8_executable = self._find_flake8_executable()
         if not flake8_executable:
             msg = "'flake8' executable not found. Please install it."
             log.error(f"Linter error: {msg}")
             self.error_occurred.emit(msg)
-            return
+            return None
 
         command = [flake8_executable, filepath,
                    "--format=%(row)d:%(col)d:%(code)s:%(text)s"]
@@ -56,15 +119,176 @@ class LinterRunner(QObject):
             if stderr:
                 log.error(f"Linter stderr for {filepath}: {stderr.strip()}")
 
-            results = self._parse_flake8_file_output(stdout)
-            self.lint_results_ready.emit(results)
+            return self._parse_flake8_file_output(stdout)
         except Exception as e:
             log.error(f"Exception while running flake8 on file: {e}",
                       exc_info=True)
-            self.lint_results_ready.emit([])
+            return []
 
     def run_linter_on_project(self, project_path: str):
         """Runs flake8 recursively on a project path and emits the results."""
+        self._run_project_lint(project_path, None)
+
+    def run_linter_on_files(self, project_path: str, filepaths: list, publish: bool = True):
+        """
+        Like run_linter_on_project, for only some files of the project. Unless
+        publish is set, only project_lint_results_ready reports the results.
+        """
+        self._run_project_lint(project_path, filepaths, publish)
+
+    def _run_project_lint(self, project_path: str, filepaths: Optional[List[str]], publish: bool = True):
+        if filepaths is not None and not filepaths:
+            self.project_lint_results_ready.emit({})
+            return
+        start = time.perf_counter()
+        try:
+            results = self._lint_incrementally(project_path, filepaths, publish)
+        except Exception as e:
+            log.error(f"Exception while linting project in-process: {e}", exc_info=True)
+            results = None
+        if results is None:
+            self._lint_project_with_executable(project_path, filepaths, publish)
+            return
+        log.info(f"Linted project {project_path} in {(time.perf_counter() - start) * 1000:.0f} ms")
+        self.project_lint_results_ready.emit({path: problems for path, problems in results.items() if problems})
+
+    def run_linter_on_changes(self, project_path: str, changed: list, deleted: list, relint_all: bool):
+        """
+        Brings a linted project's results up to date with files changed on
+        disk: deleted files are dropped from the cache and reported clean,
+        changed files flake8 would check are linted again. relint_all
+        re-checks the whole project, as a changed flake8 config requires.
+        """
+        if self._cache is None:
+            self._cache = LintCache()
+        gone = self._cache.forget_under(deleted) + [path for path in deleted if path.endswith(('.py', '.pyw'))]
+        if gone:
+            self._cache.save()
+            self.project_lint_partial_results.emit({path: [] for path in gone})
+        config_path = find_flake8_config(project_path)
+        relint_all = relint_all or any(os.path.dirname(path) == project_path and
+                                       os.path.basename(path) in FLAKE8_CONFIG_FILES for path in changed + deleted)
+        if not (changed or relint_all) or (linter := self._project_linter(config_path)) is None:
+            return
+        filepaths = None if relint_all else [path for path in changed if linter.would_discover(project_path, path)]
+        if filepaths is not None and not filepaths:
+            return
+        try:
+            self._lint_incrementally(project_path, filepaths)
+        except Exception as e:
+            log.error(f"Exception while re-linting changed files of {project_path}: {e}", exc_info=True)
+
+    def _lint_incrementally(self, project_path: str, filepaths: Optional[List[str]],
+                            publish: bool = True) -> Optional[Dict[str, List[Dict]]]:
+        """
+        Lints a project or some of its files through the cache. None if flake8
+        cannot be loaded. Partial results and progress are only streamed if
+        publish is set.
+        """
+        config_path = find_flake8_config(project_path)
+        if (linter := self._project_linter(config_path)) is None:
+            return None
+        if self._cache is None:
+            self._cache = LintCache()
+        fingerprint = config_fingerprint(config_path)
+        if filepaths is None:
+            filepaths = linter.discover(project_path)
+        results, changed = {}, {}
+        for path in map(os.path.normpath, filepaths):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if (problems := self._cache.lookup(path, stat, fingerprint)) is not None:
+                results[path] = problems
+                continue
+            try:
+                _, digest = read_and_hash(path)
+            except OSError:
+                continue
+            if (problems := self._cache.lookup_by_hash(path, stat, fingerprint, digest)) is not None:
+                results[path] = problems
+            else:
+                changed[path] = stat
+        total = len(results) + len(changed)
+        if publish:
+            self.project_lint_partial_results.emit(dict(results))
+            self.project_lint_progress.emit(len(results), total)
+        if changed:
+            log.info(f"Linting {len(changed)} changed of {total} files.")
+            for batch in self._lint_changed(linter, config_path, list(changed)):
+                for path, (digest, problems) in batch.items():
+                    self._cache.store(path, changed[path], fingerprint, digest, problems)
+                    results[path] = problems
+                if publish:
+                    self.project_lint_partial_results.emit({path: problems for path, (_, problems) in batch.items()})
+                    self.project_lint_progress.emit(len(results), total)
+        self._cache.save()
+        return results
+
+    def _project_linter(self, config_path: Optional[str]) -> Optional[InProcessFlake8]:
+        if self._flake8_failed:
+            return None
+        if (linter := self._project_linters.get(config_path)) is None:
+            try:
+                linter = self._project_linters[config_path] = InProcessFlake8(config_path)
+            except ImportError:
+                log.warning("flake8 cannot be imported; linting will run the flake8 executable instead.")
+                self._flake8_failed = True
+            except (Exception, SystemExit) as e:
+                log.error(f"Could not load flake8 in-process for config {config_path}: {e}")
+                return None
+        return linter
+
+    def _lint_changed(self, linter: InProcessFlake8, config_path: Optional[str],
+                      paths: List[str]) -> Iterator[Dict[str, tuple]]:
+        """
+        Yields batches of {path: (content hash, problems)} as they finish,
+        sharded across the process pool if there are enough files.
+        """
+        done = set()
+        if len(paths) >= self.POOL_MIN_FILES and (pool := self._process_pool()):
+            size = max(1, min(self.MAX_BATCH_FILES,
+                              -(-len(paths) // (self._pool_workers * self.BATCHES_PER_WORKER))))
+            try:
+                futures = [pool.submit(lint_files_in_worker, config_path, paths[i:i + size])
+                           for i in range(0, len(paths), size)]
+                for future in as_completed(futures):
+                    batch = future.result()
+                    done.update(batch)
+                    yield batch
+            except Exception as e:
+                log.error(f"Lint process pool failed, linting on this thread instead: {e}")
+                self.shutdown_pool()
+        batch = {}
+        for path in paths:
+            if path in done:
+                continue
+            try:
+                source, digest = read_and_hash(path)
+            except OSError:
+                continue
+            batch[path] = (digest, linter.lint(path, source))
+            if len(batch) == self.MAX_BATCH_FILES:
+                yield batch
+                batch = {}
+        if batch:
+            yield batch
+
+    def _process_pool(self) -> Optional[ProcessPoolExecutor]:
+        # A frozen build would start copies of the whole application as workers.
+        if self._pool is None and not getattr(sys, 'frozen', False):
+            self._pool_workers = max(1, (os.cpu_count() or 2) - 1)
+            self._pool = ProcessPoolExecutor(max_workers=self._pool_workers,
+                                             mp_context=multiprocessing.get_context("spawn"))
+        return self._pool
+
+    def shutdown_pool(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def _lint_project_with_executable(self, project_path: str, filepaths: Optional[List[str]], publish: bool = True):
         flake8_executable = self._find_flake8_executable()
         if not flake8_executable:
             msg = "'flake8' executable not found. Cannot lint project."
@@ -76,7 +300,7 @@ class LinterRunner(QObject):
         format_str = (f"--format=%(path)s{SAFE_DELIMITER}%(row)d"
                       f"{SAFE_DELIMITER}%(col)d{SAFE_DELIMITER}%(code)s"
                       f"{SAFE_DELIMITER}%(text)s")
-        command = [flake8_executable, project_path, format_str]
+        command = [flake8_executable, *(filepaths if filepaths is not None else [project_path]), format_str]
         log.info(f"Running linter on project: {project_path}")
 
         try:
@@ -96,6 +320,8 @@ class LinterRunner(QObject):
                 )
 
             results = self._parse_flake8_project_output(stdout, project_path)
+            if publish:
+                self.project_lint_partial_results.emit(results)
             self.project_lint_results_ready.emit(results)
         except Exception as e:
             log.error(f"Exception while running flake8 on project: {e}",
@@ -150,14 +376,22 @@ class LinterRunner(QObject):
 class LinterManager(QObject):
     """
     Manages linting operations by delegating to a LinterRunner on a
-    separate thread.
+    separate thread. Only the newest buffer lint is run and reported, and
+    the time from each lint_buffer() call to its results is recorded.
     """
+    MAX_LATENCY_SAMPLES = 200
+
     lint_results_ready = pyqtSignal(list)
     project_lint_results_ready = pyqtSignal(dict)
+    project_lint_partial_results = pyqtSignal(dict)
+    project_lint_progress = pyqtSignal(int, int)
     error_occurred = pyqtSignal(str)
 
     _request_file_lint = pyqtSignal(str)
+    _request_buffer_lint = pyqtSignal(int, str, str)
     _request_project_lint = pyqtSignal(str)
+    _request_files_lint = pyqtSignal(str, list, bool)
+    _request_changes_lint = pyqtSignal(str, list, list, bool)
 
     def __init__(self, parent: Optional[QObject] = None):
         super().__init__(parent)
@@ -167,25 +401,81 @@ class LinterManager(QObject):
 
         # Connect signals
         self._request_file_lint.connect(self.runner.run_linter_on_file)
+        self._request_buffer_lint.connect(self.runner.run_linter_on_buffer)
+        self.runner.buffer_lint_finished.connect(self._on_buffer_lint_finished)
         self._request_project_lint.connect(self.runner.run_linter_on_project)
+        self._request_files_lint.connect(self.runner.run_linter_on_files)
+        self._request_changes_lint.connect(self.runner.run_linter_on_changes)
         self.runner.lint_results_ready.connect(self.lint_results_ready)
         self.runner.project_lint_results_ready.connect(
             self.project_lint_results_ready
         )
+        self.runner.project_lint_partial_results.connect(self.project_lint_partial_results)
+        self.runner.project_lint_progress.connect(self.project_lint_progress)
         self.runner.error_occurred.connect(self.error_occurred)
 
         self.thread.start()
+        self._buffer_request_id = 0
+        self._buffer_requested_at = 0.0
+        self._latencies: Deque[float] = deque(maxlen=self.MAX_LATENCY_SAMPLES)
+        self._linted_projects: Set[str] = set()  # Kept up to date as their files change on disk
 
     def lint_file(self, filepath: str):
         """Requests a lint for a single file."""
         self._request_file_lint.emit(filepath)
 
+    def lint_buffer(self, filepath: str, source: str):
+        """Requests a lint of a file's current editor text, which need not be saved."""
+        self._buffer_request_id += 1
+        self._buffer_requested_at = time.perf_counter()
+        self.runner.latest_buffer_request = self._buffer_request_id
+        self._request_buffer_lint.emit(self._buffer_request_id, filepath, source)
+
+    def _on_buffer_lint_finished(self, request_id: int, results: list):
+        if request_id != self._buffer_request_id:
+            return
+        self._latencies.append((time.perf_counter() - self._buffer_requested_at) * 1000)
+        self.lint_results_ready.emit(results)
+
+    def get_latency_stats(self) -> Dict[str, float]:
+        """Request-to-results time of recent buffer lints, in milliseconds."""
+        if not self._latencies:
+            return {}
+        samples = sorted(self._latencies)
+        return {'count': len(samples), 'p50_ms': round(median(samples), 2),
+                'p95_ms': round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 2),
+                'max_ms': round(samples[-1], 2)}
+
     def lint_project(self, project_path: str):
         """Requests a lint for an entire project directory."""
+        self._linted_projects.add(os.path.normpath(project_path))
         self._request_project_lint.emit(project_path)
 
+    def lint_files(self, project_path: str, filepaths: List[str], publish: bool = True):
+        """
+        Requests a lint for some files of a project; results arrive like a
+        project lint's. A lint with publish unset is for the caller alone: it
+        only emits project_lint_results_ready, so the Problems panel and the
+        status bar are left alone, and its project is not kept up to date.
+        """
+        if publish:
+            self._linted_projects.add(os.path.normpath(project_path))
+        self._request_files_lint.emit(project_path, list(filepaths), publish)
+
+    def on_files_changed(self, change_set: ChangeSet):
+        """Updates the results of projects linted this session for a batch of changes on disk."""
+        for project_path in self._linted_projects:
+            prefix = project_path + os.sep
+            changed = sorted(p for p in change_set.created | change_set.modified if p.startswith(prefix))
+            deleted = sorted(p for p in change_set.deleted if p.startswith(prefix))
+            if changed or deleted or change_set.overflowed:
+                self._request_changes_lint.emit(project_path, changed, deleted, change_set.overflowed)
+
     def shutdown(self):
         """Gracefully shuts down the linter thread."""
+        if stats := self.get_latency_stats():
+            log.info(f"Lint latency this session: {stats}")
         if self.thread.isRunning():
             self.thread.quit()
-            self.thread.wait(3000)
\ No newline at end of file
+            self.thread.wait(3000)
+        self.runner.shutdown_pool()
\ No newline at end of file
@@ -0,0 +1,123 @@
+# PuffinPyEditor/app_core/outline_index.py
+"""
+A per-document index of classes and functions (the "outline").
+
+The index is built once when a document is loaded. After that it is updated
+from QTextDocument.contentsChange, rescanning only the lines an edit touched,
+so consumers such as the outline minimap, breadcrumbs or symbol search can
+read it at any time without walking the document.
+"""
+import re
+from bisect import bisect_left, bisect_right
+from typing import List, Optional, Tuple
+from PyQt6.QtCore import QObject, pyqtSignal
+from PyQt6.QtGui import QTextDocument
+
+# (line number (0-based), indent, item type ('class' or 'def'), name)
+OutlineEntry = Tuple[int, int, str, str]
+
+LANG_PATTERNS = {
+    'python': [(re.compile(r"^\s*class\s+(\w+)"), 'class', 1), (re.compile(r"^\s*(?:async\s+)?def\s+(_?[a-zA-Z0-9_]+)"), 'def', 1)],
+    'javascript': [(re.compile(r"^\s*class\s+(\w+)"), 'class', 1), (re.compile(r"^\s*function\s*\*?\s*(\w*)"), 'def', 1), (re.compile(r"^\s*(?:const|let|var)\s+([\w$]+)\s*=\s*(?:async\s*)?\("), 'def', 1)],
+    'csharp': [(re.compile(r"^\s*(?:public|private|protected|internal)?\s*(?:sealed|abstract)?\s*class\s+(\w+)"), 'class', 1), (re.compile(r"^\s*(?:public|private|protected|internal)?\s*struct\s+(\w+)"), 'class', 1), (re.compile(r"^\s*(?:public|private|protected|internal)?\s*(?:static|virtual|override|async|unsafe)?\s*[\w<>\[\],]+\s+([\w]+)\s*\("), 'def', 1)],
+    'cpp': [(re.compile(r"^\s*class\s+(\w+)"), 'class', 1), (re.compile(r"^\s*struct\s+(\w+)"), 'class', 1), (re.compile(r"^\w[\w\s\*&<>,:]*?([\w_]+)\s*\([^;]*\)\s*\{?$"), 'def', 1)],
+    'rust': [(re.compile(r"^\s*struct\s+(\w+)"), 'class', 1), (re.compile(r"^\s*enum\s+(\w+)"), 'class', 1), (re.compile(r"^\s*(?:pub\s)?(?:async\s)?fn\s+(\w+)"), 'def', 1)]}
+LANG_MAP = {'.py': 'python', '.pyw': 'python', '.js': 'javascript', '.ts': 'javascript', '.cs': 'csharp', '.c': 'cpp', '.cpp': 'cpp', '.h': 'cpp', '.hpp': 'cpp', '.rs': 'rust'}
+
+
+def language_for_extension(ext: str) -> str:
+    return LANG_MAP.get(ext.lower(), '')
+
+
+class OutlineIndex(QObject):
+    """
+    Keeps a sorted list of OutlineEntry tuples for one QTextDocument and
+    emits outline_changed whenever an edit adds, removes or moves an entry.
+    """
+    outline_changed = pyqtSignal()
+
+    def __init__(self, document: QTextDocument, language_ext: str = '', parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self.document = document
+        self.patterns = []
+        self._entries: List[OutlineEntry] = []
+        self._lines: List[int] = []  # Parallel to _entries, for bisecting by line
+        self._block_count = document.blockCount()
+        document.contentsChange.connect(self._on_contents_change)
+        self.set_language(language_ext)
+
+    def set_language(self, language_ext: str):
+        patterns = LANG_PATTERNS.get(language_for_extension(language_ext or ''), [])
+        if patterns is self.patterns: return
+        self.patterns = patterns
+        self.rebuild()
+
+    def has_patterns(self) -> bool:
+        return bool(self.patterns)
+
+    def entries(self) -> List[OutlineEntry]:
+        """All entries in document order. Do not modify the returned list."""
+        return self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def entry_at_line(self, line: int) -> Optional[OutlineEntry]:
+        """Returns the innermost entry whose body (by indentation) contains line."""
+        index = bisect_right(self._lines, line) - 1
+        if index < 0: return None
+        block = self.document.findBlockByNumber(line)
+        text = block.text() if block.isValid() else ''
+        indent = len(text) - len(text.lstrip()) if text.strip() else None
+        for entry in reversed(self._entries[:index + 1]):
+            if entry[0] == line or indent is None or entry[1] < indent: return entry
+        return None
+
+    def scope_path_at_line(self, line: int) -> List[OutlineEntry]:
+        """Returns the chain of enclosing entries, outermost first (for breadcrumbs)."""
+        path, entry = [], self.entry_at_line(line)
+        while entry is not None:
+            path.append(entry)
+            index = bisect_left(self._lines, entry[0])
+            entry = next((e for e in reversed(self._entries[:index]) if e[1] < entry[1]), None)
+        return list(reversed(path))
+
+    def rebuild(self):
+        self._block_count = self.document.blockCount()
+        self._entries = self._scan(0, self._block_count - 1)
+        self._lines = [entry[0] for entry in self._entries]
+        self.outline_changed.emit()
+
+    def _scan(self, first: int, last: int) -> List[OutlineEntry]:
+        found: List[OutlineEntry] = []
+        if not self.patterns: return found
+        block, number = self.document.findBlockByNumber(first), first
+        while block.isValid() and number <= last:
+            text = block.text()
+            if text.strip():
+                for pattern, item_type, name_group_idx in self.patterns:
+                    if match := pattern.match(text):
+                        if name := match.group(name_group_idx): found.append((number, len(text) - len(text.lstrip()), item_type, name)); break
+            block, number = block.next(), number + 1
+        return found
+
+    def _on_contents_change(self, position: int, chars_removed: int, chars_added: int):
+        doc = self.document
+        new_count = doc.blockCount()
+        delta, self._block_count = new_count - self._block_count, new_count
+        if not self.patterns: return
+        first = doc.findBlock(position).blockNumber()
+        last_block = doc.findBlock(position + chars_added)
+        last_new = last_block.blockNumber() if last_block.isValid() else new_count - 1
+        last_old = last_new - delta
+        if first < 0: first = 0
+
+        start, stop = bisect_left(self._lines, first), bisect_right(self._lines, last_old)
+        removed = self._entries[start:stop]
+        rescanned = self._scan(first, last_new)
+        tail = self._entries[stop:]
+        if delta: tail = [(line + delta, indent, item_type, name) for line, indent, item_type, name in tail]
+        if removed == rescanned and not (delta and tail): return
+        self._entries = self._entries[:start] + rescanned + tail
+        self._lines = [entry[0] for entry in self._entries]
+        self.outline_changed.emit()
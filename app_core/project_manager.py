@@ -8,6 +8,7 @@ from typing import List, Tuple, Optional, Dict
 from PyQt6.QtCore import QObject, pyqtSignal
 
 from .settings_manager import settings_manager
+from .find_in_files import IGNORED_DIRS, IGNORED_FILES
 from utils.logger import log
 from utils.helpers import clean_git_conflict_markers # Import the moved function
 
@@ -168,18 +169,14 @@ class ProjectManager(QObject):
             return False
 
         project_root = self.get_active_project_path()
-        ignore_dirs = {
-            '__pycache__', '.git', 'venv', '.venv', 'dist', 'build', 'logs'
-        }
-        ignore_files = {'.gitignore', 'puffin_editor_settings.json'}
 
         try:
             with zipfile.ZipFile(
                     output_zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
                 for root, dirs, files in os.walk(project_root):
-                    dirs[:] = [d for d in dirs if d not in ignore_dirs]
+                    dirs[:] = [d for d in dirs if d not in IGNORED_DIRS]
                     for file in files:
-                        if file in ignore_files:
+                        if file in IGNORED_FILES:
                             continue
                         file_path = os.path.join(root, file)
                         arcname = os.path.relpath(file_path, project_root)
@@ -0,0 +1,113 @@
+# PuffinPyEditor/app_core/project_replace.py
+"""
+"Replace in Project": what a replacement would change, and writing it.
+
+replace_in_files_worker() runs in ProcessPoolExecutor children and works
+out, per file, the text after the replacement and its unified diff for the
+preview. A file open with unsaved edits is replaced in its editor buffer
+instead, whose text the caller passes in.
+
+write_files_atomically() saves the accepted files the way
+FileHandler.save_file_content saves one, to a temporary file next to it
+that os.replace() then moves over the original, except that every
+temporary file is written before any original is replaced. A file changed
+on disk since the preview, a full disk or a character the file's encoding
+cannot hold therefore leaves every file as it was.
+"""
+import os
+import re
+import shutil
+from typing import Dict, List, Optional, Tuple
+
+from utils.helpers import generate_unified_diff
+from .search_engine import BINARY_SNIFF_BYTES, MAX_SEARCHED_BYTES
+from .text_decoding import decode_file_bytes, looks_binary
+
+TEMP_SUFFIX = ".puffin-save.tmp"
+
+# (path, encoding, (size, mtime_ns) of the file read or None for an editor buffer, replacements, diff, new text)
+FileReplacement = Tuple[str, Optional[str], Optional[Tuple[int, int]], int, str, str]
+# (path, new text, encoding, (size, mtime_ns) the file must still have)
+FileWrite = Tuple[str, str, str, Tuple[int, int]]
+
+
+def replace_text(text: str, pattern: 're.Pattern', replacement: str, regex: bool) -> Tuple[str, int]:
+    """text with every match replaced, and how many there were. Only in regex mode may replacement refer to groups."""
+    return pattern.subn(replacement if regex else lambda _: replacement, text)
+
+
+def file_replacement(path: str, pattern: 're.Pattern', replacement: str, regex: bool,
+                     text: Optional[str] = None) -> Optional[FileReplacement]:
+    """
+    The change replacing in one file makes, or None if nothing matches or
+    the file is empty, binary, too large or unreadable. Given text, that
+    (an editor buffer) is replaced in rather than the file on disk.
+    """
+    encoding, stat = None, None
+    if text is None:
+        try:
+            with open(path, 'rb') as f:
+                st = os.fstat(f.fileno())
+                if not st.st_size or st.st_size > MAX_SEARCHED_BYTES:
+                    return None
+                data = f.read()
+            if looks_binary(data[:BINARY_SNIFF_BYTES]):
+                return None
+            text, encoding = decode_file_bytes(data)
+        except (OSError, UnicodeDecodeError):
+            return None
+        stat = (st.st_size, st.st_mtime_ns)
+    new_text, count = replace_text(text, pattern, replacement, regex)
+    if not count or new_text == text:
+        return None
+    return path, encoding, stat, count, generate_unified_diff(text, new_text, path, path), new_text
+
+
+def replace_in_files_worker(pattern: 're.Pattern', replacement: str, regex: bool,
+                            paths: List[str]) -> List[FileReplacement]:
+    """Process pool entry point: the changes for the files in a batch that have any."""
+    return [change for path in paths if (change := file_replacement(path, pattern, replacement, regex))]
+
+
+def write_files_atomically(files: List[FileWrite]) -> Tuple[List[str], Optional[str]]:
+    """
+    Writes every file or, if any cannot be written, none of them. Returns
+    the paths written and an error message, which is None on success. Text
+    is written as is: line endings were kept from the file when it was read.
+    A UTF-16 file keeps its byte order mark and byte order.
+    """
+    temps: Dict[str, str] = {}
+    try:
+        for path, text, encoding, expected in files:
+            st = os.stat(path)
+            if (st.st_size, st.st_mtime_ns) != expected:
+                raise OSError(f"'{path}' changed on disk since the preview")
+            if encoding == 'utf-16':
+                # Python's utf-16 codec writes the machine's byte order, not the file's.
+                with open(path, 'rb') as original:
+                    big_endian = original.read(2) == b'\xfe\xff'
+                encoding, text = 'utf-16-be' if big_endian else 'utf-16-le', '\ufeff' + text
+            temp = temps[path] = path + TEMP_SUFFIX
+            with open(temp, 'w', encoding=encoding, newline='') as f:
+                f.write(text)
+            shutil.copymode(path, temp)
+    except (OSError, UnicodeEncodeError) as e:
+        for temp in temps.values():
+            try:
+                os.remove(temp)
+            except OSError:
+                pass
+        return [], f"No files were changed. {e}"
+    written = []
+    for path, temp in temps.items():
+        try:
+            os.replace(temp, path)
+        except OSError as e:
+            for left in list(temps.values())[len(written):]:
+                try:
+                    os.remove(left)
+                except OSError:
+                    pass
+            return written, f"Only {len(written)} of {len(temps)} files were changed. {e}"
+        written.append(path)
+    return written, None
@@ -30,6 +30,8 @@ class PuffinPluginAPI:
             "completion": self._main_window.completion_manager, "github": self._main_window.github_manager,
             "git": self._main_window.git_manager, "linter": self._main_window.linter_manager,
             "update": self._main_window.update_manager, "plugin": self._main_window.plugin_manager,
+            "file_watcher": self._main_window.file_watch_service, "git_status": self._main_window.git_status_service,
+            "symbols": self._main_window.symbol_index, "search": self._main_window.search_manager,
         }
         if not (manager := name_map.get(manager_name.lower())):
             log.warning(f"Plugin requested an unknown manager: '{manager_name}'")
@@ -0,0 +1,62 @@
+# PuffinPyEditor/app_core/replace_engine.py
+"""
+Find and replace on a snapshot of an editor's text.
+
+replacement_ranges() finds every match in one pass and returns what to
+write where, in document (UTF-16) positions, so the editor can apply all
+of them in a single edit block instead of searching from the cursor once
+per replacement. Nothing here imports Qt.
+"""
+import re
+from bisect import bisect_left
+from typing import List, Tuple
+
+# Characters outside the BMP take two positions in a QTextDocument.
+_ASTRAL = re.compile('[\U00010000-\U0010FFFF]')
+# Replacement = (start, end, new text), in document positions.
+Replacement = Tuple[int, int, str]
+
+
+def compile_find_pattern(query: str, case_sensitive: bool, whole_words: bool, regex: bool) -> 're.Pattern':
+    """
+    The pattern the find panel searches with. Whole words follow
+    QTextDocument.FindWholeWords: no letter or digit right before or after
+    the match. In regex mode ^ and $ match at every line. Raises re.error.
+    """
+    pattern = query if regex else re.escape(query)
+    if whole_words:
+        pattern = rf"(?<![^\W_])(?:{pattern})(?![^\W_])"
+    return re.compile(pattern, (0 if case_sensitive else re.IGNORECASE) | (re.MULTILINE if regex else 0))
+
+
+def replacement_ranges(text: str, pattern: 're.Pattern', replacement: str, regex: bool) -> List[Replacement]:
+    """
+    Every match of pattern in text, in order, with its replacement. In
+    regex mode the replacement may refer to groups (\\1, \\g<name>) and
+    empty matches are replaced too, as re.sub does.
+    """
+    expand = regex and '\\' in replacement
+    matches = pattern.finditer(text) if regex else (m for m in pattern.finditer(text) if m.end() > m.start())
+    ranges = [(m.start(), m.end(), m.expand(replacement) if expand else replacement) for m in matches]
+    astral = [m.start() for m in _ASTRAL.finditer(text)] if not text.isascii() else []
+    if astral:
+        ranges = [(start + bisect_left(astral, start), end + bisect_left(astral, end), new)
+                  for start, end, new in ranges]
+    return ranges
+
+
+def to_document_position(text: str, index: int) -> int:
+    """A str index in text as a QTextDocument position."""
+    return index if text.isascii() else index + len(_ASTRAL.findall(text, 0, index))
+
+
+def to_text_index(text: str, position: int) -> int:
+    """A QTextDocument position as a str index in text."""
+    if text.isascii():
+        return position
+    before = 0  # Characters outside the BMP wholly before position
+    for m in _ASTRAL.finditer(text):
+        if m.start() + before + 2 > position:
+            break
+        before += 1
+    return position - before
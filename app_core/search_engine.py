@@ -0,0 +1,280 @@
+# PuffinPyEditor/app_core/search_engine.py
+"""
+The trigram index behind "Search in Project", and the matching itself.
+
+Every text file is indexed by the trigrams of its words: runs of ASCII
+letters, digits and underscores, case folded. Indexing distinct words
+rather than the whole text is what keeps it cheap, since source code
+repeats the same identifiers over and over. A query is reduced to the word
+trigrams any match must contain; only files whose blob holds all of them
+are read and searched. Regular expressions are narrowed by the literal runs
+they require, and queries with none (short ones, alternations,
+punctuation...) read every file.
+
+Nothing here imports Qt. index_files_in_worker runs in ProcessPoolExecutor
+children, so reading and splitting files never holds the editor's GIL.
+"""
+import os
+import re
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+try:
+    from re import _parser as sre_parse  # Python 3.11+
+except ImportError:
+    import sre_parse
+
+from utils.logger import get_app_data_path
+from .replace_engine import compile_find_pattern
+from .text_decoding import UTF16_BOMS, decode_file_bytes, looks_binary
+
+SEARCH_INDEX_FILE = os.path.join(get_app_data_path(), "search_index.sqlite3")
+SCHEMA_VERSION = 2
+MAX_INDEXED_BYTES = 2 * 1024 * 1024  # Larger text files are searched without narrowing
+MAX_SEARCHED_BYTES = 32 * 1024 * 1024  # Larger files are not searched at all
+BINARY_SNIFF_BYTES = 8192
+MAX_MATCHES_PER_FILE = 1000
+MAX_LINE_CHARS = 300
+
+_WORD_TRIGRAM = re.compile(rb'(?=(\w\w\w))')
+_QUERY_TRIGRAM = re.compile(rb'[a-z0-9_]{3}')
+# Every byte that is not an ASCII letter, digit or underscore becomes a space.
+_WORD_BYTES = bytes(c if chr(c).isascii() and (chr(c).isalnum() or c == 95) else 32 for c in range(256))
+
+# (size, mtime_ns, is_text, trigrams or None if the file is always searched)
+FileEntry = Tuple[int, int, bool, Optional[bytes]]
+# (line (1-based), column (0-based), length, text of the line)
+Match = Tuple[int, int, int, str]
+
+
+def file_trigrams(data: bytes) -> bytes:
+    """The distinct word trigrams of data, lowercased and concatenated."""
+    words = b' '.join(set(data.lower().translate(_WORD_BYTES).split()))
+    return b''.join(set(_WORD_TRIGRAM.findall(words)))
+
+
+def read_file_entry(path: str) -> Optional[FileEntry]:
+    """Stats and indexes one file. None if it cannot be read."""
+    try:
+        stat = os.stat(path)
+        with open(path, 'rb') as f:
+            head = f.read(BINARY_SNIFF_BYTES)
+            if looks_binary(head):
+                return stat.st_size, stat.st_mtime_ns, False, None
+            # The word trigrams of UTF-16 text are not in its bytes.
+            if stat.st_size > MAX_INDEXED_BYTES or head.startswith(UTF16_BOMS):
+                return stat.st_size, stat.st_mtime_ns, True, None
+            data = head + f.read()
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns, True, file_trigrams(data)
+
+
+def index_files_in_worker(paths: List[str]) -> Dict[str, Optional[FileEntry]]:
+    """Process pool entry point: {path: entry, or None if unreadable} for a batch of files."""
+    return {path: read_file_entry(path) for path in paths}
+
+
+def _required_literals(items) -> List[str]:
+    """Literal runs every match of a parsed pattern must contain."""
+    runs, current = [], ''
+    for op, av in items:
+        if op is sre_parse.LITERAL:
+            current += chr(av)
+            continue
+        if current:
+            runs.append(current)
+            current = ''
+        if op is sre_parse.SUBPATTERN:
+            runs.extend(_required_literals(av[-1]))
+        elif op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT) and av[0] >= 1:
+            runs.extend(_required_literals(av[2]))
+        # Anything else (classes, alternations, anchors...) requires no particular text.
+    if current:
+        runs.append(current)
+    return runs
+
+
+def required_trigrams(query: str, is_regex: bool, case_sensitive: bool) -> Optional[List[bytes]]:
+    """The index trigrams a file must contain to match, or None if the query cannot narrow the search."""
+    if is_regex:
+        try:
+            parsed = sre_parse.parse(query, 0 if case_sensitive else re.IGNORECASE)
+        except (re.error, RecursionError):
+            return None
+        runs = _required_literals(parsed)
+    else:
+        runs = [query]
+    # Only trigrams lying inside a word are indexed. (Case-insensitive matching
+    # also lets the Kelvin sign and the long s match k and s; that is ignored.)
+    trigrams = set()
+    for run in runs:
+        data = run.encode('utf-8').lower()
+        for i in range(len(data) - 2):
+            if _QUERY_TRIGRAM.fullmatch(data, i, i + 3):
+                trigrams.add(data[i:i + 3])
+    return sorted(trigrams) or None
+
+
+def compile_query(query: str, is_regex: bool, case_sensitive: bool, whole_word: bool) -> 're.Pattern':
+    """
+    The pattern a search runs: the editor's find pattern, so whole words
+    and ^ and $ behave alike. Raises re.error for an invalid regular
+    expression.
+    """
+    return compile_find_pattern(query, case_sensitive, whole_word, is_regex)
+
+
+def search_text(text: str, pattern: 're.Pattern') -> List[Match]:
+    """Every non-empty match in text, at most MAX_MATCHES_PER_FILE of them."""
+    matches: List[Match] = []
+    line, line_start, scanned = 1, 0, 0
+    for match in pattern.finditer(text):
+        start, end = match.span()
+        if start == end:
+            continue
+        line += text.count('\n', scanned, start)
+        scanned = start
+        line_start = text.rfind('\n', 0, start) + 1
+        line_end = text.find('\n', start)
+        line_end = len(text) if line_end < 0 else line_end
+        matches.append((line, start - line_start, min(end, line_end) - start,
+                        text[line_start:line_end][:MAX_LINE_CHARS]))
+        if len(matches) >= MAX_MATCHES_PER_FILE:
+            break
+    return matches
+
+
+def search_file(path: str, pattern: 're.Pattern') -> Tuple[List[Match], int]:
+    """The matches in a file and the bytes searched (0 for skipped files)."""
+    try:
+        if os.path.getsize(path) > MAX_SEARCHED_BYTES:
+            return [], 0
+        with open(path, 'rb') as f:
+            data = f.read(BINARY_SNIFF_BYTES)
+            if looks_binary(data):
+                return [], 0
+            data += f.read()
+        text = decode_file_bytes(data)[0]
+    except (OSError, UnicodeDecodeError):
+        return [], 0
+    return search_text(text, pattern), len(data)
+
+
+def path_range(root: str) -> Tuple[str, str]:
+    """Bounds such that lower <= path < upper holds exactly for the paths under root."""
+    root = os.path.normpath(root)
+    return root + os.sep, root + chr(ord(os.sep) + 1)
+
+
+class TrigramIndex:
+    """
+    The index in memory, shared by the thread that maintains it and the one
+    that searches with it. Paths reported changed but not yet re-read are
+    "pending" and always searched, so results never lag the file watcher.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._files: Dict[str, FileEntry] = {}
+        self._ready: Set[str] = set()
+        self._pending: Set[str] = set()
+
+    def set_entries(self, entries: Dict[str, Optional[FileEntry]]):
+        """Stores re-read files; None removes a file."""
+        with self._lock:
+            for path, entry in entries.items():
+                if entry is None:
+                    self._files.pop(path, None)
+                else:
+                    self._files[path] = entry
+                self._pending.discard(path)
+
+    def remove_under(self, path: str) -> List[str]:
+        """Drops a file, or a directory and every file below it. Returns the dropped paths."""
+        lower, upper = path_range(path)
+        with self._lock:
+            gone = [p for p in self._files if p == path or lower <= p < upper]
+            for p in gone:
+                del self._files[p]
+            self._pending = {p for p in self._pending if not (p == path or lower <= p < upper)}
+        return gone
+
+    def mark_pending(self, paths: Iterable[str]):
+        with self._lock:
+            self._pending.update(paths)
+
+    def entries_under(self, root: str) -> Dict[str, FileEntry]:
+        lower, upper = path_range(root)
+        with self._lock:
+            return {p: e for p, e in self._files.items() if lower <= p < upper}
+
+    def set_ready(self, root: str, ready: bool):
+        with self._lock:
+            (self._ready.add if ready else self._ready.discard)(root)
+
+    def forget_root(self, root: str, still_open: List[str]):
+        """Drops a closed project's files, except those inside another open project."""
+        lower, upper = path_range(root)
+        keep = [path_range(r) for r in still_open]
+        with self._lock:
+            self._ready.discard(root)
+            for p in [p for p in self._files if lower <= p < upper]:
+                if not any(lo <= p < hi for lo, hi in keep):
+                    del self._files[p]
+
+    def candidates(self, root: str, trigrams: Optional[List[bytes]]) -> Optional[List[str]]:
+        """
+        The text files under root that may match, in path order, or None if
+        the project has not been indexed yet and has to be walked instead.
+        """
+        lower, upper = path_range(root)
+        with self._lock:
+            if root not in self._ready:
+                return None
+            found = {p for p in self._pending if lower <= p < upper}
+            for path, (_, _, is_text, blob) in self._files.items():
+                if is_text and lower <= path < upper and (
+                        blob is None or not trigrams or all(t in blob for t in trigrams)):
+                    # `in` may also hit across two neighbouring trigrams; that only adds a candidate.
+                    found.add(path)
+        return sorted(found)
+
+
+class SearchIndexStore:
+    """The persisted index. Only used from the indexing thread."""
+
+    def __init__(self, path: str = SEARCH_INDEX_FILE):
+        self.connection = sqlite3.connect(path)
+        if self.connection.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            self.connection.executescript(f"""
+                DROP TABLE IF EXISTS files;
+                CREATE TABLE files (path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, is_text INTEGER,
+                                    trigrams BLOB);
+                PRAGMA user_version = {SCHEMA_VERSION};
+            """)
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.execute("PRAGMA synchronous = NORMAL")
+
+    def close(self):
+        self.connection.close()
+
+    def load(self, root: str) -> Dict[str, FileEntry]:
+        rows = self.connection.execute(
+            "SELECT path, size, mtime_ns, is_text, trigrams FROM files WHERE path >= ? AND path < ?",
+            path_range(root))
+        return {path: (size, mtime_ns, bool(is_text), trigrams) for path, size, mtime_ns, is_text, trigrams in rows}
+
+    def save(self, entries: Dict[str, Optional[FileEntry]]):
+        """Stores entries; None deletes a file."""
+        with self.connection:
+            self.connection.executemany("DELETE FROM files WHERE path = ?",
+                                        [(p,) for p, e in entries.items() if e is None])
+            self.connection.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?)",
+                                        [(p, *e) for p, e in entries.items() if e is not None])
+
+    def delete_under(self, path: str):
+        with self.connection:
+            self.connection.execute("DELETE FROM files WHERE path = ? OR (path >= ? AND path < ?)",
+                                    (path, *path_range(path)))
@@ -0,0 +1,575 @@
+# PuffinPyEditor/app_core/search_manager.py
+"""
+"Search in Project": keeps a trigram index of every file in the open
+projects (see search_engine) and runs literal or regex searches against it.
+Indexed or not, a project's files are those iter_project_files() lists, so
+both kinds of search read the same files and find the same matches.
+
+A ProjectSearchIndexer on one background thread brings the persisted index
+up to date when a project opens, splitting changed files across a process
+pool, and afterwards follows file watcher events. A TextSearcher on another
+thread reads only the candidate files the index allows, or walks a project
+not indexed yet, and streams matches back in batches, so a search never
+waits for indexing and indexing never waits for a search. The same thread
+works out the changes "Replace in Project" previews (see project_replace).
+"""
+import multiprocessing
+import os
+import re
+import sqlite3
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, as_completed, wait
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from PyQt6.QtCore import QObject, QThread, pyqtSignal
+from utils.logger import log
+from .file_watcher import UNWATCHED_DIR_PREFIXES
+from .find_in_files import ProjectFiles, compile_bytes_query, find_in_files_worker, walk_project_files
+from .project_replace import FileReplacement, file_replacement, replace_in_files_worker
+from .search_engine import (SEARCH_INDEX_FILE, FileEntry, Match, SearchIndexStore, TrigramIndex, compile_query,
+                            index_files_in_worker, read_file_entry, required_trigrams, search_file)
+
+
+def iter_project_files(project_root: str) -> Iterator[Tuple[str, int]]:
+    """
+    (path, size) of every file of a project the index covers and a search
+    without it reads alike: what walk_project_files() lists, less the
+    directories the file watcher skips, whose changes the index would miss.
+    """
+    return walk_project_files(project_root, UNWATCHED_DIR_PREFIXES)
+
+
+def project_file_filter(project_root: str) -> ProjectFiles:
+    """Tells single paths apart the way iter_project_files() does."""
+    return ProjectFiles(project_root, UNWATCHED_DIR_PREFIXES)
+
+
+class ProjectSearchIndexer(QObject):
+    """
+    Runs on a background thread and owns the on-disk index. Files whose
+    size or mtime changed since they were stored are marked pending in the
+    shared TrigramIndex first, so searches include them while they are
+    re-read.
+    """
+    POOL_MIN_FILES = 64  # Fewer changed files than this are read on this thread
+    BATCH_FILES = 64
+
+    project_indexed = pyqtSignal(str, int)  # project root, indexed files
+
+    def __init__(self, index: TrigramIndex, db_path: str = SEARCH_INDEX_FILE):
+        super().__init__()
+        self.index = index
+        self.db_path = db_path
+        self.open_roots: frozenset = frozenset()  # Replaced from the UI thread; closed projects stop indexing
+        self._store: Optional[SearchIndexStore] = None
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _open_store(self) -> Optional[SearchIndexStore]:
+        if self._store is None:
+            try:
+                self._store = SearchIndexStore(self.db_path)
+            except sqlite3.Error as e:
+                log.error(f"Could not open the search index {self.db_path}: {e}")
+        return self._store
+
+    def _is_cancelled(self, project_root: str) -> bool:
+        return QThread.currentThread().isInterruptionRequested() or project_root not in self.open_roots
+
+    def index_project(self, project_root: str):
+        """Loads the stored index of a project, makes it searchable, then re-reads whatever changed on disk."""
+        if not (store := self._open_store()):
+            return
+        start = time.perf_counter()
+        try:
+            known = store.load(project_root)
+            current, changed = {}, []
+            for path, _ in iter_project_files(project_root):
+                if self._is_cancelled(project_root):
+                    return
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entry = known.pop(path, None)
+                if entry is not None and entry[:2] == (stat.st_size, stat.st_mtime_ns):
+                    current[path] = entry
+                else:
+                    changed.append(path)
+            for path in self.index.entries_under(project_root):
+                if path not in current:
+                    known.setdefault(path, None)
+            self.index.mark_pending(changed)
+            self.index.set_entries({**dict.fromkeys(known), **current})
+            self.index.set_ready(project_root, True)
+            store.save(dict.fromkeys(known))
+            for batch in self._read_entries(changed, project_root):
+                if self._is_cancelled(project_root):
+                    return
+                self.index.set_entries(batch)
+                store.save(batch)
+        except sqlite3.Error as e:
+            log.error(f"Search index update for {project_root} failed: {e}")
+            return
+        total = len(current) + len(changed)
+        log.info(f"Indexed {project_root} for search in {(time.perf_counter() - start) * 1000:.0f} ms "
+                 f"({len(changed)} of {total} files re-read)")
+        self.project_indexed.emit(project_root, total)
+
+    def update_files(self, project_root: str, changed: List[str], deleted: List[str]):
+        """Re-reads changed files and forgets deleted files and directories."""
+        if not (store := self._open_store()):
+            return
+        try:
+            for path in deleted:
+                if not os.path.exists(path):
+                    self.index.remove_under(path)
+                    store.delete_under(path)
+            for batch in self._read_entries(changed, project_root):
+                self.index.set_entries(batch)
+                store.save(batch)
+        except sqlite3.Error as e:
+            log.error(f"Search index update for {project_root} failed: {e}")
+
+    def _read_entries(self, paths: List[str], project_root: str) -> Iterator[Dict[str, Optional[FileEntry]]]:
+        """Yields {path: entry} batches, read across the process pool if there are enough files."""
+        done: Set[str] = set()
+        if len(paths) >= self.POOL_MIN_FILES and (pool := self._process_pool()):
+            try:
+                futures = [pool.submit(index_files_in_worker, paths[i:i + self.BATCH_FILES])
+                           for i in range(0, len(paths), self.BATCH_FILES)]
+                for future in as_completed(futures):
+                    if self._is_cancelled(project_root):
+                        for f in futures:
+                            f.cancel()
+                        return
+                    batch = future.result()
+                    done.update(batch)
+                    yield batch
+            except Exception as e:
+                log.error(f"Search index process pool failed, indexing on this thread instead: {e}")
+                self.shutdown_pool()
+        batch = {}
+        for path in paths:
+            if path in done:
+                continue
+            batch[path] = read_file_entry(path)
+            if len(batch) == self.BATCH_FILES:
+                yield batch
+                batch = {}
+        if batch:
+            yield batch
+
+    def _process_pool(self) -> Optional[ProcessPoolExecutor]:
+        # A frozen build would start copies of the whole application as workers.
+        if self._pool is None and not getattr(sys, 'frozen', False):
+            self._pool = ProcessPoolExecutor(max_workers=max(1, (os.cpu_count() or 2) - 1),
+                                             mp_context=multiprocessing.get_context("spawn"))
+        return self._pool
+
+    def shutdown_pool(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def close(self):
+        self.shutdown_pool()
+        if self._store:
+            self._store.close()
+            self._store = None
+
+
+class TextSearcher(QObject):
+    """
+    Runs searches on a background thread. Indexed projects are searched file
+    by file through the candidates the index allows; projects without an
+    index yet are walked and searched across a process pool instead (see
+    find_in_files). A search stops as soon as a newer one has been
+    requested; results are emitted per batch of files.
+    """
+    BATCH_INTERVAL = 0.05  # Seconds between result batches
+    MAX_MATCHES = 20000
+    FIND_BATCH_FILES = 64  # A process pool task is this many files or FIND_BATCH_BYTES, whichever comes first
+    FIND_BATCH_BYTES = 4 * 1024 * 1024
+    QUEUED_BATCHES_PER_WORKER = 4  # Walking pauses once this many tasks per worker are waiting
+
+    # request id, [(path, [(line, column, length, line text), ...]), ...]
+    results_found = pyqtSignal(int, list)
+    # request id, files searched, matches, truncated, bytes searched, seconds
+    search_finished = pyqtSignal(int, int, int, bool, int, float)
+    # request id, [FileReplacement, ...]
+    replace_preview_found = pyqtSignal(int, list)
+    # request id, files changed, replacements, seconds
+    replace_preview_finished = pyqtSignal(int, int, int, float)
+
+    def __init__(self, index: TrigramIndex):
+        super().__init__()
+        self.index = index
+        self.latest_request = 0  # Set from the UI thread; anything older is abandoned
+        self.latest_preview = 0  # Likewise for replace previews, which searches do not abandon
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_workers = 1
+
+    def _is_cancelled(self, request_id: int, preview: bool = False) -> bool:
+        latest = self.latest_preview if preview else self.latest_request
+        return request_id != latest or QThread.currentThread().isInterruptionRequested()
+
+    def search(self, request_id: int, query: str, options: dict, project_roots: List[str]):
+        if self._is_cancelled(request_id):
+            return
+        start = time.perf_counter()
+        query_args = (query, options['regex'], options['case_sensitive'], options['whole_word'])
+        pattern = compile_query(*query_args)
+        # Without it, unindexed projects have each file decoded and matched like indexed ones.
+        bytes_pattern = compile_bytes_query(*query_args)
+        trigrams = required_trigrams(query, options['regex'], options['case_sensitive'])
+        stats = {'files': 0, 'bytes': 0}
+        matches, truncated, walked = 0, False, False
+        seen: Set[str] = set()  # Nested projects are searched once
+        batch, last_emit = [], time.perf_counter()
+        for root in project_roots:
+            candidates = self.index.candidates(root, trigrams)
+            if candidates is None:
+                walked = True
+                found_files = self._find_in_files(request_id, root, bytes_pattern or pattern, seen, stats)
+            else:
+                found_files = self._search_paths(request_id, candidates, pattern, seen, stats)
+            for path, found in found_files:
+                found = found[:self.MAX_MATCHES - matches]
+                batch.append((path, found))
+                matches += len(found)
+                if matches >= self.MAX_MATCHES:
+                    truncated = True
+                    break
+                if time.perf_counter() - last_emit >= self.BATCH_INTERVAL:
+                    self.results_found.emit(request_id, batch)
+                    batch, last_emit = [], time.perf_counter()
+            found_files.close()
+            if self._is_cancelled(request_id):
+                return
+            if truncated:
+                break
+        if batch:
+            self.results_found.emit(request_id, batch)
+        elapsed = time.perf_counter() - start
+        megabytes = stats['bytes'] / (1024 * 1024)
+        log.info(f"Searched {stats['files']} files, {megabytes:.1f} MB in {elapsed * 1000:.0f} ms "
+                 f"({megabytes / max(elapsed, 1e-6):.1f} MB/s, {stats['files'] / max(elapsed, 1e-6):.0f} files/s)"
+                 f"{' partly without the index' if walked else ''}")
+        self.search_finished.emit(request_id, stats['files'], matches, truncated, stats['bytes'], elapsed)
+
+    def _search_paths(self, request_id: int, paths: Iterable[str], pattern: 're.Pattern', seen: Set[str],
+                      stats: dict) -> Iterator[Tuple[str, List[Match]]]:
+        for path in paths:
+            if self._is_cancelled(request_id):
+                return
+            if path in seen:
+                continue
+            seen.add(path)
+            found, searched = search_file(path, pattern)
+            stats['files'] += 1
+            stats['bytes'] += searched
+            if found:
+                yield path, found
+
+    def _find_in_files(self, request_id: int, project_root: str, pattern: 're.Pattern', seen: Set[str],
+                       stats: dict) -> Iterator[Tuple[str, List[Match]]]:
+        """Walks a project and searches it in batches across the process pool, yielding files as batches finish."""
+        pending: Dict[Future, List[str]] = {}
+        paths, batch_bytes = [], 0
+        try:
+            for path, size in iter_project_files(project_root):
+                if self._is_cancelled(request_id):
+                    return
+                if path in seen:
+                    continue
+                seen.add(path)
+                stats['files'] += 1
+                paths.append(path)
+                batch_bytes += size
+                if len(paths) >= self.FIND_BATCH_FILES or batch_bytes >= self.FIND_BATCH_BYTES:
+                    yield from self._submit(pattern, paths, pending, stats)
+                    paths, batch_bytes = [], 0
+                    if pending:
+                        full = len(pending) >= self._pool_workers * self.QUEUED_BATCHES_PER_WORKER
+                        done, _ = wait(pending, timeout=None if full else 0, return_when=FIRST_COMPLETED)
+                        yield from self._collect(done, pattern, pending, stats)
+            if paths:
+                yield from self._submit(pattern, paths, pending, stats)
+            while pending:
+                if self._is_cancelled(request_id):
+                    return
+                done, _ = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+                yield from self._collect(done, pattern, pending, stats)
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def _submit(self, pattern: 're.Pattern', paths: List[str], pending: Dict[Future, List[str]],
+                stats: dict) -> Iterator[Tuple[str, List[Match]]]:
+        if pool := self._process_pool():
+            try:
+                pending[pool.submit(find_in_files_worker, pattern, paths)] = paths
+                return
+            except Exception as e:
+                log.error(f"Find in files process pool failed, searching on this thread instead: {e}")
+                self.shutdown_pool()
+        results, searched = find_in_files_worker(pattern, paths)
+        stats['bytes'] += searched
+        yield from results
+
+    def _collect(self, done: Set[Future], pattern: 're.Pattern', pending: Dict[Future, List[str]],
+                 stats: dict) -> Iterator[Tuple[str, List[Match]]]:
+        for future in done:
+            paths = pending.pop(future)
+            try:
+                results, searched = future.result()
+            except Exception as e:
+                log.error(f"Find in files process pool failed, searching on this thread instead: {e}")
+                self.shutdown_pool()
+                results, searched = find_in_files_worker(pattern, paths)
+            stats['bytes'] += searched
+            yield from results
+
+    def preview_replace(self, request_id: int, query: str, replacement: str, options: dict,
+                        project_roots: List[str], buffers: Dict[str, str]):
+        """
+        Works out what replacing every match would change, streaming the
+        changed files back in batches. Files in buffers (path: text of an
+        editor with unsaved edits) are replaced in that text, not on disk.
+        """
+        if self._is_cancelled(request_id, preview=True):
+            return
+        start = time.perf_counter()
+        regex = options['regex']
+        pattern = compile_query(query, regex, options['case_sensitive'], options['whole_word'])
+        trigrams = required_trigrams(query, regex, options['case_sensitive'])
+        project_files = [project_file_filter(root) for root in project_roots]
+        seen = {path for path in buffers if any(files.includes(path) for files in project_files)}
+        batch = [change for path in sorted(seen)
+                 if (change := file_replacement(path, pattern, replacement, regex, buffers[path]))]
+        files, replacements, last_emit = 0, 0, time.perf_counter()
+        for root in project_roots:
+            candidates = self.index.candidates(root, trigrams)
+            paths = candidates if candidates is not None else (path for path, _ in iter_project_files(root))
+            changes = self._replace_in_paths(request_id, paths, seen, pattern, replacement, regex)
+            for change in changes:
+                batch.append(change)
+                if time.perf_counter() - last_emit >= self.BATCH_INTERVAL:
+                    files, replacements = files + len(batch), replacements + sum(c[3] for c in batch)
+                    self.replace_preview_found.emit(request_id, batch)
+                    batch, last_emit = [], time.perf_counter()
+            changes.close()
+            if self._is_cancelled(request_id, preview=True):
+                return
+        if batch:
+            files, replacements = files + len(batch), replacements + sum(c[3] for c in batch)
+            self.replace_preview_found.emit(request_id, batch)
+        elapsed = time.perf_counter() - start
+        log.info(f"Previewed {replacements} replacements in {files} files in {elapsed * 1000:.0f} ms")
+        self.replace_preview_finished.emit(request_id, files, replacements, elapsed)
+
+    def _replace_in_paths(self, request_id: int, paths: Iterable[str], seen: Set[str], pattern: 're.Pattern',
+                          replacement: str, regex: bool) -> Iterator[FileReplacement]:
+        """Works through paths in FIND_BATCH_FILES batches across the process pool, yielding changes as batches finish."""
+        pending: Dict[Future, List[str]] = {}
+        args = (pattern, replacement, regex)
+
+        def unseen() -> Iterator[str]:
+            for path in paths:
+                if path not in seen:
+                    seen.add(path)
+                    yield path
+
+        def collect(done: Set[Future]) -> Iterator[FileReplacement]:
+            for future in done:
+                batch_paths = pending.pop(future)
+                try:
+                    yield from future.result()
+                except Exception as e:
+                    log.error(f"Replace preview process pool failed, continuing on this thread instead: {e}")
+                    self.shutdown_pool()
+                    yield from replace_in_files_worker(*args, batch_paths)
+
+        try:
+            remaining = unseen()
+            while batch_paths := [path for _, path in zip(range(self.FIND_BATCH_FILES), remaining)]:
+                if self._is_cancelled(request_id, preview=True):
+                    return
+                pool = self._process_pool()
+                try:
+                    if pool:
+                        pending[pool.submit(replace_in_files_worker, *args, batch_paths)] = batch_paths
+                except Exception as e:
+                    log.error(f"Replace preview process pool failed, continuing on this thread instead: {e}")
+                    self.shutdown_pool()
+                    pool = None
+                if not pool:
+                    yield from replace_in_files_worker(*args, batch_paths)
+                    continue
+                full = len(pending) >= self._pool_workers * self.QUEUED_BATCHES_PER_WORKER
+                done, _ = wait(pending, timeout=None if full else 0, return_when=FIRST_COMPLETED)
+                yield from collect(done)
+            while pending:
+                if self._is_cancelled(request_id, preview=True):
+                    return
+                done, _ = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+                yield from collect(done)
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def _process_pool(self) -> Optional[ProcessPoolExecutor]:
+        # A frozen build would start copies of the whole application as workers.
+        if self._pool is None and not getattr(sys, 'frozen', False):
+            self._pool_workers = max(1, (os.cpu_count() or 2) - 1)
+            self._pool = ProcessPoolExecutor(max_workers=self._pool_workers,
+                                             mp_context=multiprocessing.get_context("spawn"))
+        return self._pool
+
+    def shutdown_pool(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def close(self):
+        self.shutdown_pool()
+
+
+class ProjectSearchManager(QObject):
+    """
+    The UI-thread side of project search. set_projects() and
+    on_files_changed() keep the index in step with the open projects;
+    search() starts a search whose results arrive through results_found and
+    search_finished, tagged with the id it returned; preview_replace() does
+    the same for replace_preview_found and replace_preview_finished.
+    """
+    results_found = pyqtSignal(int, list)
+    search_finished = pyqtSignal(int, int, int, bool, int, float)
+    indexing_finished = pyqtSignal(str, int)  # project root, indexed files
+    replace_preview_found = pyqtSignal(int, list)
+    replace_preview_finished = pyqtSignal(int, int, int, float)
+
+    _request_index_project = pyqtSignal(str)
+    _request_update_files = pyqtSignal(str, list, list)
+    _request_search = pyqtSignal(int, str, dict, list)
+    _request_replace_preview = pyqtSignal(int, str, str, dict, list, dict)
+    _request_close = pyqtSignal()
+
+    def __init__(self, parent: Optional[QObject] = None, db_path: str = SEARCH_INDEX_FILE):
+        super().__init__(parent)
+        self.index = TrigramIndex()
+        self.indexer_thread, self.search_thread = QThread(), QThread()
+        self.indexer = ProjectSearchIndexer(self.index, db_path)
+        self.indexer.moveToThread(self.indexer_thread)
+        self.searcher = TextSearcher(self.index)
+        self.searcher.moveToThread(self.search_thread)
+        self._request_index_project.connect(self.indexer.index_project)
+        self._request_update_files.connect(self.indexer.update_files)
+        self._request_close.connect(self.indexer.close)
+        self._request_close.connect(self.searcher.close)
+        self._request_search.connect(self.searcher.search)
+        self._request_replace_preview.connect(self.searcher.preview_replace)
+        self.indexer.project_indexed.connect(self._on_project_indexed)
+        self.searcher.results_found.connect(self.results_found)
+        self.searcher.search_finished.connect(self.search_finished)
+        self.searcher.replace_preview_found.connect(self.replace_preview_found)
+        self.searcher.replace_preview_finished.connect(self.replace_preview_finished)
+        self.indexer_thread.start()
+        self.search_thread.start()
+
+        self._projects: List[str] = []
+        self._indexing: Set[str] = set()
+        self._last_request = 0
+
+    def set_projects(self, project_roots: List[str]):
+        """Indexes exactly these projects from now on."""
+        wanted = [os.path.normpath(root) for root in project_roots if root and os.path.isdir(root)]
+        self.indexer.open_roots = frozenset(wanted)
+        for root in set(self._projects) - set(wanted):
+            self.index.forget_root(root, wanted)
+            self._indexing.discard(root)
+        for root in wanted:
+            if root not in self._projects:
+                self._indexing.add(root)
+                self._request_index_project.emit(root)
+        self._projects = wanted
+
+    def projects(self) -> List[str]:
+        return list(self._projects)
+
+    def is_indexing(self) -> bool:
+        return bool(self._indexing)
+
+    def on_files_changed(self, change_set):
+        """Marks changed files pending, so searches read them right away, and has them re-indexed."""
+        touched = change_set.created | change_set.modified | change_set.deleted
+        ignores_changed = {p for p in touched if os.path.basename(p) == '.gitignore'}
+        for root in self._projects:
+            prefix = root + os.sep
+            # A changed .gitignore changes which files are indexed at all.
+            if change_set.overflowed or any(p.startswith(prefix) for p in ignores_changed):
+                self.index.set_ready(root, False)
+                self._indexing.add(root)
+                self._request_index_project.emit(root)
+                continue
+            project_files = project_file_filter(root)
+            changed = sorted(p for p in change_set.created | change_set.modified
+                             if project_files.includes(p) and os.path.isfile(p))
+            deleted = sorted(p for p in change_set.deleted if p.startswith(prefix))
+            if changed or deleted:
+                self.index.mark_pending(changed)
+                self._request_update_files.emit(root, changed, deleted)
+
+    def search(self, query: str, regex: bool = False, case_sensitive: bool = False, whole_word: bool = False) -> int:
+        """
+        Starts searching the open projects and returns the request id the
+        results will carry. Raises re.error for an invalid regular expression.
+        """
+        compile_query(query, regex, case_sensitive, whole_word)
+        self._last_request += 1
+        self.searcher.latest_request = self._last_request
+        options = {'regex': regex, 'case_sensitive': case_sensitive, 'whole_word': whole_word}
+        self._request_search.emit(self._last_request, query, options, list(self._projects))
+        return self._last_request
+
+    def preview_replace(self, query: str, replacement: str, buffers: Dict[str, str], regex: bool = False,
+                        case_sensitive: bool = False, whole_word: bool = False) -> int:
+        """
+        Starts working out what replacing every match in the open projects
+        would change and returns the request id the changes will carry.
+        buffers maps the paths of files with unsaved edits to their editor
+        text. Raises re.error for an invalid regular expression or replacement.
+        """
+        pattern = compile_query(query, regex, case_sensitive, whole_word)
+        if regex:
+            pattern.sub(replacement, '')  # Checks the replacement's group references
+        self._last_request += 1
+        self.searcher.latest_preview = self._last_request
+        options = {'regex': regex, 'case_sensitive': case_sensitive, 'whole_word': whole_word}
+        self._request_replace_preview.emit(self._last_request, query, replacement, options, list(self._projects),
+                                           {os.path.normpath(p): text for p, text in buffers.items()})
+        return self._last_request
+
+    def cancel_search(self):
+        self._last_request += 1
+        self.searcher.latest_request = self._last_request
+
+    def cancel_replace_preview(self):
+        self._last_request += 1
+        self.searcher.latest_preview = self._last_request
+
+    def shutdown(self):
+        self.cancel_search()
+        self.cancel_replace_preview()
+        self.indexer.open_roots = frozenset()
+        for thread in (self.indexer_thread, self.search_thread):
+            thread.requestInterruption()
+        self._request_close.emit()
+        for thread in (self.indexer_thread, self.search_thread):
+            if thread.isRunning():
+                thread.quit()
+                thread.wait(3000)
+
+    def _on_project_indexed(self, project_root: str, total: int):
+        self._indexing.discard(project_root)
+        self.indexing_finished.emit(project_root, total)
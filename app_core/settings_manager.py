@@ -32,6 +32,12 @@ DEFAULT_SETTINGS = {
     "favorites": [],
     "open_files": [],
 
+    # --- Performance ---
+    "lazy_highlighting_threshold_lines": 20000,  # 0 disables lazy highlighting
+    "async_open_threshold_mb": 2,  # Files at least this large are read in the background; 0 disables
+    "large_file_viewer_threshold_mb": 100,  # Files at least this large open in the read-only viewer; 0 disables
+    "file_watch_poll_interval_seconds": 2,  # Used for projects that cannot be watched through inotify
+
     # --- Project State ---
     "open_projects": [],
     "active_project_path": None,
@@ -0,0 +1,428 @@
+# PuffinPyEditor/app_core/symbol_index.py
+"""
+A project-wide index of Python symbols: classes, functions, methods and
+module-level assignments, read with `ast`.
+
+The index lives in an SQLite database in the app data directory, so
+reopening a project only re-parses files whose size or mtime changed. A
+SymbolIndexer on a background thread keeps it in sync with each open
+project, first by walking the project and afterwards from file watcher
+events. SymbolIndexManager holds the symbols in memory on the UI thread
+and answers fuzzy "go to symbol" searches and exact name lookups.
+"""
+import ast
+import builtins
+import heapq
+import os
+import re
+import sqlite3
+import time
+from bisect import bisect_right
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+from PyQt6.QtCore import QObject, QThread, pyqtSignal
+from utils.logger import log, get_app_data_path
+from .file_watcher import UNWATCHED_DIR_PREFIXES
+
+SYMBOL_INDEX_FILE = os.path.join(get_app_data_path(), "symbol_index.sqlite3")
+SCHEMA_VERSION = 1
+PYTHON_EXTENSIONS = ('.py', '.pyw')
+MAX_FILE_BYTES = 2 * 1024 * 1024  # Larger files are almost always generated; they are not indexed
+
+CLASS, FUNCTION, METHOD, VARIABLE = 'class', 'function', 'method', 'variable'
+KIND_ORDER = {CLASS: 0, FUNCTION: 1, METHOD: 2, VARIABLE: 3}
+
+# (name, kind, container ('' or the enclosing class), line (1-based), column (0-based))
+FileSymbol = Tuple[str, str, str, int, int]
+# (name, kind, container, path, line, column)
+Symbol = Tuple[str, str, str, str, int, int]
+
+
+def extract_symbols(source: str) -> Optional[List[FileSymbol]]:
+    """The symbols a module defines, or None if it does not parse."""
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return None
+    symbols: List[FileSymbol] = []
+
+    def visit(body: List[ast.stmt], container: str):
+        for node in body:
+            if isinstance(node, ast.ClassDef):
+                symbols.append((node.name, CLASS, container, node.lineno, node.col_offset))
+                visit(node.body, f"{container}.{node.name}" if container else node.name)
+            elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                symbols.append((node.name, METHOD if container else FUNCTION, container, node.lineno, node.col_offset))
+            elif not container and isinstance(node, (ast.Assign, ast.AnnAssign)):
+                targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+                for target in targets:
+                    for name in (target.elts if isinstance(target, ast.Tuple) else [target]):
+                        if isinstance(name, ast.Name):
+                            symbols.append((name.id, VARIABLE, '', name.lineno, name.col_offset))
+            elif isinstance(node, (ast.If, ast.Try, ast.With)):
+                # Module-level definitions are often guarded: try/except imports, TYPE_CHECKING...
+                for block in ('body', 'orelse', 'finalbody'):
+                    visit(getattr(node, block, []), container)
+                for handler in getattr(node, 'handlers', []):
+                    visit(handler.body, container)
+
+    visit(tree.body, '')
+    return symbols
+
+
+def only_binds_to(source: str, path: str, name: str, symbol: Symbol) -> bool:
+    """
+    Whether name, read in the module at path, can only mean symbol: every
+    binding of it there is symbol's own definition or imports it from the
+    module symbol lives in. A name bound nowhere qualifies unless it is a
+    builtin. False if the module does not parse.
+    """
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return False
+    own_definition = os.path.normpath(path) == os.path.normpath(symbol[3])
+    defining_module = os.path.splitext(os.path.normpath(symbol[3]))[0]
+    if os.path.basename(defining_module) == '__init__':
+        defining_module = os.path.dirname(defining_module)
+    bound = False
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ImportFrom):
+            for alias in node.names:
+                if (alias.asname or alias.name) == name:
+                    # `from a.b import name` is the symbol if it is defined in a/b.py or a/b/__init__.py.
+                    module = (node.module or '').replace('.', os.sep)
+                    if alias.name != name or not module or not (
+                            defining_module == module or defining_module.endswith(os.sep + module)):
+                        return False
+                    bound = True
+        elif isinstance(node, ast.Import):
+            if any((alias.asname or alias.name.partition('.')[0]) == name for alias in node.names):
+                return False
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            if node.name == name:
+                if not (own_definition and (node.lineno, node.col_offset) == (symbol[4], symbol[5])):
+                    return False
+                bound = True
+        elif (isinstance(node, ast.Name) and node.id == name and not isinstance(node.ctx, ast.Load)
+              or isinstance(node, ast.arg) and node.arg == name
+              or isinstance(node, (ast.ExceptHandler, ast.MatchAs, ast.MatchStar)) and node.name == name
+              or isinstance(node, (ast.Global, ast.Nonlocal)) and name in node.names):
+            return False
+    return bound or not hasattr(builtins, name)
+
+
+def iter_python_files(project_root: str) -> Iterator[str]:
+    """Every Python file in a project, skipping the directories the file watcher skips."""
+    for dirpath, dirnames, filenames in os.walk(project_root):
+        dirnames[:] = [d for d in dirnames if not d.startswith(UNWATCHED_DIR_PREFIXES)]
+        for name in filenames:
+            if name.endswith(PYTHON_EXTENSIONS):
+                yield os.path.normpath(os.path.join(dirpath, name))
+
+
+def _path_range(project_root: str) -> Tuple[str, str]:
+    """Bounds such that lower <= path < upper holds exactly for the paths under project_root."""
+    root = os.path.normpath(project_root)
+    return root + os.sep, root + chr(ord(os.sep) + 1)
+
+
+class SymbolStore:
+    """The on-disk index. Only used from the SymbolIndexer's thread."""
+
+    def __init__(self, path: str = SYMBOL_INDEX_FILE):
+        self.connection = sqlite3.connect(path)
+        if self.connection.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            self.connection.executescript(f"""
+                DROP TABLE IF EXISTS files;
+                DROP TABLE IF EXISTS symbols;
+                CREATE TABLE files (path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER);
+                CREATE TABLE symbols (path TEXT, name TEXT, kind TEXT, container TEXT, line INTEGER, col INTEGER);
+                CREATE INDEX symbols_by_path ON symbols (path);
+                PRAGMA user_version = {SCHEMA_VERSION};
+            """)
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.execute("PRAGMA synchronous = NORMAL")
+
+    def close(self):
+        self.connection.close()
+
+    def files_under(self, project_root: str) -> Dict[str, Tuple[int, int]]:
+        """path -> (size, mtime_ns) for the indexed files of a project."""
+        rows = self.connection.execute(
+            "SELECT path, size, mtime_ns FROM files WHERE path >= ? AND path < ?", _path_range(project_root))
+        return {path: (size, mtime_ns) for path, size, mtime_ns in rows}
+
+    def symbols_under(self, project_root: str) -> Dict[str, List[FileSymbol]]:
+        symbols: Dict[str, List[FileSymbol]] = {path: [] for path in self.files_under(project_root)}
+        rows = self.connection.execute(
+            "SELECT path, name, kind, container, line, col FROM symbols WHERE path >= ? AND path < ?",
+            _path_range(project_root))
+        for path, name, kind, container, line, col in rows:
+            symbols.setdefault(path, []).append((name, kind, container, line, col))
+        return symbols
+
+    def replace(self, updates: Dict[str, Tuple[int, int, List[FileSymbol]]], deleted: List[str]):
+        """Stores the symbols of re-read files (path -> (size, mtime_ns, symbols)) and drops deleted ones."""
+        with self.connection:
+            stale = [(path,) for path in list(updates) + deleted]
+            self.connection.executemany("DELETE FROM symbols WHERE path = ?", stale)
+            self.connection.executemany("DELETE FROM files WHERE path = ?", stale)
+            self.connection.executemany("INSERT INTO files VALUES (?, ?, ?)",
+                                        [(path, size, mtime) for path, (size, mtime, _) in updates.items()])
+            self.connection.executemany("INSERT INTO symbols VALUES (?, ?, ?, ?, ?, ?)",
+                                        [(path, *symbol) for path, (_, _, symbols) in updates.items()
+                                         for symbol in symbols])
+
+
+class SymbolIndexer(QObject):
+    """
+    Runs on a background thread. Brings the stored index of a project up to
+    date and reports symbols per file through files_indexed as it goes;
+    an empty list means the file no longer contributes any.
+    """
+    BATCH_FILES = 200
+
+    files_indexed = pyqtSignal(str, object)  # project root, {path: [FileSymbol, ...]}
+    project_indexed = pyqtSignal(str, int)  # project root, indexed files
+
+    def __init__(self, db_path: str = SYMBOL_INDEX_FILE):
+        super().__init__()
+        self.db_path = db_path
+        self._store: Optional[SymbolStore] = None
+
+    def _open_store(self) -> Optional[SymbolStore]:
+        if self._store is None:
+            try:
+                self._store = SymbolStore(self.db_path)
+            except sqlite3.Error as e:
+                log.error(f"Could not open the symbol index {self.db_path}: {e}")
+        return self._store
+
+    def index_project(self, project_root: str):
+        """Reports the stored symbols of a project at once, then re-reads whatever changed on disk."""
+        if not (store := self._open_store()):
+            return
+        start = time.perf_counter()
+        try:
+            self.files_indexed.emit(project_root, store.symbols_under(project_root))
+            known = store.files_under(project_root)
+            changed = []
+            for path in iter_python_files(project_root):
+                if QThread.currentThread().isInterruptionRequested():
+                    return
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                if known.pop(path, None) != (stat.st_size, stat.st_mtime_ns):
+                    changed.append(path)
+            for i in range(0, len(changed), self.BATCH_FILES):
+                if QThread.currentThread().isInterruptionRequested():
+                    return
+                self._reindex(project_root, changed[i:i + self.BATCH_FILES], [])
+            self._reindex(project_root, [], list(known))
+            total = len(store.files_under(project_root))
+        except sqlite3.Error as e:
+            log.error(f"Symbol index update for {project_root} failed: {e}")
+            return
+        log.info(f"Indexed symbols of {project_root} in {(time.perf_counter() - start) * 1000:.0f} ms "
+                 f"({len(changed)} of {total} files re-read)")
+        self.project_indexed.emit(project_root, total)
+
+    def update_files(self, project_root: str, changed: List[str], deleted: List[str]):
+        """Re-reads changed files and forgets deleted files and directories."""
+        if not (store := self._open_store()):
+            return
+        try:
+            gone = []
+            for path in deleted:
+                if not os.path.exists(path):
+                    gone.append(path)
+                    gone.extend(store.files_under(path))  # A deleted directory takes its files along
+            self._reindex(project_root, changed, list(dict.fromkeys(gone)))
+        except sqlite3.Error as e:
+            log.error(f"Symbol index update for {project_root} failed: {e}")
+
+    def _reindex(self, project_root: str, paths: List[str], deleted: List[str]):
+        updates: Dict[str, Tuple[int, int, List[FileSymbol]]] = {}
+        for path in paths:
+            try:
+                stat = os.stat(path)
+                if stat.st_size > MAX_FILE_BYTES:
+                    symbols = []
+                else:
+                    with open(path, 'rb') as f:
+                        symbols = extract_symbols(f.read().decode('utf-8', errors='replace'))
+            except OSError:
+                deleted.append(path)
+                continue
+            if symbols is not None:
+                updates[path] = (stat.st_size, stat.st_mtime_ns, symbols)
+            # A file that does not parse (e.g. saved mid-edit) keeps its last symbols and is retried.
+        if updates or deleted:
+            self._store.replace(updates, deleted)
+            result = {path: symbols for path, (_, _, symbols) in updates.items()}
+            result.update(dict.fromkeys(deleted, []))
+            self.files_indexed.emit(project_root, result)
+
+    def close(self):
+        if self._store:
+            self._store.close()
+            self._store = None
+
+
+class SymbolIndexManager(QObject):
+    """
+    Keeps the symbols of the open projects in memory, fed by a SymbolIndexer
+    on its own thread, and answers searches on the UI thread.
+
+    search() matches the query as a case-insensitive subsequence of symbol
+    names. Every distinct name is kept in one newline-separated string so a
+    single regular expression finds the candidates at C speed; each name is
+    scored once, however many symbols share it.
+    """
+    MAX_RESULTS = 100
+
+    index_updated = pyqtSignal()
+    indexing_finished = pyqtSignal(str, int)  # project root, indexed files
+
+    _request_index_project = pyqtSignal(str)
+    _request_update_files = pyqtSignal(str, list, list)
+    _request_close = pyqtSignal()
+
+    def __init__(self, parent: Optional[QObject] = None, db_path: str = SYMBOL_INDEX_FILE):
+        super().__init__(parent)
+        self.thread = QThread()
+        self.indexer = SymbolIndexer(db_path)
+        self.indexer.moveToThread(self.thread)
+        self._request_index_project.connect(self.indexer.index_project)
+        self._request_update_files.connect(self.indexer.update_files)
+        self._request_close.connect(self.indexer.close)
+        self.indexer.files_indexed.connect(self._on_files_indexed)
+        self.indexer.project_indexed.connect(self._on_project_indexed)
+        self.thread.start()
+
+        self._projects: Dict[str, Dict[str, List[FileSymbol]]] = {}
+        self._indexing: Set[str] = set()
+        self._by_lower_name: Dict[str, List[Symbol]] = {}
+        self._lower_names: List[str] = []  # The keys of _by_lower_name
+        self._names = ""  # _lower_names, one per line
+        self._name_starts: List[int] = []  # Offset of each name in _names
+        self._stale = True
+
+    def set_projects(self, project_roots: List[str]):
+        """Indexes exactly these projects from now on."""
+        wanted = [os.path.normpath(root) for root in project_roots if root and os.path.isdir(root)]
+        for root in set(self._projects) - set(wanted):
+            del self._projects[root]
+            self._indexing.discard(root)
+            self._stale = True
+        for root in wanted:
+            if root not in self._projects:
+                self._projects[root] = {}
+                self._indexing.add(root)
+                self._request_index_project.emit(root)
+        if self._stale:
+            self.index_updated.emit()
+
+    def is_indexing(self) -> bool:
+        return bool(self._indexing)
+
+    def on_files_changed(self, change_set):
+        """Re-reads the Python files a ChangeSet touches in the indexed projects."""
+        for root in self._projects:
+            if change_set.overflowed:
+                self._indexing.add(root)
+                self._request_index_project.emit(root)
+                continue
+            prefix = root + os.sep
+            changed = sorted(p for p in change_set.created | change_set.modified
+                             if p.startswith(prefix) and p.endswith(PYTHON_EXTENSIONS) and os.path.isfile(p))
+            deleted = sorted(p for p in change_set.deleted if p.startswith(prefix))
+            if changed or deleted:
+                self._request_update_files.emit(root, changed, deleted)
+
+    def search(self, query: str, limit: int = MAX_RESULTS) -> List[Symbol]:
+        """
+        The best matches for a fuzzy query: exact names, then prefixes, then
+        names containing the query, then subsequence matches with the fewest
+        skipped characters. Later tiers are only searched while earlier ones
+        have matched fewer than `limit` symbols.
+        """
+        query = ''.join(query.lower().split())
+        if not query:
+            return []
+        self._rebuild()
+        tiers = [re.compile(re.escape("\n" + query)), re.compile(re.escape(query)),
+                 re.compile("[^\n]*?".join(map(re.escape, query)))]
+        seen: Set[int] = set()
+        scored, matched = [], 0
+        for tier, pattern in enumerate(tiers):
+            for match in pattern.finditer(self._names):
+                i = bisect_right(self._name_starts, match.end() - 1) - 1  # A match never spans two names
+                if i in seen:
+                    continue
+                seen.add(i)
+                name = self._lower_names[i]
+                if tier == 0:
+                    rank = 0 if name == query else 1
+                elif tier == 1:
+                    rank = 2
+                else:
+                    rank = 3 + match.end() - match.start() - len(query)  # Fewer skipped characters first
+                scored.append((rank, len(name), name))
+                matched += len(self._by_lower_name[name])
+            if matched >= limit:
+                break
+        results: List[Symbol] = []
+        for _, _, name in heapq.nsmallest(limit, scored):
+            results.extend(sorted(self._by_lower_name[name], key=lambda s: (KIND_ORDER[s[1]], s[0], s[3], s[4])))
+            if len(results) >= limit:
+                break
+        return results[:limit]
+
+    def definitions(self, name: str) -> List[Symbol]:
+        """Every indexed symbol with exactly this name."""
+        self._rebuild()
+        return [symbol for symbol in self._by_lower_name.get(name.lower(), []) if symbol[0] == name]
+
+    def shutdown(self):
+        self.thread.requestInterruption()
+        self._request_close.emit()
+        if self.thread.isRunning():
+            self.thread.quit()
+            self.thread.wait(3000)
+
+    def _on_files_indexed(self, project_root: str, results: Dict[str, List[FileSymbol]]):
+        if (symbols := self._projects.get(project_root)) is None:
+            return
+        for path, file_symbols in results.items():
+            if file_symbols:
+                symbols[path] = file_symbols
+            else:
+                symbols.pop(path, None)
+        self._stale = True
+        self.index_updated.emit()
+
+    def _on_project_indexed(self, project_root: str, total: int):
+        if project_root in self._projects:
+            self._indexing.discard(project_root)
+            self.indexing_finished.emit(project_root, total)
+
+    def _rebuild(self):
+        if not self._stale:
+            return
+        files: Dict[str, List[FileSymbol]] = {}
+        for symbols in self._projects.values():
+            files.update(symbols)  # Nested projects share their files
+        self._by_lower_name = {}
+        for path, file_symbols in files.items():
+            for name, kind, container, line, col in file_symbols:
+                self._by_lower_name.setdefault(name.lower(), []).append((name, kind, container, path, line, col))
+        self._lower_names = list(self._by_lower_name)
+        self._name_starts, position = [], 1
+        for name in self._lower_names:
+            self._name_starts.append(position)
+            position += len(name) + 1
+        self._names = "\n" + "\n".join(self._lower_names)  # Every name follows a newline, for prefix matches
+        self._stale = False
@@ -2,8 +2,10 @@
 """
 This module serves as a central import point for all built-in syntax
 highlighters. This prevents code duplication and makes it easier to manage
-and extend language support.
+and extend language support. Plugins adding a language can build on the
+shared GrammarHighlighter/LanguageGrammar engine re-exported here.
 """
+from .highlighters.highlighting_engine import GrammarHighlighter, LanguageGrammar
 from .highlighters.python_syntax_highlighter import PythonSyntaxHighlighter
 from .highlighters.json_syntax_highlighter import JsonSyntaxHighlighter
 from .highlighters.html_syntax_highlighter import HtmlSyntaxHighlighter
@@ -14,6 +16,8 @@ from .highlighters.javascript_syntax_highlighter import JavaScriptSyntaxHighligh
 from .highlighters.rust_syntax_highlighter import RustSyntaxHighlighter
 
 __all__ = [
+    "GrammarHighlighter",
+    "LanguageGrammar",
     "PythonSyntaxHighlighter",
     "JsonSyntaxHighlighter",
     "HtmlSyntaxHighlighter",
@@ -0,0 +1,45 @@
+# PuffinPyEditor/app_core/text_decoding.py
+"""
+How the editor decodes files, shared by the file handler and by process
+pool workers that need the same text the editor would show. Nothing here
+imports Qt.
+"""
+import mmap
+import os
+from typing import Tuple
+
+# Byte order marks, checked longest first, and the codec that strips them.
+BOM_ENCODINGS = [(b'\xef\xbb\xbf', 'utf-8-sig'), (b'\xff\xfe', 'utf-16'), (b'\xfe\xff', 'utf-16')]
+UTF16_BOMS = (b'\xff\xfe', b'\xfe\xff')
+MMAP_THRESHOLD_BYTES = 4 * 1024 * 1024  # Files at least this large are mapped rather than read
+
+
+def looks_binary(head: bytes) -> bool:
+    """Whether a file's first bytes hold a NUL that a UTF-16 byte order mark does not account for."""
+    return b'\0' in head and not head.startswith(UTF16_BOMS)
+
+
+def decode_file_bytes(data) -> Tuple[str, str]:
+    """
+    Decodes a file's raw bytes (bytes or any buffer, e.g. an mmap) with a
+    single pass: a BOM picks the codec outright, otherwise UTF-8 is tried and
+    Latin-1, which accepts any byte sequence, is the fallback.
+    Returns (text, encoding).
+    """
+    head = bytes(data[:3])
+    for bom, encoding in BOM_ENCODINGS:
+        if head.startswith(bom):
+            return str(data, encoding), encoding
+    try:
+        return str(data, 'utf-8'), 'utf-8'
+    except UnicodeDecodeError:
+        return str(data, 'latin-1'), 'latin-1'
+
+
+def read_file_bytes_and_decode(filepath: str) -> Tuple[str, str]:
+    """Reads a file once, mapping it when it is large, and decodes it with decode_file_bytes."""
+    with open(filepath, 'rb') as f:
+        if os.fstat(f.fileno()).st_size < MMAP_THRESHOLD_BYTES:
+            return decode_file_bytes(f.read())
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return decode_file_bytes(mapped)
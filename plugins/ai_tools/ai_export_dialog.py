@@ -484,7 +484,8 @@ class AIExportDialog(QDialog):
         try: self.linter_manager.project_lint_results_ready.disconnect(self._on_lint_complete)
         except TypeError: pass
         self.linter_manager.project_lint_results_ready.connect(self._on_lint_complete)
-        self.linter_manager.lint_project(self.project_path)
+        self.linter_manager.lint_files(self.project_path, [f for f in self.selected_files if f.endswith('.py')],
+                                       publish=False)
 
     def _on_lint_complete(self, all_problems: Dict[str, List[Dict]]):
         if self.progress.wasCanceled():
@@ -0,0 +1,82 @@
+# PuffinPyEditor/tools/benchmark_explorer_icons.py
+"""
+Development tool, not part of the application: measures how long the
+explorer takes to populate a folder of many files, from expanding it to
+having an icon for every row, with CustomFileIconProvider's icon cache and
+with the cache bypassed. Bypassing it renders a fresh qtawesome icon for
+every lookup, which is what the provider did before it had a cache.
+
+Run from the project root:
+    python -m tools.benchmark_explorer_icons [file counts...]
+Set QT_QPA_PLATFORM=offscreen to run it without a display.
+"""
+import os
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+from typing import List
+
+EXTENSIONS = ['.py', '.md', '.json', '.txt', '.html', '.css', '.js', '.png', '.toml', '.xyz']
+NAMED_FILES = ['requirements.txt', 'README.md', '.gitignore', 'Dockerfile']
+WARM_RUNS = 4
+
+
+def build_folder(root: str, file_count: int):
+    for name in NAMED_FILES:
+        open(os.path.join(root, name), 'w').close()
+    for i in range(file_count - len(NAMED_FILES)):
+        open(os.path.join(root, f"file_{i}{EXTENSIONS[i % len(EXTENSIONS)]}"), 'w').close()
+
+
+def _populate(model, app, folder: str) -> float:
+    """Returns the seconds from expanding the folder until every row has its icon."""
+    from PyQt6.QtCore import Qt, QModelIndex
+    start = time.perf_counter()
+    model.set_roots([folder])
+    root = model.index(0, 0, QModelIndex())
+    model.fetchMore(root)
+    while model.canFetchMore(root) or model.rowCount(root) == 0:
+        app.processEvents()
+    for row in range(model.rowCount(root)):
+        model.data(model.index(row, 0, root), Qt.ItemDataRole.DecorationRole)
+    return time.perf_counter() - start
+
+
+def run(file_counts: List[int]):
+    from PyQt6.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication(sys.argv)
+
+    import qtawesome as qta
+    from app_core.theme_manager import ThemeManager
+    from ui.explorer.file_system_model import FileSystemModel
+    from ui.explorer.icon_provider import CustomFileIconProvider
+
+    class UncachedIconProvider(CustomFileIconProvider):
+        def cached_icon(self, icon_name, color):
+            return qta.icon(icon_name, color=color) if color else qta.icon(icon_name)
+
+    theme_manager = ThemeManager()
+    # The provider only asks the API for the main window's theme manager.
+    api = SimpleNamespace(get_main_window=lambda: SimpleNamespace(theme_manager=theme_manager))
+    print(f"{'files':>8} {'icons':>9} {'cold':>9} {'warm (mean)':>12}")
+    for file_count in file_counts:
+        with tempfile.TemporaryDirectory() as folder:
+            build_folder(folder, file_count)
+            for mode, provider_class in (("uncached", UncachedIconProvider), ("cached", CustomFileIconProvider)):
+                provider = provider_class(api)
+                timings = []
+                for _ in range(1 + WARM_RUNS):
+                    # A new model each run, so the folder is scanned again; the provider is kept,
+                    # as it is in the application when a folder is collapsed and expanded again.
+                    model = FileSystemModel(provider, theme_manager)
+                    timings.append(_populate(model, app, folder))
+                    model.deleteLater()
+                    app.processEvents()
+                warm = sum(timings[1:]) / WARM_RUNS
+                print(f"{file_count:>8} {mode:>9} {timings[0] * 1000:>7.1f}ms {warm * 1000:>10.1f}ms")
+
+
+if __name__ == "__main__":
+    counts = [int(arg) for arg in sys.argv[1:]] or [1000, 10_000]
+    run(counts)
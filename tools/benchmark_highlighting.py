@@ -0,0 +1,84 @@
+# PuffinPyEditor/tools/benchmark_highlighting.py
+"""
+Development tool, not part of the application: measures how long it takes
+for a large Python file to become interactive in an EditorWidget with eager
+highlighting, with lazy highlighting, and with no highlighter at all. The
+last is the floor lazy highlighting can approach: loading and laying out
+the text, the line index and the minimap.
+
+Run from the project root:
+    python -m tools.benchmark_highlighting [line counts...]
+Set QT_QPA_PLATFORM=offscreen to run it without a display.
+"""
+import sys
+import time
+from typing import List
+
+SNIPPET = '''class Widget{n}(Base):
+    """A generated class.
+
+    It has a docstring spanning lines to exercise multi-line state.
+    """
+
+    def method_{n}(self, value: int = {n}) -> str:
+        # A comment with "quotes" inside
+        result = [x * 2 for x in range(value) if x % 3]
+        return f"{{self!r}}: {{result}}"  # trailing comment
+
+'''
+
+
+def build_source(line_count: int) -> str:
+    lines_per_snippet = SNIPPET.count('\n')
+    parts = [SNIPPET.format(n=i) for i in range(line_count // lines_per_snippet + 1)]
+    return "".join(parts)
+
+
+def _measure(editor, app, text: str) -> tuple:
+    """Returns (seconds until the tab is interactive, seconds until fully highlighted)."""
+    start = time.perf_counter()
+    editor.set_text(text)
+    app.processEvents()
+    editor.text_area.viewport().repaint()
+    interactive = time.perf_counter() - start
+    while getattr(editor.highlighter, 'is_lazy_highlighting', False):
+        app.processEvents()
+    return interactive, time.perf_counter() - start
+
+
+def run(line_counts: List[int]):
+    from PyQt6.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication(sys.argv)
+
+    from app_core.settings_manager import settings_manager
+    from app_core.theme_manager import ThemeManager
+    from app_core.syntax_highlighters import PythonSyntaxHighlighter
+    from ui.editor_widget import EditorWidget, HighlightManager
+
+    theme_manager = ThemeManager()
+    original_threshold = settings_manager.get("lazy_highlighting_threshold_lines")
+    print(f"{'lines':>8} {'mode':>6} {'interactive':>12} {'fully highlighted':>18}")
+    try:
+        for line_count in line_counts:
+            text = build_source(line_count)
+            for mode, threshold in (("plain", 0), ("eager", 0), ("lazy", 1)):
+                # Only touch the in-memory settings; nothing is written to disk.
+                settings_manager.settings["lazy_highlighting_threshold_lines"] = threshold
+                PythonSyntaxHighlighter.GRAMMAR.clear_cache()
+                editor = EditorWidget(None, None, HighlightManager(), theme_manager)
+                editor.resize(1200, 900)
+                editor.show()
+                if mode != "plain":
+                    editor.set_highlighter(PythonSyntaxHighlighter)
+                interactive, total = _measure(editor, app, text)
+                print(f"{line_count:>8} {mode:>6} {interactive:>11.3f}s {total:>17.3f}s")
+                editor.close()
+                editor.deleteLater()
+                app.processEvents()
+    finally:
+        settings_manager.settings["lazy_highlighting_threshold_lines"] = original_threshold
+
+
+if __name__ == "__main__":
+    counts = [int(arg) for arg in sys.argv[1:]] or [50_000, 200_000]
+    run(counts)
@@ -4,18 +4,20 @@ PuffinPyEditor - Advanced Editor Widget
 """
 from __future__ import annotations
 from typing import Optional, Set, Dict, List, Tuple, TYPE_CHECKING
-import re
 import os
+from array import array
 from math import cos, sin
 
 from PyQt6.QtWidgets import (QWidget, QPlainTextEdit, QTextEdit, QHBoxLayout, QVBoxLayout, QSplitter, QApplication)
 from PyQt6.QtGui import (QPainter, QColor, QFont, QPaintEvent, QTextFormat,
                          QTextBlockFormat, QPen, QTextCursor, QMouseEvent, QFontMetrics,
-                         QKeyEvent, QTextDocument, QKeySequence, QWheelEvent, QPolygonF, QSyntaxHighlighter)
+                         QKeyEvent, QTextDocument, QKeySequence, QWheelEvent, QPolygonF, QSyntaxHighlighter, QImage)
 from PyQt6.QtCore import (Qt, QSize, QRect, QRectF, QPointF, QEvent, pyqtSignal,
                           QObject, QTimer, QPoint)
 import qtawesome as qta
 from app_core.settings_manager import settings_manager
+from app_core.outline_index import OutlineIndex
+from app_core.replace_engine import compile_find_pattern, replacement_ranges, to_document_position, to_text_index
 from .widgets.find_panel import FindPanel
 from utils.logger import log
 
@@ -85,36 +87,91 @@ class GutterWidget(QWidget):
 
 
 class MiniMapWidget(QWidget):
+    """
+    Shows the whole document squeezed to the widget height. Every line is reduced
+    to a (start x, end x) pair kept in two compact arrays that are patched from
+    contentsChange; the bars are rendered into a cached QImage and only the rows
+    covering edited lines are redrawn, so scrolling just blits the image. An edit
+    adding or removing lines redraws the rows from the edit down; the scale, and
+    with it the whole image, only changes once the line count has drifted by more
+    than RESCALE_DRIFT, until then the last rows may run past the bottom edge.
+    """
+    LINE_HEIGHT_MAP, BLANK, RESCALE_DRIFT = 2.0, 0xFFFF, 0.02
     def __init__(self, editor: 'CodeEditor'):
         super().__init__(editor.container)
         self.editor = editor
         self.setCursor(Qt.CursorShape.PointingHandCursor)
         self.setMinimumWidth(80)
+        self._starts, self._ends = array('H'), array('H')
+        self._image: Optional[QImage] = None; self._px_per_line = self.LINE_HEIGHT_MAP
+        self._load_lines(0, self.editor.document().blockCount() - 1, 0, -1)
         self.editor.verticalScrollBar().valueChanged.connect(self.update)
-        self.editor.document().blockCountChanged.connect(self.update)
+        self.editor.document().contentsChange.connect(self._on_contents_change)
+
+    def invalidate(self): self._image = None; self.update()
+    def resizeEvent(self, event): self._image = None; super().resizeEvent(event)
+
+    @classmethod
+    def _line_extent(cls, text: str) -> Tuple[int, int]:
+        stripped = text.lstrip()
+        if not stripped: return cls.BLANK, 0
+        indent = len(text) - len(stripped)
+        return min(cls.BLANK - 1, int(indent * 1.5)), min(cls.BLANK, int(indent * 1.5 + len(stripped) * 0.8) + 1)
+
+    def _load_lines(self, first: int, last_new: int, old_first: int, last_old: int):
+        starts, ends, block, number = array('H'), array('H'), self.editor.document().findBlockByNumber(first), first
+        while block.isValid() and number <= last_new:
+            start, end = self._line_extent(block.text()); starts.append(start); ends.append(end)
+            block, number = block.next(), number + 1
+        self._starts[old_first:last_old + 1], self._ends[old_first:last_old + 1] = starts, ends
+
+    def _on_contents_change(self, position: int, chars_removed: int, chars_added: int):
+        doc = self.editor.document(); total = doc.blockCount()
+        first = max(0, doc.findBlock(position).blockNumber())
+        last_block = doc.findBlock(position + chars_added)
+        last_new = last_block.blockNumber() if last_block.isValid() else total - 1
+        old_total = len(self._starts); last_old = last_new - (total - old_total)
+        self._load_lines(first, last_new, first, last_old)
+        if self._image is None: return
+        ppl = self._px_per_line
+        if abs(self._compute_px_per_line() - ppl) > ppl * self.RESCALE_DRIFT: self._image = None
+        elif last_old == last_new: self._render_rows(int(first * ppl), int((last_new + 1) * ppl + 0.999) - 1)
+        else: self._render_rows(int(first * ppl), int(max(old_total, total) * ppl + 0.999))  # Every line below moved
+        self.update()
+
+    def _compute_px_per_line(self) -> float: return min(self.LINE_HEIGHT_MAP, self.height() / max(1, len(self._starts)))
+
+    def _content_height(self) -> float: return min(self.height(), len(self._starts) * self._px_per_line)
+
+    def _render_rows(self, first_row: int, last_row: int):
+        colors = self.editor.container.theme_manager.current_theme_data.get('colors', {})
+        painter, ppl, count = QPainter(self._image), self._px_per_line, len(self._starts)
+        first_row, last_row = max(0, first_row), min(self._image.height() - 1, last_row)
+        painter.fillRect(0, first_row, self._image.width(), last_row - first_row + 1, QColor(colors.get('editorGutter.background', '#16161e')))
+        foreground, starts, ends = QColor(colors.get('editor.foreground', '#c0caf5')), self._starts, self._ends
+        for row in range(first_row, last_row + 1):
+            a = int(row / ppl)
+            if a >= count: break
+            b = max(a + 1, int((row + 1) / ppl))
+            right = max(ends[a:b])
+            if right: left = min(starts[a:b]); painter.fillRect(left, row, max(1, right - left), 1, foreground)
+        painter.end()
+
+    def _ensure_image(self):
+        if self._image is not None and self._image.size() == self.size(): return
+        self._px_per_line = self._compute_px_per_line()
+        self._image = QImage(self.size(), QImage.Format.Format_ARGB32_Premultiplied)
+        self._render_rows(0, self.height() - 1)
 
     def paintEvent(self, event: QPaintEvent):
         painter, colors = QPainter(self), self.editor.container.theme_manager.current_theme_data.get('colors', {})
-        painter.fillRect(self.rect(), QColor(colors.get('editorGutter.background', '#16161e')))
-        doc, v_scroll = self.editor.document(), self.editor.verticalScrollBar()
-        if doc.blockCount() == 0: return
-        line_height_map, total_content_height = 2.0, doc.blockCount() * 2.0
-        scale = min(1.0, self.height() / total_content_height if total_content_height > 0 else 1.0)
-        scroll_proportion = v_scroll.value() / (v_scroll.maximum() or 1)
-        scroll_offset = -(total_content_height - self.height()) * scroll_proportion if total_content_height > self.height() else 0
-        painter.setPen(QColor(colors.get('editor.foreground', '#c0caf5')))
-        for i in range(doc.blockCount()):
-            block = doc.findBlockByNumber(i); text = block.text().lstrip()
-            if not text: continue
-            y = scroll_offset + (i * line_height_map * scale)
-            if y > self.height(): break
-            x = (len(block.text()) - len(text)) * 1.5; width = len(text) * 0.8
-            painter.drawRect(QRectF(x, y, width, max(1.0, line_height_map * scale)))
+        if self.width() <= 0 or self.height() <= 0: return
+        self._ensure_image(); painter.drawImage(0, 0, self._image)
+        total = len(self._starts)
+        if total == 0: return
         first_visible = self.editor.firstVisibleBlock().blockNumber()
         visible_blocks = self.editor.viewport().height() // self.editor.fontMetrics().height() if self.editor.fontMetrics().height() > 0 else 0
-        viewport_y = scroll_offset + (first_visible * line_height_map * scale)
-        viewport_h = max(1.0, visible_blocks * line_height_map * scale)
-        viewport_rect = QRectF(0, viewport_y, self.width() - 1, viewport_h)
+        viewport_rect = QRectF(0, first_visible * self._px_per_line, self.width() - 1, max(1.0, visible_blocks * self._px_per_line))
         painter.fillRect(viewport_rect, QColor(colors.get('editorGutter.ruler.color', '#41a6b530')))
         painter.setPen(QPen(QColor(colors.get('editorGutter.ruler.color', '#41a6b5')), 1)); painter.drawRect(viewport_rect)
 
@@ -122,35 +179,17 @@ class MiniMapWidget(QWidget):
     def mouseMoveEvent(self, e: QMouseEvent):
         if e.buttons() & Qt.MouseButton.LeftButton: self._scroll_from_mouse(e.position())
     def _scroll_from_mouse(self, pos: QPointF):
-        v_scroll = self.editor.verticalScrollBar()
-        v_scroll.setValue(int((pos.y() / self.height()) * v_scroll.maximum()) if self.height() > 0 else 0)
+        v_scroll, content_height = self.editor.verticalScrollBar(), self._content_height()
+        v_scroll.setValue(int(min(1.0, pos.y() / content_height) * v_scroll.maximum()) if content_height > 0 else 0)
 
 
 class CodeOutlineMinimap(MiniMapWidget):
-    LANG_PATTERNS = {
-        'python': [(re.compile(r"^\s*class\s+(\w+)"), 'class', 1), (re.compile(r"^\s*def\s+(_?[a-zA-Z0-9_]+)"), 'def', 1)],
-        'javascript': [(re.compile(r"^\s*class\s+(\w+)"), 'class', 1), (re.compile(r"^\s*function\s*\*?\s*(\w*)"), 'def', 1), (re.compile(r"^\s*(?:const|let|var)\s+([\w$]+)\s*=\s*(?:async\s*)?\("), 'def', 1)],
-        'csharp': [(re.compile(r"^\s*(?:public|private|protected|internal)?\s*(?:sealed|abstract)?\s*class\s+(\w+)"), 'class', 1), (re.compile(r"^\s*(?:public|private|protected|internal)?\s*struct\s+(\w+)"), 'class', 1), (re.compile(r"^\s*(?:public|private|protected|internal)?\s*(?:static|virtual|override|async|unsafe)?\s*[\w<>\[\],]+\s+([\w]+)\s*\("), 'def', 1)],
-        'cpp': [(re.compile(r"^\s*class\s+(\w+)"), 'class', 1), (re.compile(r"^\s*struct\s+(\w+)"), 'class', 1), (re.compile(r"^\w[\w\s\*&<>,:]*?([\w_]+)\s*\([^;]*\)\s*\{?$"), 'def', 1)],
-        'rust': [(re.compile(r"^\s*struct\s+(\w+)"), 'class', 1), (re.compile(r"^\s*enum\s+(\w+)"), 'class', 1), (re.compile(r"^\s*(?:pub\s)?(?:async\s)?fn\s+(\w+)"), 'def', 1)]}
-    LANG_MAP = {'.py': 'python', '.pyw': 'python', '.js': 'javascript', '.ts': 'javascript', '.cs': 'csharp', '.c': 'cpp', '.cpp': 'cpp', '.h': 'cpp', '.hpp': 'cpp', '.rs': 'rust'}
     def __init__(self, editor: 'CodeEditor', language_ext: str):
         super().__init__(editor); self.setMouseTracking(True); self.clickable_regions, self.hovered_region_index = [], -1
-        self.patterns = self.LANG_PATTERNS.get(self.LANG_MAP.get(language_ext, ''), [])
+        self.outline: OutlineIndex = editor.container.outline_index; self.outline.outline_changed.connect(self.update)
         self._load_icons()
     def _load_icons(self):
         self.class_icon, self.def_icon = qta.icon('fa5s.cubes', color="#E5C07B"), qta.icon('fa5s.cube', color="#61AFEF")
-    def _get_indent(self, text: str): return len(text) - len(text.lstrip())
-    def _precompute_structure(self) -> List[Tuple[int, int, str, str]]:
-        structure, doc = [], self.editor.document()
-        if not self.patterns: return structure
-        for i in range(doc.blockCount()):
-            text = doc.findBlockByNumber(i).text()
-            if not text.strip(): continue
-            for pattern, item_type, name_group_idx in self.patterns:
-                if match := pattern.match(text):
-                    if name := match.group(name_group_idx): structure.append((i, self._get_indent(text), item_type, name)); break
-        return structure
     def _format_name(self, name: str): return name.lstrip('_').replace('_', ' ').title()
     def mousePressEvent(self, event: QMouseEvent):
         if event.button() == Qt.MouseButton.LeftButton:
@@ -169,8 +208,8 @@ class CodeOutlineMinimap(MiniMapWidget):
         painter = QPainter(self); painter.setRenderHint(QPainter.RenderHint.Antialiasing)
         colors = self.editor.container.theme_manager.current_theme_data.get('colors', {})
         painter.fillRect(self.rect(), QColor(colors.get('editorGutter.background', '#16161e')))
-        structure = self._precompute_structure()
-        if not structure: super().paintEvent(event); return
+        structure = self.outline.entries()
+        if not structure: painter.end(); super().paintEvent(event); return
         self._draw_structure_items(painter, colors, structure); self._draw_viewport_indicator(painter, colors)
     def _draw_structure_items(self, painter, colors, structure):
         self.clickable_regions.clear(); row_height, icon_size, class_indent, def_indent = 24, 14, 10, 25
@@ -178,11 +217,11 @@ class CodeOutlineMinimap(MiniMapWidget):
         font_metrics, v_scroll = painter.fontMetrics(), self.editor.verticalScrollBar()
         total_content_height = len(structure) * row_height; scrollable_height = max(0, total_content_height - self.height())
         scroll_offset = -scrollable_height * (v_scroll.value() / (v_scroll.maximum() or 1))
-        for i, (line_num, indent, item_type, name) in enumerate(structure):
-            y_pos = i * row_height + scroll_offset
-            if y_pos + row_height < 0 or y_pos > self.height(): continue
+        first_row = max(0, int(-scroll_offset // row_height)); last_row = min(len(structure), first_row + self.height() // row_height + 2)
+        for i in range(first_row, last_row):
+            line_num, indent, item_type, name = structure[i]; y_pos = i * row_height + scroll_offset
             item_rect = QRectF(0, y_pos, self.width(), row_height); self.clickable_regions.append((item_rect, line_num))
-            if i == self.hovered_region_index: painter.fillRect(item_rect, QColor(colors.get('editor.lineHighlightBackground')).lighter(110))
+            if len(self.clickable_regions) - 1 == self.hovered_region_index: painter.fillRect(item_rect, QColor(colors.get('editor.lineHighlightBackground')).lighter(110))
             icon, indent_x = (self.class_icon, class_indent) if item_type == "class" else (self.def_icon, def_indent)
             icon.paint(painter, QRect(indent_x, int(y_pos + (row_height - icon_size) / 2), icon_size, icon_size))
             painter.setPen(class_color if item_type == "class" else func_color)
@@ -309,9 +348,10 @@ class CodeEditor(QPlainTextEdit):
         indent_width = self.container.settings.get("indent_width", 4)
         if indent_width <= 0: return
         tab_width, offset = self.fontMetrics().horizontalAdvance(' ') * indent_width, self.contentOffset()
-        block = self.firstVisibleBlock()
+        block, bottom = self.firstVisibleBlock(), event.rect().bottom()
         while block.isValid() and block.isVisible():
             geom, indent_level = self.blockBoundingGeometry(block), len(block.text()) - len(block.text().lstrip(' '))
+            if geom.top() + offset.y() > bottom: break
             for i in range(1, (indent_level // indent_width) + 1):
                 if (x := i * tab_width + offset.x() - 1) > 0: painter.drawLine(int(x), int(geom.top() + offset.y()), int(x), int(geom.bottom() + offset.y()))
             block = block.next()
@@ -347,11 +387,19 @@ class CodeEditor(QPlainTextEdit):
 
 
 class EditorWidget(QWidget):
+    LAZY_HIGHLIGHT_MARGIN = 100  # Blocks above/below the viewport highlighted eagerly in lazy mode
+    REVERT_CHECK_DELAY_MS = 400  # Idle time before checking whether an edit restored the saved text
+    LOAD_CHUNK_CHARS = 1 << 18  # Characters inserted per event-loop turn by load_text_in_chunks
     content_possibly_changed, cursor_position_display_updated, status_message_requested = pyqtSignal(), pyqtSignal(int, int), pyqtSignal(str, int)
+    modification_changed, load_progress, load_finished = pyqtSignal(bool), pyqtSignal(int), pyqtSignal()
     def __init__(self, puffin_api: 'PuffinPluginAPI', completion_manager: 'CompletionManager', highlight_manager: HighlightManager, theme_manager: 'ThemeManager', parent: Optional[QWidget] = None):
         super().__init__(parent); self.puffin_api, self.completion_manager, self.theme_manager, self.settings, self.highlight_manager = puffin_api, completion_manager, theme_manager, settings_manager, highlight_manager
         self.filepath: Optional[str] = None; self.highlighter: Optional[QSyntaxHighlighter] = None
         self.find_panel, self.text_area = FindPanel(self.theme_manager, self), CodeEditor(self)
+        self.outline_index = OutlineIndex(self.text_area.document(), parent=self)
+        self._clean_length, self._clean_hash = 0, hash("")
+        self._revert_check_timer = QTimer(self, singleShot=True, interval=self.REVERT_CHECK_DELAY_MS); self._revert_check_timer.timeout.connect(self._check_reverted_to_clean)
+        self._pending_load: Optional[Tuple[str, int]] = None; self._load_timer = QTimer(self, interval=0); self._load_timer.timeout.connect(self._insert_next_chunk)
         self.find_panel.hide(); self.gutter_widget, self.minimap_widget = GutterWidget(self.text_area), self._create_minimap()
         self._setup_layout(); self._connect_signals(); self.apply_styles_and_settings()
 
@@ -376,6 +424,9 @@ class EditorWidget(QWidget):
         self.text_area.updateRequest.connect(self._on_update_request)
         self.text_area.cursorPositionChanged.connect(self._on_cursor_position_changed)
         self.text_area.textChanged.connect(self.content_possibly_changed.emit)
+        self.text_area.textChanged.connect(self._schedule_revert_check)
+        self.document().modificationChanged.connect(self.modification_changed.emit)
+        self.text_area.verticalScrollBar().valueChanged.connect(self._on_scrolled)
         self.find_panel.close_requested.connect(self.hide_find_panel)
         self.find_panel.status_message_requested.connect(self.status_message_requested)
 
@@ -394,35 +445,125 @@ class EditorWidget(QWidget):
         colors = self.theme_manager.current_theme_data.get("colors", {}); stylesheet = f"QPlainTextEdit {{ background-color: {colors.get('editor.background')}; color: {colors.get('editor.foreground')}; border: none; selection-background-color: {colors.get('editor.selectionBackground')}; }} QSplitter::handle {{ background-color: {colors.get('editorGutter.background')}; }} QSplitter::handle:hover {{ background-color: {colors.get('accent')}; }}"
         self.text_area.setStyleSheet(stylesheet); self.content_splitter.setStyleSheet(stylesheet)
         if hasattr(self.minimap_widget, '_load_icons'): self.minimap_widget._load_icons()
-        if self.highlighter: self.highlighter.rehighlight()
-        self._update_widget_geometries(); self.gutter_widget.update(); self.minimap_widget.update()
+        if self.highlighter:
+            if self._should_highlight_lazily(self.document().blockCount()): self._begin_lazy_highlighting(*self._visible_block_range())
+            self.highlighter.rehighlight()
+        self._update_widget_geometries(); self.gutter_widget.update(); self.minimap_widget.invalidate()
     def set_filepath(self, fp: Optional[str]):
-        self.filepath = fp; new_minimap = self._create_minimap()
+        self.filepath = fp; self.outline_index.set_language(os.path.splitext(fp or '')[1]); new_minimap = self._create_minimap()
         if new_minimap.__class__ != self.minimap_widget.__class__: self.content_splitter.replaceWidget(1, new_minimap); self.minimap_widget.deleteLater(); self.minimap_widget = new_minimap
+    def get_outline(self) -> List[Tuple[int, int, str, str]]: return self.outline_index.entries()
     def get_cursor_position(self) -> tuple[int, int]: c = self.text_area.textCursor(); return c.blockNumber() + 1, c.columnNumber()
     def goto_line_and_column(self, line: int, col: int):
         cursor = QTextCursor(self.document().findBlockByNumber(line - 1)); cursor.movePosition(QTextCursor.MoveOperation.Right, QTextCursor.MoveMode.MoveAnchor, col)
         self.text_area.setTextCursor(cursor); self.text_area.setFocus()
-    def set_text(self, text: str): self.text_area.setPlainText(text)
+    def set_text(self, text: str):
+        if self._should_highlight_lazily(text.count('\n') + 1):
+            first, last = self._visible_block_range(); self._begin_lazy_highlighting(0, last - first)
+        self.text_area.setPlainText(text)
     def get_text(self) -> str: return self.text_area.toPlainText()
+    def reload_text(self, text: str):
+        """Replaces the text with a newer version from disk, keeping the cursor line and scroll position, and marks it clean."""
+        line, col = self.get_cursor_position(); scroll = self.text_area.verticalScrollBar().value()
+        self.set_text(text); self.mark_clean()
+        block = self.document().findBlockByNumber(min(line, self.document().blockCount()) - 1); cursor = QTextCursor(block)
+        cursor.movePosition(QTextCursor.MoveOperation.Right, QTextCursor.MoveMode.MoveAnchor, min(col, block.length() - 1))
+        self.text_area.setTextCursor(cursor); self.text_area.verticalScrollBar().setValue(scroll)
+    def is_loading(self) -> bool: return self._pending_load is not None
+    def load_text_in_chunks(self, text: str):
+        """
+        Loads a large text a chunk per event-loop turn so the window stays responsive, emitting
+        load_progress (0-100) and then load_finished. The editor is read-only until it is done, and
+        highlighting is attached once, at the end, so it can start lazily around the viewport.
+        """
+        if self.highlighter: self.highlighter.setDocument(None)
+        self.text_area.clear(); self.document().setUndoRedoEnabled(False); self.text_area.setReadOnly(True)
+        self._pending_load = (text, 0); self._load_timer.start()
+    def _insert_next_chunk(self):
+        text, offset = self._pending_load; end = offset + self.LOAD_CHUNK_CHARS
+        cursor = QTextCursor(self.document()); cursor.movePosition(QTextCursor.MoveOperation.End); cursor.insertText(text[offset:end])
+        if end < len(text): self._pending_load = (text, end); self.load_progress.emit(end * 100 // len(text)); return
+        self._load_timer.stop(); self._pending_load = None; doc = self.document(); doc.setUndoRedoEnabled(True)
+        self.text_area.setReadOnly(False); self.text_area.moveCursor(QTextCursor.MoveOperation.Start)
+        if self.highlighter:
+            if self._should_highlight_lazily(doc.blockCount()): self._begin_lazy_highlighting(*self._visible_block_range())
+            self.highlighter.setDocument(doc)
+        self.mark_clean(); self.load_progress.emit(100); self.load_finished.emit()
+    def mark_clean(self):
+        """Records the current text as the saved state; is_modified() is False until the next edit."""
+        # characterCount() counts UTF-16 units (an emoji is two), so it is stored, not len(text).
+        self._clean_length, self._clean_hash = self.document().characterCount() - 1, hash(self.get_text())
+        self._revert_check_timer.stop(); self.document().setModified(False)
+    def is_modified(self) -> bool: return self.document().isModified()
+    def _schedule_revert_check(self):
+        # Undoing back to the saved state is tracked by the document itself. Only when an edit
+        # leaves the text at its saved length is it worth hashing once the user pauses typing.
+        doc = self.document()
+        if doc.isModified() and doc.characterCount() - 1 == self._clean_length: self._revert_check_timer.start()
+        else: self._revert_check_timer.stop()
+    def _check_reverted_to_clean(self):
+        doc = self.document()
+        if doc.isModified() and doc.characterCount() - 1 == self._clean_length and hash(self.get_text()) == self._clean_hash: doc.setModified(False)
     def set_highlighter(self, h_class):
         if self.highlighter: self.highlighter.setDocument(None)
         if h_class: self.highlighter = h_class(self.text_area.document(), self.theme_manager)
+        if self._should_highlight_lazily(self.document().blockCount()): self._begin_lazy_highlighting(*self._visible_block_range())
+    def _should_highlight_lazily(self, line_count: int) -> bool:
+        threshold = self.settings.get("lazy_highlighting_threshold_lines", 20000)
+        return bool(threshold) and line_count >= threshold and hasattr(self.highlighter, 'begin_lazy_highlighting')
+    def _visible_block_range(self) -> Tuple[int, int]:
+        first, line_height = self.text_area.firstVisibleBlock().blockNumber(), self.text_area.fontMetrics().height() or 1
+        return first, first + self.text_area.viewport().height() // line_height + 1
+    def _begin_lazy_highlighting(self, first: int, last: int):
+        self.highlighter.begin_lazy_highlighting(max(0, first - self.LAZY_HIGHLIGHT_MARGIN), last + self.LAZY_HIGHLIGHT_MARGIN)
+    def _on_scrolled(self, _value: int):
+        if getattr(self.highlighter, 'is_lazy_highlighting', False):
+            first, last = self._visible_block_range(); self.highlighter.highlight_blocks(max(0, first - self.LAZY_HIGHLIGHT_MARGIN), last + self.LAZY_HIGHLIGHT_MARGIN)
     def toggle_find_panel(self):
         if self.find_panel.isVisible(): self.hide_find_panel()
         else: self.show_find_panel()
     def show_find_panel(self): self.find_panel.show(); self.find_panel.connect_editor(self)
     def hide_find_panel(self): self.find_panel.hide(); self.text_area.setFocus()
     def get_comment_char(self) -> str: return self.puffin_api.get_main_window().COMMENT_MAP.get(os.path.splitext(self.filepath or "")[1].lower(), '#')
-    def find_next(self, query: str, flags: QTextDocument.FindFlag) -> bool: return self.text_area.find(query, flags)
-    def replace_current(self, query: str, replace: str, flags: QTextDocument.FindFlag) -> bool:
+    def _find_pattern(self, query: str, flags: QTextDocument.FindFlag, regex: bool):
+        return compile_find_pattern(query, bool(flags & QTextDocument.FindFlag.FindCaseSensitively), bool(flags & QTextDocument.FindFlag.FindWholeWords), regex)
+    def find_next(self, query: str, flags: QTextDocument.FindFlag, regex: bool = False) -> bool:
+        """Selects the next (or previous) match. In regex mode raises re.error for an invalid pattern."""
+        if not regex: return self.text_area.find(query, flags)
+        return self._find_regex(self._find_pattern(query, flags, True), bool(flags & QTextDocument.FindFlag.FindBackward)) is not None
+    def _find_regex(self, pattern, backwards: bool = False):
+        text, c = self.text_area.toPlainText(), self.text_area.textCursor(); match = None
+        if backwards:
+            for m in pattern.finditer(text, 0, to_text_index(text, c.selectionStart())):
+                if m.end() > m.start(): match = m
+        else: match = next((m for m in pattern.finditer(text, to_text_index(text, c.selectionEnd())) if m.end() > m.start()), None)
+        if match is None: return None
+        c.setPosition(to_document_position(text, match.start())); c.setPosition(to_document_position(text, match.end()), QTextCursor.MoveMode.KeepAnchor)
+        self.text_area.setTextCursor(c); return match
+    def replace_current(self, query: str, replace: str, flags: QTextDocument.FindFlag, regex: bool = False) -> bool:
         c = self.text_area.textCursor()
-        if c.hasSelection() and c.selectedText() == query: c.insertText(replace); return True
-        if self.find_next(query, flags): self.text_area.textCursor().insertText(replace); return True
-        return False
-    def replace_all(self, query: str, replace: str, flags: QTextDocument.FindFlag) -> int:
-        count, cursor = 0, self.text_area.textCursor(); cursor.beginEditBlock()
-        cursor.movePosition(QTextCursor.MoveOperation.Start); self.text_area.setTextCursor(cursor)
-        while self.find_next(query, flags): self.text_area.textCursor().insertText(replace); count += 1
-        cursor.endEditBlock(); return count
+        if not regex:
+            if c.hasSelection() and c.selectedText() == query: c.insertText(replace); return True
+            if self.find_next(query, flags): self.text_area.textCursor().insertText(replace); return True
+            return False
+        pattern = self._find_pattern(query, flags, True)
+        if not (c.hasSelection() and (m := pattern.fullmatch(c.selectedText().replace('\u2029', '\n')))):
+            if (m := self._find_regex(pattern)) is None: return False
+        self.text_area.textCursor().insertText(m.expand(replace)); return True
+    def replace_all(self, query: str, replace: str, flags: QTextDocument.FindFlag, regex: bool = False) -> int:
+        """
+        Replaces every match in one pass: the ranges are found on a snapshot of the text and applied last to
+        first, so earlier positions stay valid, in one edit block (one undo step, one contentsChange) with
+        repaints suspended. The visible cursor is never moved. In regex mode raises re.error for an invalid pattern.
+        """
+        return self.apply_replacements(replacement_ranges(self.text_area.toPlainText(), self._find_pattern(query, flags, regex), replace, regex))
+    def apply_replacements(self, ranges) -> int:
+        """Applies (start, end, new text) ranges in document positions, in order and not overlapping, as one undo step."""
+        if not ranges: return 0
+        cursor = QTextCursor(self.text_area.document()); self.text_area.setUpdatesEnabled(False); cursor.beginEditBlock()
+        try:
+            for start, end, text in reversed(ranges):
+                cursor.setPosition(start); cursor.setPosition(end, QTextCursor.MoveMode.KeepAnchor); cursor.insertText(text)
+        finally: cursor.endEditBlock(); self.text_area.setUpdatesEnabled(True)
+        return len(ranges)
     def document(self): return self.text_area.document()
\ No newline at end of file
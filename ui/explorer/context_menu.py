@@ -21,8 +21,7 @@ def show_project_context_menu(panel, position: QPoint, path: str, is_dir: bool,
     target_dir = path if is_dir else os.path.dirname(path)
 
     # Check if a valid item was clicked
-    item = tree.itemAt(position)
-    is_valid_selection = item is not None
+    is_valid_selection = tree.indexAt(position).isValid()
     is_project_root = path in project_manager.get_open_projects()
 
     menu = QMenu(tree)
@@ -0,0 +1,413 @@
+# PuffinPyEditor/ui/explorer/file_system_model.py
+import os
+from itertools import count
+from typing import Dict, List, Optional, Tuple
+from PyQt6.QtCore import Qt, QAbstractItemModel, QModelIndex, QMimeData, QUrl, QThreadPool, pyqtSignal
+from PyQt6.QtGui import QColor
+from .icon_provider import CustomFileIconProvider
+from .folder_size_worker import DirectorySizeIndex, format_size
+from .scan_worker import DirectoryScanWorker, HIDDEN_PREFIXES, entry_sort_key
+
+TREE_ITEM_MIME_TYPE = "application/x-puffin-tree-item"
+GIT_STATUS_COLORS = {'??': 'git.added', 'M': 'git.modified', 'A': 'git.added', 'D': 'git.deleted',
+                     '!!': 'syntax.comment'}
+
+
+class _Node:
+    """One file or folder. children is None until the folder has been scanned."""
+    __slots__ = ('uid', 'name', 'path', 'is_dir', 'is_root', 'parent', 'children', 'row', 'sort_key', 'loading')
+
+    def __init__(self, uid: int, name: str, path: str, is_dir: bool, parent: Optional['_Node'], is_root=False):
+        self.uid, self.name, self.path, self.is_dir, self.is_root = uid, name, path, is_dir, is_root
+        self.parent = parent
+        self.children: Optional[List['_Node']] = None
+        self.row = 0
+        self.sort_key = entry_sort_key(name, is_dir)
+        self.loading = False
+
+
+def _insert_position(children: List[_Node], sort_key) -> int:
+    low, high = 0, len(children)
+    while low < high:
+        mid = (low + high) // 2
+        if children[mid].sort_key < sort_key:
+            low = mid + 1
+        else:
+            high = mid
+    return low
+
+
+class FileSystemModel(QAbstractItemModel):
+    """
+    The explorer's tree of open projects. Folders are scanned on a thread
+    pool the first time the view needs their children, and the results are
+    kept as an in-memory tree. Rescans and file operations are applied as
+    row inserts, removals and moves against that tree, so existing rows,
+    expansion and selection are left alone.
+    """
+    HEADERS = ("Project / File", "")
+    directory_loaded = pyqtSignal(str)  # A folder's children were scanned for the first time or updated
+    directories_removed = pyqtSignal(list)  # Paths of folders dropped from the tree, loaded or not
+
+    def __init__(self, icon_provider: CustomFileIconProvider, theme_manager,
+                 size_index: Optional[DirectorySizeIndex] = None, parent=None):
+        super().__init__(parent)
+        self.icon_provider = icon_provider
+        self.theme_manager = theme_manager
+        self.size_index = size_index
+        if size_index:
+            size_index.size_ready.connect(self._on_size_ready)
+        self.threadpool = QThreadPool.globalInstance()
+        self._root = _Node(0, "", "", True, None)
+        self._root.children = []
+        self._uids = count(1)
+        self._by_uid: Dict[int, _Node] = {}
+        self._by_path: Dict[str, _Node] = {}
+        self._scan_ids = count(1)
+        self._latest_scan: Dict[str, int] = {}
+        self._workers: Dict[int, DirectoryScanWorker] = {}
+        self._git_statuses: Dict[str, str] = {}
+
+    # --- Qt model interface ---
+
+    def index(self, row: int, column: int, parent: QModelIndex = QModelIndex()) -> QModelIndex:
+        node = self._node(parent)
+        if node.children is None or not 0 <= row < len(node.children) or not 0 <= column < len(self.HEADERS):
+            return QModelIndex()
+        return self.createIndex(row, column, node.children[row].uid)
+
+    def parent(self, index: QModelIndex = QModelIndex()) -> QModelIndex:
+        if not index.isValid() or (node := self._by_uid.get(index.internalId())) is None:
+            return QModelIndex()
+        if node.parent is self._root:
+            return QModelIndex()
+        return self.createIndex(node.parent.row, 0, node.parent.uid)
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        if parent.column() > 0:
+            return 0
+        return len(self._node(parent).children or ())
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return len(self.HEADERS)
+
+    def hasChildren(self, parent: QModelIndex = QModelIndex()) -> bool:
+        if parent.column() > 0:
+            return False
+        node = self._node(parent)
+        return node.is_dir and (node.children is None or len(node.children) > 0)
+
+    def canFetchMore(self, parent: QModelIndex) -> bool:
+        node = self._node(parent)
+        return node is not self._root and node.is_dir and node.children is None and not node.loading
+
+    def fetchMore(self, parent: QModelIndex):
+        if self.canFetchMore(parent):
+            self._scan(self._node(parent))
+
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+    def flags(self, index: QModelIndex) -> Qt.ItemFlag:
+        if not index.isValid():
+            return Qt.ItemFlag.ItemIsDropEnabled
+        flags = Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable | Qt.ItemFlag.ItemIsDragEnabled
+        if self._node(index).is_dir:
+            flags |= Qt.ItemFlag.ItemIsDropEnabled
+        return flags
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or (node := self._by_uid.get(index.internalId())) is None:
+            return None
+        if role == Qt.ItemDataRole.UserRole:
+            return {'path': node.path, 'is_dir': node.is_dir, 'is_root': node.is_root}
+        if index.column() != 0:
+            return None
+        if role == Qt.ItemDataRole.DisplayRole:
+            return node.name
+        if role == Qt.ItemDataRole.DecorationRole:
+            return self._icon(node)
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return self._tooltip(node)
+        if role == Qt.ItemDataRole.ForegroundRole and (status := self._git_statuses.get(node.path)):
+            colors = self.theme_manager.current_theme_data.get('colors', {})
+            for code, color_key in GIT_STATUS_COLORS.items():
+                if code in status and (color := colors.get(color_key)):
+                    return QColor(color)
+        return None
+
+    def supportedDropActions(self) -> Qt.DropAction:
+        return Qt.DropAction.CopyAction | Qt.DropAction.MoveAction
+
+    def mimeTypes(self) -> List[str]:
+        return [TREE_ITEM_MIME_TYPE, "text/uri-list"]
+
+    def mimeData(self, indexes) -> Optional[QMimeData]:
+        paths = {self._node(index).path for index in indexes if index.isValid()}
+        if len(paths) != 1:
+            return None
+        path = paths.pop()
+        mime = QMimeData()
+        mime.setData(TREE_ITEM_MIME_TYPE, path.encode('utf-8'))
+        mime.setUrls([QUrl.fromLocalFile(path)])
+        return mime
+
+    # --- Lookups ---
+
+    def path_for_index(self, index: QModelIndex) -> Optional[str]:
+        return self._node(index).path if index.isValid() else None
+
+    def is_dir(self, index: QModelIndex) -> bool:
+        return index.isValid() and self._node(index).is_dir
+
+    def index_for_path(self, path: str) -> QModelIndex:
+        """The index of a path already in the tree, or an invalid index if it has not been scanned yet."""
+        node = self._by_path.get(os.path.normpath(path)) if path else None
+        return self.createIndex(node.row, 0, node.uid) if node else QModelIndex()
+
+    def loaded_directories(self) -> List[str]:
+        return [path for path, node in self._by_path.items() if node.children is not None]
+
+    def child_directories(self, path: str) -> List[str]:
+        node = self._by_path.get(path)
+        return [child.path for child in node.children if child.is_dir] if node and node.children else []
+
+    # --- Updates ---
+
+    def set_roots(self, project_paths: List[str]) -> List[str]:
+        """Makes the top level match the open projects; returns the newly added ones."""
+        wanted = list(dict.fromkeys(os.path.normpath(p) for p in project_paths))
+        wanted_set = set(wanted)
+        for node in [n for n in self._root.children if n.path not in wanted_set]:
+            self._remove_node(node)
+        added = []
+        for path in wanted:
+            if (node := self._by_path.get(path)) is not None and node.is_root:
+                continue
+            row = len(self._root.children)
+            node = self._new_node(os.path.basename(path) or path, path, True, self._root, is_root=True)
+            self.beginInsertRows(QModelIndex(), row, row)
+            self._root.children.append(node)
+            self._renumber(self._root)
+            self.endInsertRows()
+            added.append(path)
+        # Every wanted root is present now, and the rows above target_row are
+        # already in order, so each move is upwards, where Qt takes the target row as is.
+        for target_row, path in enumerate(wanted):
+            node = self._by_path[path]
+            if node.row == target_row or not self.beginMoveRows(
+                    QModelIndex(), node.row, node.row, QModelIndex(), target_row):
+                continue
+            self._root.children.insert(target_row, self._root.children.pop(node.row))
+            self._renumber(self._root)
+            self.endMoveRows()
+        return added
+
+    def rescan(self, path: str):
+        """Re-reads one folder in the background if its children are in the tree."""
+        node = self._by_path.get(os.path.normpath(path))
+        if node is not None and node.children is not None:
+            self._scan(node)
+
+    def rescan_loaded(self):
+        for path in self.loaded_directories():
+            self.rescan(path)
+
+    def insert_path(self, path: str):
+        """Adds a newly created file or folder, if its parent folder has been scanned."""
+        path = os.path.normpath(path)
+        name = os.path.basename(path)
+        parent = self._by_path.get(os.path.dirname(path))
+        if parent is None or parent.children is None or path in self._by_path or name.startswith(HIDDEN_PREFIXES):
+            return
+        self._insert_nodes(parent, _insert_position(parent.children, entry_sort_key(name, os.path.isdir(path))),
+                           [(name, os.path.isdir(path))])
+
+    def remove_path(self, path: str):
+        if (node := self._by_path.get(os.path.normpath(path))) is not None and not node.is_root:
+            self._remove_node(node)
+
+    def rename_path(self, old_path: str, new_path: str):
+        """A file renamed in place keeps its row, moved to its new sorted position; anything else is removed and re-added."""
+        node = self._by_path.get(os.path.normpath(old_path))
+        new_path = os.path.normpath(new_path)
+        new_name = os.path.basename(new_path)
+        if (node is None or node.is_root or node.is_dir or os.path.dirname(new_path) != os.path.dirname(node.path)
+                or new_name.startswith(HIDDEN_PREFIXES) or new_path in self._by_path):
+            self.remove_path(old_path)
+            self.insert_path(new_path)
+            return
+        parent, parent_index = node.parent, self._index_of(node.parent)
+        new_key = entry_sort_key(new_name, False)
+        siblings = [child for child in parent.children if child is not node]
+        target_row = _insert_position(siblings, new_key)
+        # beginMoveRows takes the row the item goes before, counted before it is taken out.
+        destination = target_row + 1 if target_row >= node.row else target_row
+        moving = target_row != node.row
+        if moving:
+            self.beginMoveRows(parent_index, node.row, node.row, parent_index, destination)
+        del self._by_path[node.path]
+        node.name, node.path, node.sort_key = new_name, new_path, new_key
+        self._by_path[new_path] = node
+        if moving:
+            parent.children.pop(node.row)
+            parent.children.insert(target_row, node)
+            self._renumber(parent)
+            self.endMoveRows()
+        index = self.createIndex(node.row, 0, node.uid)
+        self.dataChanged.emit(index, index)
+
+    def set_git_statuses(self, statuses: Dict[str, str]):
+        self._git_statuses = dict(statuses)
+        self._emit_data_changed_for_all([Qt.ItemDataRole.ForegroundRole])
+
+    def update_git_statuses(self, delta: Dict[str, Optional[str]]):
+        """Applies changed statuses (None meaning clean) and recolors only the rows shown for them."""
+        for path, status in delta.items():
+            if status is None:
+                self._git_statuses.pop(path, None)
+            else:
+                self._git_statuses[path] = status
+            if node := self._by_path.get(path):
+                index = self.createIndex(node.row, 0, node.uid)
+                self.dataChanged.emit(index, index, [Qt.ItemDataRole.ForegroundRole])
+
+    def clear_icon_cache(self):
+        self.icon_provider.clear_cache()
+        self._emit_data_changed_for_all([Qt.ItemDataRole.DecorationRole])
+
+    # --- Internals ---
+
+    def _tooltip(self, node: _Node) -> Optional[str]:
+        lines = [node.path] if node.is_root else []
+        if node.is_dir and self.size_index:
+            size = self.size_index.size(node.path)
+            lines.append(f"Size: {format_size(size) if size is not None else 'calculating...'}")
+        return "\n".join(lines) or None
+
+    def _on_size_ready(self, path: str, size: int):
+        if node := self._by_path.get(path):
+            index = self.createIndex(node.row, 0, node.uid)
+            self.dataChanged.emit(index, index, [Qt.ItemDataRole.ToolTipRole])
+
+    def _node(self, index: QModelIndex) -> _Node:
+        if not index.isValid():
+            return self._root
+        return self._by_uid.get(index.internalId(), self._root)
+
+    def _index_of(self, node: _Node) -> QModelIndex:
+        return QModelIndex() if node is self._root else self.createIndex(node.row, 0, node.uid)
+
+    def _new_node(self, name: str, path: str, is_dir: bool, parent: _Node, is_root=False) -> _Node:
+        node = _Node(next(self._uids), name, path, is_dir, parent, is_root)
+        self._by_uid[node.uid] = node
+        self._by_path[path] = node
+        return node
+
+    @staticmethod
+    def _renumber(node: _Node, start: int = 0):
+        for row in range(start, len(node.children)):
+            node.children[row].row = row
+
+    def _icon(self, node: _Node):
+        if node.is_root:
+            accent = self.theme_manager.current_theme_data.get('colors', {}).get('accent')
+            return self.icon_provider.cached_icon('mdi.folder-open-outline', accent)
+        return self.icon_provider.icon_for_name(node.name, node.is_dir)
+
+    def _scan(self, node: _Node):
+        scan_id = next(self._scan_ids)
+        self._latest_scan[node.path] = scan_id
+        node.loading = True
+        worker = DirectoryScanWorker(scan_id, node.path)
+        worker.signals.finished.connect(self._on_scan_finished)
+        self._workers[scan_id] = worker  # Keeps the signals object alive until the result is delivered
+        self.threadpool.start(worker)
+
+    def _on_scan_finished(self, scan_id: int, path: str, entries: Optional[List[Tuple[str, bool]]]):
+        self._workers.pop(scan_id, None)
+        if self._latest_scan.get(path) != scan_id:
+            return  # A newer scan of this folder is on its way
+        del self._latest_scan[path]
+        node = self._by_path.get(path)
+        if node is None or not node.is_dir:
+            return
+        node.loading = False
+        if entries is None:
+            entries = []  # Unreadable or gone; the parent's rescan removes it if it was deleted
+        if node.children is None:
+            node.children = []
+            if not entries:
+                # Drops the expander from a folder that turned out to be empty.
+                index = self._index_of(node)
+                self.dataChanged.emit(index, index)
+        self._apply_entries(node, entries)
+        self.directory_loaded.emit(path)
+
+    def _apply_entries(self, node: _Node, entries: List[Tuple[str, bool]]):
+        """Turns node's children into entries with the fewest row removals and insertions."""
+        wanted = dict(entries)
+        row = len(node.children) - 1
+        while row >= 0:
+            child = node.children[row]
+            if wanted.get(child.name) == child.is_dir:
+                row -= 1
+                continue
+            end = row
+            while row > 0 and wanted.get(node.children[row - 1].name) != node.children[row - 1].is_dir:
+                row -= 1
+            self._remove_rows(node, row, end)
+            row -= 1
+        # The remaining children are in sorted order, a subsequence of entries.
+        present = {child.name for child in node.children}
+        run_start, run = 0, []
+        for position, (name, is_dir) in enumerate(entries):
+            if name in present:
+                if run:
+                    self._insert_nodes(node, run_start, run)
+                    run = []
+                continue
+            if not run:
+                run_start = position
+            run.append((name, is_dir))
+        if run:
+            self._insert_nodes(node, run_start, run)
+
+    def _insert_nodes(self, parent: _Node, row: int, entries: List[Tuple[str, bool]]):
+        nodes = [self._new_node(name, os.path.join(parent.path, name), is_dir, parent) for name, is_dir in entries]
+        self.beginInsertRows(self._index_of(parent), row, row + len(nodes) - 1)
+        parent.children[row:row] = nodes
+        self._renumber(parent, row)
+        self.endInsertRows()
+
+    def _remove_node(self, node: _Node):
+        self._remove_rows(node.parent, node.row, node.row)
+
+    def _remove_rows(self, parent: _Node, first: int, last: int):
+        self.beginRemoveRows(self._index_of(parent), first, last)
+        removed = parent.children[first:last + 1]
+        del parent.children[first:last + 1]
+        self._renumber(parent, first)
+        removed_dirs = []
+        stack = list(removed)
+        while stack:
+            node = stack.pop()
+            self._by_uid.pop(node.uid, None)
+            if self._by_path.get(node.path) is node:
+                del self._by_path[node.path]
+            self._latest_scan.pop(node.path, None)
+            if node.is_dir:
+                removed_dirs.append(node.path)
+                stack.extend(node.children or ())
+        self.endRemoveRows()
+        if removed_dirs:
+            self.directories_removed.emit(removed_dirs)
+
+    def _emit_data_changed_for_all(self, roles: List[Qt.ItemDataRole]):
+        for node in [self._root] + [n for n in self._by_path.values() if n.children]:
+            if node.children:
+                parent_index = self._index_of(node)
+                self.dataChanged.emit(self.index(0, 0, parent_index),
+                                      self.index(len(node.children) - 1, 0, parent_index), roles)
@@ -1,39 +1,227 @@
 # PuffinPyEditor/ui/explorer/folder_size_worker.py
 import os
-from PyQt6.QtCore import QObject, QRunnable, pyqtSignal
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from PyQt6.QtCore import QObject, QRunnable, QThread, QThreadPool, pyqtSignal
+
+# (directory, size of the files directly in it, its subdirectories)
+DirectoryEntry = Tuple[str, int, List[str]]
+
+
+def format_size(size: int) -> str:
+    """A byte count as a short human-readable string, e.g. '12.3 MB'."""
+    for unit in ("bytes", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size} {unit}" if unit == "bytes" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def scan_directory_sizes(path: str) -> Tuple[int, List[str]]:
+    """
+    The total size of the files directly in a directory and its subdirectories.
+    Symlinks are not followed; the stat made by scandir is reused where the
+    platform provides one.
+    """
+    own_size, subdirs = 0, []
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(os.path.normpath(entry.path))
+                    elif entry.is_file(follow_symlinks=False):
+                        own_size += entry.stat(follow_symlinks=False).st_size
+                except OSError:
+                    continue
+    except OSError:
+        pass
+    return own_size, subdirs
 
 
 class WorkerSignals(QObject):
-    finished = pyqtSignal(str, int)
+    # [(directory, own size, subdirectories), ...] in scan order, directories left to scan
+    finished = pyqtSignal(object, object)
 
 
 class FolderSizeWorker(QRunnable):
-    def __init__(self, path: str):
+    """
+    Scans directories breadth-first, starting at `paths`, until `budget`
+    directories have been read. What is left is handed back so the index can
+    spread it over the pool instead of one worker walking a huge tree alone.
+    """
+
+    def __init__(self, paths: List[str], budget: int):
         super().__init__()
-        self.path = path
+        self.paths = paths
+        self.budget = budget
         self.signals = WorkerSignals()
         self.is_cancelled = False
 
     def run(self):
-        total_size = 0
-        try:
-            for dirpath, _, filenames in os.walk(self.path, topdown=True, onerror=None):
-                if self.is_cancelled:
-                    self.signals.finished.emit(self.path, -2)
-                    return
-                for f in filenames:
-                    try:
-                        fp = os.path.join(dirpath, f)
-                        if not os.path.islink(fp):
-                            total_size += os.path.getsize(fp)
-                    except (OSError, FileNotFoundError):
-                        continue
-
-            if not self.is_cancelled:
-                self.signals.finished.emit(self.path, total_size)
-        except Exception:
-            if not self.is_cancelled:
-                self.signals.finished.emit(self.path, -1)
+        entries: List[DirectoryEntry] = []
+        queue = deque(self.paths)
+        while queue and len(entries) < self.budget and not self.is_cancelled:
+            path = queue.popleft()
+            own_size, subdirs = scan_directory_sizes(path)
+            entries.append((path, own_size, subdirs))
+            queue.extend(subdirs)
+        self.signals.finished.emit(entries, list(queue))
 
     def cancel(self):
-        self.is_cancelled = True
\ No newline at end of file
+        self.is_cancelled = True
+
+
+class DirectorySizeIndex(QObject):
+    """
+    Folder sizes shared by the whole explorer.
+
+    Each directory is read once, and its total is its own files plus the
+    totals of its subdirectories, so asking for a parent after a child (or the
+    other way around) reuses everything already counted. File watcher events
+    re-read only the directories they touch; the new subtotal is folded into
+    each ancestor without walking the tree again. Directories the file
+    watcher skips (hidden ones, venv, node_modules...) are counted but only
+    refreshed when their parent's listing changes.
+    """
+    BATCH_SIZE = 256  # Directories read by one worker before it hands back the rest
+
+    size_ready = pyqtSignal(str, int)  # directory, total size in bytes, for directories asked about
+
+    def __init__(self, parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(max(2, QThread.idealThreadCount()))
+        self._own: Dict[str, int] = {}
+        self._subdirs: Dict[str, Set[str]] = {}
+        self._totals: Dict[str, int] = {}
+        self._waiting: Dict[str, int] = {}  # Subdirectories a read directory still needs a total for
+        self._requested: Set[str] = set()
+        self._workers: Dict[int, FolderSizeWorker] = {}
+        self._in_flight: Set[str] = set()
+        self._rescan: Set[str] = set()  # Changed while a worker was reading them
+        self._changed_unread: Set[str] = set()
+
+    def size(self, path: str) -> Optional[int]:
+        """The total size of a directory, or None while it is being computed (size_ready follows)."""
+        path = os.path.normpath(path)
+        self._requested.add(path)
+        if path in self._totals:
+            return self._totals[path]
+        if path not in self._own:
+            self._start([path])
+        return None
+
+    def forget(self, paths: Iterable[str]):
+        """Drops the given directories and everything below them."""
+        for path in paths:
+            path = os.path.normpath(path)
+            self._forget_tree(path)
+            prefix = path + os.sep
+            self._requested = {p for p in self._requested if p != path and not p.startswith(prefix)}
+
+    def on_files_changed(self, change_set):
+        """Re-reads the directories whose contents changed and updates the totals above them."""
+        if change_set.overflowed:
+            requested = [p for p in self._requested if p not in self._subdirs.get(os.path.dirname(p), ())]
+            for path in requested:
+                self._forget_tree(path)
+            self._start(requested)
+            return
+        changed = {os.path.dirname(path) for path in change_set.all_paths()}
+        self._rescan_directories([d for d in changed if d in self._own])
+        if self._workers:
+            self._changed_unread.update(d for d in changed if d not in self._own)
+
+    def shutdown(self):
+        for worker in self._workers.values():
+            worker.cancel()
+        self._pool.clear()
+        self._pool.waitForDone(3000)
+
+    def _rescan_directories(self, paths: List[str]):
+        for path in paths:
+            if path in self._in_flight:
+                self._rescan.add(path)
+            else:
+                self._start([path], budget=1)
+
+    def _start(self, paths: List[str], budget: int = BATCH_SIZE):
+        paths = [p for p in paths if p not in self._in_flight]
+        if not paths:
+            return
+        worker = FolderSizeWorker(paths, budget)
+        worker.signals.finished.connect(lambda entries, rest, w=worker: self._on_worker_finished(w, entries, rest))
+        self._workers[id(worker)] = worker
+        self._in_flight.update(paths)
+        self._pool.start(worker)
+
+    def _on_worker_finished(self, worker: FolderSizeWorker, entries: List[DirectoryEntry], rest: List[str]):
+        self._workers.pop(id(worker), None)
+        self._in_flight.difference_update(worker.paths)
+        if worker.is_cancelled:
+            return
+        for path, own_size, subdirs in entries:
+            if self._is_wanted(path):
+                self._apply(path, own_size, subdirs)
+        unread = [p for p in rest if p not in self._own and self._is_wanted(p)]
+        # Spread what is left over the pool, one worker per share.
+        shares = max(1, min(len(unread), self._pool.maxThreadCount()))
+        for i in range(shares):
+            self._start(unread[i::shares])
+        read = {path for path, _, _ in entries}
+        stale = [p for p in self._rescan if p not in self._in_flight] + [
+            p for p in self._changed_unread if p in read]
+        self._rescan.difference_update(stale)
+        self._changed_unread.difference_update(stale)
+        if not self._workers:
+            self._changed_unread.clear()
+        self._rescan_directories([p for p in stale if p in self._own])
+
+    def _is_wanted(self, path: str) -> bool:
+        return path in self._requested or path in self._subdirs.get(os.path.dirname(path), ())
+
+    def _apply(self, path: str, own_size: int, subdirs: List[str]):
+        """Records a read directory and settles every total that now can be."""
+        self._invalidate(path)
+        new_subdirs = set(subdirs)
+        for gone in self._subdirs.get(path, set()) - new_subdirs:
+            self._forget_tree(gone)
+        self._own[path] = own_size
+        self._subdirs[path] = new_subdirs
+        self._waiting[path] = sum(1 for d in new_subdirs if d not in self._totals)
+        if self._waiting[path] == 0:
+            self._settle(path)
+
+    def _invalidate(self, path: str):
+        """Drops the totals of a directory and of the ancestors that included it."""
+        while path in self._totals:
+            del self._totals[path]
+            parent = os.path.dirname(path)
+            if parent not in self._own or path not in self._subdirs.get(parent, ()):
+                return
+            self._waiting[parent] += 1
+            path = parent
+
+    def _settle(self, path: str):
+        while True:
+            total = self._own[path] + sum(self._totals[d] for d in self._subdirs[path])
+            self._totals[path] = total
+            if path in self._requested:
+                self.size_ready.emit(path, total)
+            parent = os.path.dirname(path)
+            if parent not in self._own or path not in self._subdirs.get(parent, ()) or parent in self._totals:
+                return
+            self._waiting[parent] -= 1
+            if self._waiting[parent] > 0:
+                return
+            path = parent
+
+    def _forget_tree(self, path: str):
+        if path in self._totals:
+            self._invalidate(path)
+        stack = [path]
+        while stack:
+            current = stack.pop()
+            stack.extend(self._subdirs.pop(current, ()))
+            for cache in (self._own, self._totals, self._waiting):
+                cache.pop(current, None)
@@ -1,6 +1,9 @@
 # PuffinPyEditor/ui/explorer/icon_provider.py
+import os
+from typing import Dict, Optional, Tuple
 from PyQt6.QtWidgets import QFileIconProvider
 from PyQt6.QtCore import QFileInfo
+from PyQt6.QtGui import QIcon
 import qtawesome as qta
 from app_core.puffin_api import PuffinPluginAPI
 
@@ -41,6 +44,14 @@ class CustomFileIconProvider(QFileIconProvider):
     def __init__(self, puffin_api: PuffinPluginAPI):
         super().__init__()
         self.api = puffin_api
+        # qta.icon renders a font glyph into a new QIcon on every call, so icons are made
+        # once per (icon name, color, theme id). Switching themes starts a fresh cache.
+        self._icons: Dict[Tuple[str, Optional[str], str], QIcon] = {}
+        self._cache_theme_id: Optional[str] = None
+        self._theme_manager_ref = None
+
+    def clear_cache(self):
+        self._icons.clear()
 
     def icon(self, fileInfoOrType):
         # The argument can be a QFileInfo object or an IconType enum.
@@ -52,39 +63,57 @@ class CustomFileIconProvider(QFileIconProvider):
                 return super().icon(fileInfoOrType)
             # Fallback for unexpected types
             return qta.icon('fa5s.file')
+        return self.icon_for_name(fileInfoOrType.fileName(), fileInfoOrType.isDir())
 
-        file_info = fileInfoOrType
-        main_window = self.api.get_main_window()
-        if not main_window: return qta.icon('fa5s.file')
+    def icon_for_name(self, file_name: str, is_dir: bool) -> QIcon:
+        """The icon for a file or folder name, without touching the file system."""
+        theme_manager = self._theme_manager()
+        if not theme_manager: return qta.icon('fa5s.file')
 
-        theme_manager = main_window.theme_manager
         # Ensure we have a valid theme data structure to prevent crashes if theme fails
         theme_data = theme_manager.current_theme_data or {}
         colors = theme_data.get('colors', {})
         icon_colors = colors.get('icon.colors', {})
+        if theme_manager.current_theme_id != self._cache_theme_id:
+            self._icons.clear()
+            self._cache_theme_id = theme_manager.current_theme_id
 
         default_folder_color = icon_colors.get('default_folder', '#79b8f2')
         default_file_color = icon_colors.get('default_file', '#C0C5CE')
 
-        if file_info.isDir():
-            folder_name = file_info.fileName()
-            icon_name = self.ICON_MAP.get(folder_name, 'mdi.folder-outline')
-            color = icon_colors.get(folder_name, default_folder_color)
-            return qta.icon(icon_name, color=color)
+        if is_dir:
+            icon_name = self.ICON_MAP.get(file_name, 'mdi.folder-outline')
+            color = icon_colors.get(file_name, default_folder_color)
+            return self.cached_icon(icon_name, color)
 
-        file_name = file_info.fileName()
-        extension = f".{file_info.suffix().lower()}"
+        extension = os.path.splitext(file_name)[1].lower()
 
         if file_name in self.ICON_MAP:
             icon_name = self.ICON_MAP[file_name]
             color = icon_colors.get(file_name, default_file_color)
-            return qta.icon(icon_name, color=color)
+            return self.cached_icon(icon_name, color)
         if extension in self.BINARY_EXTENSIONS:
-            return qta.icon('mdi.cog', color=default_file_color)
+            return self.cached_icon('mdi.cog', default_file_color)
         if extension in self.ICON_MAP:
             icon_name = self.ICON_MAP[extension]
             color = icon_colors.get(extension, default_file_color)
-            return qta.icon(icon_name, color=color)
+            return self.cached_icon(icon_name, color)
 
         # Fallback to the default system icon if no match is found
-        return super().icon(file_info)
\ No newline at end of file
+        key = (f"system:{extension}", None, self._cache_theme_id)
+        if (icon := self._icons.get(key)) is None:
+            icon = self._icons[key] = super().icon(QFileInfo(file_name))
+        return icon
+
+    def cached_icon(self, icon_name: str, color: Optional[str]) -> QIcon:
+        """qta.icon(icon_name, color=color), made once per theme."""
+        theme_manager = self._theme_manager()
+        key = (icon_name, color, theme_manager.current_theme_id if theme_manager else "")
+        if (icon := self._icons.get(key)) is None:
+            icon = self._icons[key] = qta.icon(icon_name, color=color) if color else qta.icon(icon_name)
+        return icon
+
+    def _theme_manager(self):
+        if self._theme_manager_ref is None and (main_window := self.api.get_main_window()):
+            self._theme_manager_ref = main_window.theme_manager
+        return self._theme_manager_ref
@@ -1,14 +1,13 @@
 # PuffinPyEditor/ui/explorer/list_view_widget.py
 import os
-import sys
 from typing import List, Optional
-from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QTreeWidget, QTreeWidgetItem, QInputDialog, QMessageBox,
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QTreeView, QInputDialog, QMessageBox,
                              QProxyStyle, QStyle, QApplication, QAbstractItemView, QToolButton,
-                             QHBoxLayout, QTreeWidgetItemIterator, QHeaderView, QFrame)
-from PyQt6.QtGui import (QPainter, QColor, QPen, QDrag, QKeyEvent, QIcon, QPaintEvent, QDragEnterEvent, QDropEvent,
-                         QDragMoveEvent, QMouseEvent, QAction)
-from PyQt6.QtCore import (Qt, QFileInfo, QMimeData, QRect, QFileSystemWatcher, QTimer, QPoint, QPointF,
-                          QUrl, QItemSelection, QItemSelectionModel) # Corrected: QItemSelectionModel moved here
+                             QHBoxLayout, QHeaderView, QFrame)
+from PyQt6.QtGui import (QPainter, QColor, QPen, QKeyEvent, QPaintEvent, QDragEnterEvent, QDropEvent,
+                         QDragMoveEvent, QMouseEvent)
+from PyQt6.QtCore import (Qt, QRect, QTimer, QPoint, QPointF, QModelIndex,
+                          QItemSelection, QItemSelectionModel)
 from functools import partial
 import qtawesome as qta
 
@@ -17,9 +16,8 @@ from utils.logger import log
 from app_core.settings_manager import settings_manager
 from ..explorer.icon_provider import CustomFileIconProvider
 from ..explorer.context_menu import show_project_context_menu
-from ..explorer.helpers import get_git_statuses_for_root
-
-TREE_ITEM_MIME_TYPE = "application/x-puffin-tree-item"
+from ..explorer.file_system_model import FileSystemModel, TREE_ITEM_MIME_TYPE
+from ..explorer.folder_size_worker import DirectorySizeIndex
 
 
 class NoDrawProxyStyle(QProxyStyle):
@@ -31,8 +29,8 @@ class NoDrawProxyStyle(QProxyStyle):
         super().drawPrimitive(element, option, painter, widget)
 
 
-class StyledTreeView(QTreeWidget):
-    """A QTreeWidget with custom branch and indentation guide painting."""
+class StyledTreeView(QTreeView):
+    """A QTreeView with custom branch and indentation guide painting."""
 
     def __init__(self, puffin_api: PuffinPluginAPI, parent_view: 'FileSystemListView', parent: QWidget = None):
         super().__init__(parent)
@@ -48,32 +46,12 @@ class StyledTreeView(QTreeWidget):
         self.setDragDropMode(QAbstractItemView.DragDropMode.DragDrop)
         self.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
         self.setExpandsOnDoubleClick(False)
-
-
-    def supportedDropActions(self) -> Qt.DropAction:
-        return Qt.DropAction.CopyAction | Qt.DropAction.MoveAction
-
-    def mimeData(self, items: List[QTreeWidgetItem]) -> Optional[QMimeData]:
-        if not items:
-            return None
-
-        if len(items) > 1:
-            return None
-
-        item = items[0]
-        data = item.data(0, Qt.ItemDataRole.UserRole)
-        path = data.get('path') if data else None
-        if not path:
-            return None
-
-        mime = QMimeData()
-        mime.setData(TREE_ITEM_MIME_TYPE, path.encode('utf-8'))
-        mime.setUrls([QUrl.fromLocalFile(path)])
-        return mime
+        # Every row is one line of text, so the view can lay out 100k rows without asking for their sizes.
+        self.setUniformRowHeights(True)
 
     def paintEvent(self, event: QPaintEvent):
         super().paintEvent(event)
-        if self.topLevelItemCount() == 0:
+        if not self.model() or self.model().rowCount() == 0:
             return
 
         painter = QPainter(self.viewport())
@@ -83,9 +61,9 @@ class StyledTreeView(QTreeWidget):
         painter.setPen(pen)
         painter.drawLine(8, 0, 8, self.viewport().height())
 
-    def drawBranches(self, painter: QPainter, rect: QRect, index: 'QModelIndex'):
-        item = self.itemFromIndex(index)
-        if not item or not item.parent() or item.parent() == self.invisibleRootItem():
+    def drawBranches(self, painter: QPainter, rect: QRect, index: QModelIndex):
+        model = self.model()
+        if not index.isValid() or not index.parent().isValid():
             return
 
         colors = self.theme_manager.current_theme_data.get('colors', {})
@@ -97,27 +75,22 @@ class StyledTreeView(QTreeWidget):
         painter.save()
         painter.setRenderHint(QPainter.RenderHint.Antialiasing)
 
-        depth = -1
-        temp_item = item
-        while temp_item.parent() and temp_item.parent() != self.invisibleRootItem():
-            depth += 1
-            temp_item = temp_item.parent()
-
-        if depth < 0:
-            painter.restore()
-            return
+        ancestors = []
+        temp_index = index.parent()
+        while temp_index.isValid():
+            ancestors.append(temp_index)
+            temp_index = temp_index.parent()
+        depth = len(ancestors) - 1
 
         painter.setPen(QPen(accent_color, 1))
         for i in range(depth):
-            ancestor = item
-            for _ in range(depth - i):
-                ancestor = ancestor.parent()
-            if ancestor.parent() and ancestor.parent().indexOfChild(ancestor) < ancestor.parent().childCount() - 1:
+            ancestor = ancestors[depth - i - 1]
+            if ancestor.row() < model.rowCount(ancestor.parent()) - 1:
                 line_x = ROOT_ITEM_OFFSET + (i * indent) + half_indent
                 painter.drawLine(QPointF(line_x, rect.top()), QPointF(line_x, rect.bottom()))
 
-        item_is_folder = item.childCount() > 0 or (item.childCount() == 1 and not item.child(0).text(0))
-        item_is_last_child = item.parent().indexOfChild(item) == item.parent().childCount() - 1
+        item_is_folder = model.hasChildren(index)
+        item_is_last_child = index.row() == model.rowCount(index.parent()) - 1
         expander_x = ROOT_ITEM_OFFSET + (depth * indent) + (indent * 0.25)
         parent_guide_x = (ROOT_ITEM_OFFSET + ((depth - 1) * indent) + half_indent) if depth > 0 else ROOT_ITEM_OFFSET
         center_y = rect.center().y()
@@ -132,7 +105,7 @@ class StyledTreeView(QTreeWidget):
 
         if item_is_folder:
             painter.setPen(QPen(accent_color, 1.2))
-            self._draw_expander_at(painter, QPointF(expander_x, center_y), item.isExpanded())
+            self._draw_expander_at(painter, QPointF(expander_x, center_y), self.isExpanded(index))
         painter.restore()
 
     def _draw_expander_at(self, painter: QPainter, pos: QPointF, is_open: bool):
@@ -154,97 +127,78 @@ class StyledTreeView(QTreeWidget):
         else:
             super().dragEnterEvent(event)
 
-    def dragMoveEvent(self, event: QDragMoveEvent):
+    def _drop_target(self, event) -> Optional[tuple]:
+        """(source path, destination folder) for a drag over the view, or None if it cannot be dropped there."""
         if not event.mimeData().hasFormat(TREE_ITEM_MIME_TYPE):
-            event.ignore()
-            return
-
-        target_item = self.itemAt(event.position().toPoint())
-        if not target_item:
-            event.ignore()
-            return
+            return None
+        target_index = self.indexAt(event.position().toPoint())
+        target_path = self.model().path_for_index(target_index)
+        if not target_path:
+            return None
 
         source_path = event.mimeData().data(TREE_ITEM_MIME_TYPE).data().decode('utf-8')
-        target_data = target_item.data(0, Qt.ItemDataRole.UserRole)
-        target_path = target_data.get('path') if target_data else None
-
-        if not target_path or os.path.normpath(source_path) == os.path.normpath(target_path):
-            event.ignore()
-            return
-        
-        dest_dir = target_path if target_data.get('is_dir') else os.path.dirname(target_path)
+        if os.path.normpath(source_path) == os.path.normpath(target_path):
+            return None
 
+        dest_dir = target_path if self.model().is_dir(target_index) else os.path.dirname(target_path)
         if os.path.isdir(source_path) and os.path.normpath(dest_dir).startswith(os.path.normpath(source_path) + os.sep):
+            return None
+        return source_path, dest_dir
+
+    def dragMoveEvent(self, event: QDragMoveEvent):
+        if self._drop_target(event) is None:
             event.ignore()
             return
-            
         event.acceptProposedAction()
 
-
     def dropEvent(self, event: QDropEvent):
-        if not event.mimeData().hasFormat(TREE_ITEM_MIME_TYPE):
-            event.ignore()
-            return
-
-        source_path = event.mimeData().data(TREE_ITEM_MIME_TYPE).data().decode('utf-8')
-        target_item = self.itemAt(event.position().toPoint())
-        if not target_item:
-            event.ignore()
-            return
-
-        target_data = target_item.data(0, Qt.ItemDataRole.UserRole)
-        target_path = target_data.get('path') if target_data else None
-        if not target_path:
+        if (target := self._drop_target(event)) is None:
             event.ignore()
             return
-
-        dest_dir = target_path if target_data.get('is_dir') else os.path.dirname(target_path)
+        source_path, dest_dir = target
         is_copy = (event.modifiers() & Qt.KeyboardModifier.ControlModifier) == Qt.KeyboardModifier.ControlModifier
-        
+
         operation = self.file_handler.copy_item_to_dest if is_copy else self.file_handler.move_item
         success, new_path = self.parent_view._perform_file_operation(operation, source_path, dest_dir, return_result=True)
-        
+
         if success:
-            log.info("Drag-and-drop operation successful, refreshing tree view.")
-            self.parent_view.refresh()
+            # The file handler's created/renamed signals have already updated the tree.
+            log.info("Drag-and-drop operation successful.")
             QTimer.singleShot(150, lambda p=new_path: self.parent_view._select_and_scroll_to_path(p))
-            
-        event.acceptProposedAction()
 
+        event.acceptProposedAction()
 
     def keyPressEvent(self, event: QKeyEvent):
         if event.key() == Qt.Key.Key_Delete:
-            selected_items = self.selectedItems()
-            if selected_items:
-                paths = [item.data(0, Qt.ItemDataRole.UserRole)['path'] for item in selected_items if item.data(0, Qt.ItemDataRole.UserRole)]
-                if paths:
-                    self.parent_view._action_delete(paths)
-                    event.accept()
-                    return
+            paths = [self.model().path_for_index(index) for index in self.selectionModel().selectedRows()]
+            if paths:
+                self.parent_view._action_delete(paths)
+                event.accept()
+                return
         super().keyPressEvent(event)
-    
+
     def mousePressEvent(self, event: QMouseEvent):
+        current_index = self.currentIndex()
         super().mousePressEvent(event)
-        
+
         if event.button() == Qt.MouseButton.LeftButton:
-            item = self.itemAt(event.pos())
-            if not item:
+            index = self.indexAt(event.pos())
+            if not index.isValid():
                 self.clearSelection()
                 return
 
             modifiers = QApplication.keyboardModifiers()
             if modifiers & Qt.KeyboardModifier.ShiftModifier:
-                if current_item := self.currentItem():
-                    selection_model = self.selectionModel()
-                    selection_model.select(QItemSelection(self.indexFromItem(item), self.indexFromItem(current_item)), QItemSelectionModel.SelectionFlag.Select | QItemSelectionModel.SelectionFlag.Rows)
+                if current_index.isValid():
+                    self.selectionModel().select(QItemSelection(index, current_index), QItemSelectionModel.SelectionFlag.Select | QItemSelectionModel.SelectionFlag.Rows)
             else:
                 # Toggle expansion on single click
-                if (data := item.data(0, Qt.ItemDataRole.UserRole)) and data.get('is_dir'):
-                    item.setExpanded(not item.isExpanded())
+                if self.model().is_dir(index):
+                    self.setExpanded(index.siblingAtColumn(0), not self.isExpanded(index.siblingAtColumn(0)))
 
     def mouseDoubleClickEvent(self, event: QMouseEvent):
-        item = self.itemAt(event.pos())
-        if item and (data := item.data(0, Qt.ItemDataRole.UserRole)) and data.get('is_dir'):
+        index = self.indexAt(event.pos())
+        if self.model().is_dir(index):
             # If it's a directory, we consume the event to prevent toggling again,
             # as mousePressEvent already handled it.
             event.accept()
@@ -254,6 +208,12 @@ class StyledTreeView(QTreeWidget):
 
 
 class FileSystemListView(QWidget):
+    """
+    The project explorer. Folders are read in the background by the model
+    as they are expanded; afterwards only the folders the file watch
+    service reports as changed are re-read, and file operations made
+    through the file handler are applied to the tree directly.
+    """
     def __init__(self, puffin_api: PuffinPluginAPI, parent: QWidget = None):
         super().__init__(parent)
         self.api = puffin_api
@@ -261,13 +221,15 @@ class FileSystemListView(QWidget):
         self.file_handler = self.api.get_manager("file_handler")
         self.theme_manager = self.api.get_manager("theme")
         self.icon_provider = CustomFileIconProvider(self.api)
-        self.git_statuses = {}
-        self.fs_watcher = QFileSystemWatcher(self)
-        self.watched_paths = set()
-        self._refresh_timer = QTimer(self)
-        self._refresh_timer.setSingleShot(True)
-        self._refresh_timer.setInterval(300)
+        self.size_index = DirectorySizeIndex(self)
+        self.model = FileSystemModel(self.icon_provider, self.theme_manager, self.size_index, self)
+        self.file_watcher = self.api.get_manager("file_watcher")
+        self.git_status = self.api.get_manager("git_status")
+        self.model.set_git_statuses(self.git_status.statuses())
         self._is_programmatic_change = False
+        self._expanded_paths = set(os.path.normpath(p) for p in settings_manager.get("explorer_expanded_paths", []))
+        self._expand_all_pending = False
+        self._pending_selection: Optional[str] = None
         self._setup_ui()
         self._connect_signals()
 
@@ -298,7 +260,7 @@ class FileSystemListView(QWidget):
         toolbar_layout.addWidget(self.refresh_button)
         layout.addWidget(toolbar_frame)
         self.tree_widget = StyledTreeView(self.api, self)
-        self.tree_widget.setHeaderLabels(["Project / File", ""])
+        self.tree_widget.setModel(self.model)
         header = self.tree_widget.header()
         header.setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
         header.setSectionResizeMode(1, QHeaderView.ResizeMode.Fixed)
@@ -311,16 +273,16 @@ class FileSystemListView(QWidget):
     def _connect_signals(self):
         self.expand_button.clicked.connect(self.expand_all)
         self.collapse_button.clicked.connect(self.collapse_all)
-        self.refresh_button.clicked.connect(self.refresh)
-        self.tree_widget.itemExpanded.connect(self.on_item_expanded)
-        self.tree_widget.itemCollapsed.connect(self.on_item_collapsed)
-        self.tree_widget.itemDoubleClicked.connect(self.on_item_double_clicked)
+        self.refresh_button.clicked.connect(lambda: self.refresh(force_git=True))
+        self.tree_widget.expanded.connect(self.on_item_expanded)
+        self.tree_widget.collapsed.connect(self.on_item_collapsed)
+        self.tree_widget.doubleClicked.connect(self.on_item_double_clicked)
         self.tree_widget.customContextMenuRequested.connect(self.show_context_menu)
-        self.fs_watcher.directoryChanged.connect(self._schedule_refresh)
-        self.fs_watcher.fileChanged.connect(self._schedule_refresh)
-        self._refresh_timer.timeout.connect(self.refresh)
-        if git_manager := self.api.get_manager("git"):
-            git_manager.git_success.connect(self.refresh)
+        self.model.directory_loaded.connect(self._on_directory_loaded)
+        self.model.directories_removed.connect(self._on_directories_removed)
+        self.file_watcher.changes_ready.connect(self._on_files_changed)
+        self.file_watcher.changes_ready.connect(self.size_index.on_files_changed)
+        self.git_status.statuses_changed.connect(self.model.update_git_statuses)
         self.file_handler.item_created.connect(self._on_item_created)
         self.file_handler.item_renamed.connect(self._on_item_renamed)
         self.file_handler.item_deleted.connect(self._on_item_deleted)
@@ -369,53 +331,55 @@ class FileSystemListView(QWidget):
                 return False, None
 
     def expand_all(self):
+        # Folders not scanned yet are expanded as their parents' contents arrive.
+        self._expand_all_pending = True
         self._is_programmatic_change = True
-        self.tree_widget.expandAll()
+        for path in self.model.loaded_directories():
+            self.tree_widget.expand(self.model.index_for_path(path))
         self._is_programmatic_change = False
         self._save_expanded_state_to_settings()
 
     def collapse_all(self):
+        self._expand_all_pending = False
         self._is_programmatic_change = True
         self.tree_widget.collapseAll()
         self._is_programmatic_change = False
+        self._expanded_paths.clear()
         self._save_expanded_state_to_settings()
 
     def get_expanded_paths(self):
-        expanded = set()
-        iterator = QTreeWidgetItemIterator(self.tree_widget, QTreeWidgetItemIterator.IteratorFlag.All)
-        while (item := iterator.value()):
-            if item.isExpanded() and (data := item.data(0, Qt.ItemDataRole.UserRole)) and (path := data.get('path')):
-                expanded.add(os.path.normpath(path))
-            iterator += 1
-        return list(expanded)
-    
+        return sorted(self._expanded_paths)
+
     def _save_expanded_state_to_settings(self):
         settings_manager.set("explorer_expanded_paths", self.get_expanded_paths())
 
     def _on_item_created(self, item_type: str, path: str):
-        log.debug(f"Created {item_type}: {path}, refreshing.")
-        self.refresh()
-        QTimer.singleShot(150, lambda: self._select_and_scroll_to_path(path))
+        log.debug(f"Created {item_type}: {path}.")
+        self.model.insert_path(path)
+        self._select_and_scroll_to_path(path)
         if item_type == "file":
             self.api.get_main_window()._action_open_file(path)
 
     def _on_item_renamed(self, item_type: str, old: str, new: str):
         self.api.get_main_window()._on_file_renamed(old, new)
-        self.refresh()
-        QTimer.singleShot(100, lambda: self._select_and_scroll_to_path(new))
+        self.model.rename_path(old, new)
+        self._select_and_scroll_to_path(new)
 
     def _on_item_deleted(self, item_type: str, path: str):
-        self.refresh()
-        QTimer.singleShot(150, lambda: self._select_and_scroll_to_path(os.path.dirname(path)))
+        self.model.remove_path(path)
+        self._select_and_scroll_to_path(os.path.dirname(path))
 
-    def on_item_double_clicked(self, item: QTreeWidgetItem, col: int):
-        if (data := item.data(0, Qt.ItemDataRole.UserRole)) and not data.get('is_dir') and (path := data.get('path')) and os.path.isfile(path):
+    def on_item_double_clicked(self, index: QModelIndex):
+        if not self.model.is_dir(index) and (path := self.model.path_for_index(index)) and os.path.isfile(path):
             self.api.get_main_window()._action_open_file(path)
-            
-    def _schedule_refresh(self, path: str):
-        if not self._is_programmatic_change:
-            log.debug(f"FS event at {path}. Refresh scheduled.")
-            self._refresh_timer.start()
+
+    def _on_files_changed(self, change_set):
+        """Re-reads the scanned folders whose listing changed, whether they are expanded or not."""
+        if change_set.overflowed:
+            self.model.rescan_loaded()
+        else:
+            for path in change_set.directories:
+                self.model.rescan(path)
 
     def _move_project(self, path: str, direction: str):
         to_top = (direction == 'up')
@@ -424,158 +388,91 @@ class FileSystemListView(QWidget):
         else:
             self.project_manager.move_project(path, direction)
 
-    def refresh(self):
+    def refresh(self, force_git: bool = False):
+        """
+        Brings the tree up to date with the open projects, re-reads every
+        folder already shown and refreshes git statuses and icons. All of it
+        is applied as incremental updates; nothing is rebuilt. Git statuses
+        are only re-read where they may have changed, unless force_git.
+        """
         log.info("Refreshing file explorer.")
-        expanded_paths = set(os.path.normpath(p) for p in settings_manager.get("explorer_expanded_paths", []))
-        is_first_load = not self.tree_widget.topLevelItemCount() > 0
-        selected_paths = {os.path.normpath(item.data(0, Qt.ItemDataRole.UserRole)['path']) for item in self.tree_widget.selectedItems() if item.data(0, Qt.ItemDataRole.UserRole)}
-        
-        self.tree_widget.blockSignals(True)
-        self._is_programmatic_change = True
-
-        if self.watched_paths:
-            self.fs_watcher.removePaths(list(self.watched_paths))
-        self.watched_paths.clear()
-        self.tree_widget.clear()
-        
         open_projects = self.project_manager.get_open_projects()
-        get_git_statuses_for_root.cache_clear()
-        self.git_statuses = {p: get_git_statuses_for_root(p) for p in open_projects}
-        self.flat_git_status = {k: v for d in self.git_statuses.values() for k, v in d.items()}
-        items_to_reselect = []
-
-        def build_tree_level(parent_item, path):
-            try:
-                self._add_to_watcher(path)
-                for entry in sorted(os.scandir(path), key=lambda e: (not e.is_dir(), e.name.lower())):
-                    if entry.name.startswith(('.', '__pycache__', 'venv')):
-                        continue
-                    norm_path = os.path.normpath(entry.path)
-                    child = QTreeWidgetItem(parent_item, [entry.name])
-                    child.setFirstColumnSpanned(True)
-                    child.setIcon(0, self.icon_provider.icon(QFileInfo(entry.path)))
-                    child.setData(0, Qt.ItemDataRole.UserRole, {'path': norm_path, 'is_dir': entry.is_dir()})
-                    if norm_path in selected_paths:
-                        items_to_reselect.append(child)
-                    
-                    if status := self.flat_git_status.get(norm_path):
-                        colors = self.theme_manager.current_theme_data.get('colors', {})
-                        color_map = {'??': 'git.added', 'M': 'git.modified', 'A': 'git.added', 'D': 'git.deleted', '!!': 'syntax.comment'}
-                        for code, color_key in color_map.items():
-                            if code in status and (color_val := colors.get(color_key)):
-                                child.setForeground(0, QColor(color_val))
-                                break
-
-                    if entry.is_dir():
-                        if norm_path in expanded_paths:
-                            child.setExpanded(True)
-                            build_tree_level(child, norm_path)
-                        else:
-                            child.addChild(QTreeWidgetItem([""]))
-            except OSError as e:
-                log.warning(f"Scan dir error: {e}")
-
-        for proj in open_projects:
-            norm_proj = os.path.normpath(proj)
-            item = QTreeWidgetItem(self.tree_widget, [os.path.basename(norm_proj)])
-            item.setToolTip(0, norm_proj)
-            item.setIcon(0, qta.icon('mdi.folder-open-outline', color=self.theme_manager.current_theme_data.get('colors', {}).get('accent')))
-            item.setData(0, Qt.ItemDataRole.UserRole, {'path': norm_proj, 'is_dir': True, 'is_root': True})
-            if is_first_load or norm_proj in expanded_paths:
-                item.setExpanded(True)
-            controls_widget = QWidget()
-            controls_layout = QHBoxLayout(controls_widget)
-            controls_layout.setContentsMargins(0, 0, 0, 0)
-            controls_layout.setSpacing(0)
-            up_btn = QToolButton(icon=qta.icon('mdi.arrow-up-bold-box-outline'), toolTip="Move project up")
-            down_btn = QToolButton(icon=qta.icon('mdi.arrow-down-bold-box-outline'), toolTip="Move project down")
-            up_btn.clicked.connect(partial(self._move_project, norm_proj, 'up'))
-            down_btn.clicked.connect(partial(self._move_project, norm_proj, 'down'))
-            for btn in (up_btn, down_btn):
-                btn.setAutoRaise(True)
-            controls_layout.addStretch()
-            controls_layout.addWidget(up_btn)
-            controls_layout.addWidget(down_btn)
-            self.tree_widget.setItemWidget(item, 1, controls_widget)
-            build_tree_level(item, norm_proj)
-            
-        if items_to_reselect:
-            self.tree_widget.clearSelection()
-            for item in items_to_reselect:
-                item.setSelected(True)
-            if items_to_reselect:
-                self.tree_widget.scrollToItem(items_to_reselect[0])
-        elif self.tree_widget.topLevelItemCount() > 0:
-            current = self.tree_widget.currentItem()
-            if not current or not current.isSelected():
-                self.tree_widget.setCurrentItem(self.tree_widget.topLevelItem(0))
-
-        self.tree_widget.blockSignals(False)
+        is_first_load = self.model.rowCount() == 0
+        self._is_programmatic_change = True
+        added_roots = self.model.set_roots(open_projects)
+        for path in added_roots:
+            index = self.model.index_for_path(path)
+            self.model.fetchMore(index)
+            if is_first_load or path in self._expanded_paths:
+                self.tree_widget.expand(index)
+        self._is_programmatic_change = False
+        for row in range(self.model.rowCount()):
+            self._set_project_controls(self.model.index(row, 1))
+        self.model.clear_icon_cache()
+        self.model.rescan_loaded()
+        self.git_status.refresh(force=force_git)
+        if not self.tree_widget.currentIndex().isValid() and self.model.rowCount() > 0:
+            self.tree_widget.setCurrentIndex(self.model.index(0, 0))
+
+    def _set_project_controls(self, index: QModelIndex):
+        norm_proj = self.model.path_for_index(index)
+        controls_widget = QWidget()
+        controls_layout = QHBoxLayout(controls_widget)
+        controls_layout.setContentsMargins(0, 0, 0, 0)
+        controls_layout.setSpacing(0)
+        up_btn = QToolButton(icon=qta.icon('mdi.arrow-up-bold-box-outline'), toolTip="Move project up")
+        down_btn = QToolButton(icon=qta.icon('mdi.arrow-down-bold-box-outline'), toolTip="Move project down")
+        up_btn.clicked.connect(partial(self._move_project, norm_proj, 'up'))
+        down_btn.clicked.connect(partial(self._move_project, norm_proj, 'down'))
+        for btn in (up_btn, down_btn):
+            btn.setAutoRaise(True)
+        controls_layout.addStretch()
+        controls_layout.addWidget(up_btn)
+        controls_layout.addWidget(down_btn)
+        self.tree_widget.setIndexWidget(index, controls_widget)
+
+    def _on_directory_loaded(self, path: str):
+        self._is_programmatic_change = True
+        for child_path in self.model.child_directories(path):
+            if self._expand_all_pending or child_path in self._expanded_paths:
+                self.tree_widget.expand(self.model.index_for_path(child_path))
         self._is_programmatic_change = False
+        if self._pending_selection and os.path.dirname(self._pending_selection) == path:
+            self._select_and_scroll_to_path(self._pending_selection)
+
+    def _on_directories_removed(self, paths: List[str]):
+        removed = set(paths)
+        self._expanded_paths = {p for p in self._expanded_paths if p not in removed}
+        self.size_index.forget(paths)
 
-    def _add_to_watcher(self, path):
-        if path and path not in self.watched_paths:
-            self.fs_watcher.addPath(path)
-            self.watched_paths.add(path)
-
-    def _find_item_by_path(self, parent_item, path_to_find):
-        iterator = QTreeWidgetItemIterator(parent_item)
-        while (item := iterator.value()):
-            if (data := item.data(0, Qt.ItemDataRole.UserRole)) and os.path.normpath(data.get('path', '')) == path_to_find:
-                return item
-            iterator += 1
-        return None
-        
     def _select_and_scroll_to_path(self, path: str):
-        if path and (item := self._find_item_by_path(self.tree_widget.invisibleRootItem(), os.path.normpath(path))):
+        """Selects a path in the tree; one whose folder is still being read is selected once it arrives."""
+        index = self.model.index_for_path(path) if path else QModelIndex()
+        self._pending_selection = None if index.isValid() else path
+        if index.isValid():
             try:
-                self.tree_widget.scrollToItem(item, QAbstractItemView.ScrollHint.PositionAtCenter)
-                self.tree_widget.setCurrentItem(item)
+                self.tree_widget.scrollTo(index, QAbstractItemView.ScrollHint.PositionAtCenter)
+                self.tree_widget.setCurrentIndex(index)
             except RuntimeError as e:
                 log.warning(f"Scroll failed (ignored): {e}")
 
-    def on_item_expanded(self, item: QTreeWidgetItem):
-        if self._is_programmatic_change:
+    def on_item_expanded(self, index: QModelIndex):
+        if (path := self.model.path_for_index(index)) is None:
             return
-        data = item.data(0, Qt.ItemDataRole.UserRole)
-        if data and data.get('is_dir') and item.childCount() == 1 and not item.child(0).text(0):
-            self._is_programmatic_change = True
-            item.takeChildren()
-            self._populate_node(item)
-            self._is_programmatic_change = False
-        self._save_expanded_state_to_settings()
-
-    def on_item_collapsed(self, item: QTreeWidgetItem):
+        self._expanded_paths.add(path)
+        self.model.fetchMore(index)
         if not self._is_programmatic_change:
             self._save_expanded_state_to_settings()
 
-    def _populate_node(self, parent_item):
-        path = (data := parent_item.data(0, Qt.ItemDataRole.UserRole)) and data.get('path')
-        if not path or not os.path.isdir(path):
-            return
-        try:
-            for entry in sorted(os.scandir(path), key=lambda e: (not e.is_dir(), e.name.lower())):
-                if entry.name.startswith(('.', '__pycache__', 'venv')):
-                    continue
-                child = QTreeWidgetItem(parent_item, [entry.name])
-                child.setFirstColumnSpanned(True)
-                child.setIcon(0, self.icon_provider.icon(QFileInfo(entry.path)))
-                child.setData(0, Qt.ItemDataRole.UserRole, {'path': os.path.normpath(entry.path), 'is_dir': entry.is_dir()})
-                if status := self.flat_git_status.get(os.path.normpath(entry.path)):
-                    colors, color_map = self.theme_manager.current_theme_data.get('colors', {}), {'??': 'git.added', 'M': 'git.modified', 'A': 'git.added', 'D': 'git.deleted', '!!': 'syntax.comment'}
-                    for code, color_key in color_map.items():
-                        if code in status and (color := colors.get(color_key)):
-                            child.setForeground(0, QColor(color))
-                            break
-                if entry.is_dir():
-                    child.addChild(QTreeWidgetItem([""]))
-        except OSError:
-            pass
+    def on_item_collapsed(self, index: QModelIndex):
+        self._expanded_paths.discard(self.model.path_for_index(index))
+        if not self._is_programmatic_change:
+            self._save_expanded_state_to_settings()
 
     def show_context_menu(self, position: QPoint):
-        item = self.tree_widget.itemAt(position)
+        index = self.tree_widget.indexAt(position)
         path, is_dir = self.project_manager.get_active_project_path(), True
-        if item and (data := item.data(0, Qt.ItemDataRole.UserRole)):
-            path, is_dir = data.get('path'), data.get('is_dir')
+        if index.isValid():
+            path, is_dir = self.model.path_for_index(index), self.model.is_dir(index)
         if path:
-            show_project_context_menu(self, self.tree_widget.mapToGlobal(position), path, is_dir, self.project_manager)
\ No newline at end of file
+            show_project_context_menu(self, self.tree_widget.mapToGlobal(position), path, is_dir, self.project_manager)
@@ -0,0 +1,50 @@
+# PuffinPyEditor/ui/explorer/scan_worker.py
+import os
+from typing import List, Optional, Tuple
+from PyQt6.QtCore import QObject, QRunnable, pyqtSignal
+
+# Entries whose names start with one of these are not shown in the explorer.
+HIDDEN_PREFIXES = ('.', '__pycache__', 'venv')
+
+
+def entry_sort_key(name: str, is_dir: bool) -> Tuple[bool, str]:
+    """Folders first, then case-insensitive by name."""
+    return (not is_dir, name.lower())
+
+
+def scan_directory(path: str) -> List[Tuple[str, bool]]:
+    """The visible (name, is_dir) entries of a directory, in explorer order."""
+    entries = []
+    with os.scandir(path) as it:
+        for entry in it:
+            if entry.name.startswith(HIDDEN_PREFIXES):
+                continue
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+            entries.append((entry.name, is_dir))
+    entries.sort(key=lambda e: entry_sort_key(*e))
+    return entries
+
+
+class ScanSignals(QObject):
+    # scan id, directory path, [(name, is_dir), ...] or None if it could not be read
+    finished = pyqtSignal(int, str, object)
+
+
+class DirectoryScanWorker(QRunnable):
+    def __init__(self, scan_id: int, path: str):
+        super().__init__()
+        self.scan_id = scan_id
+        self.path = path
+        self.signals = ScanSignals()
+
+    def run(self):
+        entries: Optional[List[Tuple[str, bool]]] = None
+        try:
+            entries = scan_directory(self.path)
+        except OSError:
+            pass
+        self.signals.finished.emit(self.scan_id, self.path, entries)
+
@@ -3,18 +3,26 @@ import os, sys, re
 from functools import partial
 from typing import Optional
 from PyQt6.QtGui import (QKeySequence, QAction, QCloseEvent, QDesktopServices, QIcon, QActionGroup, QDragEnterEvent,
-                         QDropEvent)
+                         QDropEvent, QTextCursor)
 from PyQt6.QtWidgets import (QMessageBox, QMenu, QWidget, QVBoxLayout, QHBoxLayout, QMainWindow, QStatusBar, QTabWidget, \
-                             QLabel, QToolButton, QToolBar, QSizePolicy, QApplication, QFileDialog, QDockWidget, QComboBox)
+                             QLabel, QToolButton, QToolBar, QSizePolicy, QApplication, QFileDialog, QDockWidget, QComboBox,
+                             QProgressBar)
 from PyQt6.QtCore import Qt, pyqtSignal, QTimer, QSize, QUrl, QEvent
 
 import qtawesome as qta
 from utils.logger import log
 from utils import versioning, helpers
-from app_core.file_handler import FileHandler
+from app_core.file_handler import FileHandler, FileLoadWorker
 from app_core.settings_manager import settings_manager
 from app_core.project_manager import ProjectManager
 from app_core.linter_manager import LinterManager
+from app_core.file_watcher import FileWatchService
+from app_core.git_status_service import GitStatusService
+from app_core.symbol_index import SymbolIndexManager, only_binds_to
+from app_core.search_manager import ProjectSearchManager
+from app_core.search_engine import compile_query
+from app_core.project_replace import write_files_atomically
+from app_core.replace_engine import replacement_ranges
 from app_core.plugin_manager import PluginManager
 from app_core.completion_manager import CompletionManager
 from app_core.update_manager import UpdateManager
@@ -25,7 +33,11 @@ from .preferences_dialog import PreferencesDialog
 from .widgets.draggable_tab_widget import DraggableTabWidget
 from .explorer.list_view_widget import FileSystemListView
 from .widgets.problems_panel import ProblemsPanel
+from .widgets.large_file_viewer import LargeFileViewer
 from .widgets.source_control_panel import ProjectSourceControlPanel
+from .widgets.symbol_search_dialog import SymbolSearchDialog
+from .widgets.search_panel import SearchPanel
+from .widgets.replace_preview_dialog import ReplacePreviewDialog
 from .editor_widget import EditorWidget, HighlightManager
 from app_core.syntax_highlighters import (
     PythonSyntaxHighlighter, JsonSyntaxHighlighter, HtmlSyntaxHighlighter,
@@ -46,6 +58,8 @@ class MainWindow(QMainWindow):
         self.file_handler, self.theme_manager, self.debug_mode = file_handler, theme_manager, debug_mode
         self.file_handler.parent_window = self
         self.preferences_dialog, self._bottom_tab_widget, self._bottom_dock_widget = None, None, None
+        self._loading_files = {}  # normalized filepath -> FileLoadWorker still reading it
+        self._definition_fallback = None  # The indexed symbol for a pending F12, used if Jedi finds nothing
 
         self._initialize_managers()
         self.puffin_api = PuffinPluginAPI(self)
@@ -77,17 +91,26 @@ class MainWindow(QMainWindow):
         self._integrate_file_explorer()
         self._integrate_linter_ui()
         self._integrate_source_control_ui()
+        self._integrate_search_ui()
         self._integrate_global_drag_drop()
 
+        self.project_manager.projects_changed.connect(self._update_watched_projects)
+        self.file_watch_service.changes_ready.connect(self._on_files_changed_on_disk)
+        self.file_watch_service.changes_ready.connect(self.linter_manager.on_files_changed)
+        self.file_watch_service.changes_ready.connect(self.git_status_service.on_files_changed)
+        self.file_watch_service.changes_ready.connect(self.symbol_index.on_files_changed)
+        self.file_watch_service.changes_ready.connect(self.search_manager.on_files_changed)
+        self.git_manager.git_success.connect(lambda *_: self.git_status_service.refresh())
         if self.explorer_panel:
             self.project_manager.projects_changed.connect(self.explorer_panel.refresh)
-            self.explorer_panel.tree_widget.currentItemChanged.connect(self._on_active_project_changed)
+            self.explorer_panel.tree_widget.selectionModel().currentChanged.connect(self._on_active_project_changed)
         if self.source_control_panel:
             self.theme_changed_signal.connect(self.source_control_panel.update_icons)
             self.git_manager.git_success.connect(self.source_control_panel.refresh_all_projects)
             self.github_manager.operation_success.connect(self.source_control_panel.refresh_all_projects)
+            self.file_watch_service.changes_ready.connect(self.source_control_panel.on_files_changed)
             if self.explorer_panel:
-                self.explorer_panel.tree_widget.currentItemChanged.connect(
+                self.explorer_panel.tree_widget.selectionModel().currentChanged.connect(
                     self.source_control_panel.refresh_all_projects)
 
         plugins_to_ignore = []
@@ -138,6 +161,10 @@ class MainWindow(QMainWindow):
         self.github_manager = GitHubManager(self)
         self.git_manager = SourceControlManager(self)
         self.linter_manager = LinterManager(self)
+        self.file_watch_service = FileWatchService(self)
+        self.git_status_service = GitStatusService(self)
+        self.symbol_index = SymbolIndexManager(self)
+        self.search_manager = ProjectSearchManager(self)
         self.update_manager = UpdateManager(self)
         self.actions = {}
         self.editor_tabs_data = {}
@@ -167,22 +194,25 @@ class MainWindow(QMainWindow):
             if hc := self.puffin_api.highlighter_map.get(os.path.splitext(filepath or "")[1].lower()):
                 editor.set_highlighter(hc)
             editor.set_filepath(filepath);
-            editor.set_text(content)
+            editor.set_text(content); editor.mark_clean()
             editor.cursor_position_display_updated.connect(lambda l, c: self.cursor_label.setText(f" Ln {l}, Col {c} "))
             editor.content_possibly_changed.connect(partial(self._on_content_changed, editor))
+            editor.modification_changed.connect(partial(self._update_modified_marker, editor))
             editor.status_message_requested.connect(self.statusBar().showMessage)
             name = os.path.basename(filepath or f"Untitled-{self.untitled_file_counter + 1}")
             if not filepath: self.untitled_file_counter += 1
             idx = self.tab_widget.addTab(editor, name)
             self.tab_widget.setTabToolTip(idx, filepath or f"Unsaved {name}")
-            self.editor_tabs_data[editor] = {'filepath': filepath, 'original_hash': hash(content), 'encoding': encoding}
+            self.editor_tabs_data[editor] = {'filepath': filepath, 'encoding': encoding}
             self.tab_widget.setCurrentWidget(editor)
             editor.text_area.setFocus()
+            return editor
         except Exception as e:
             log.critical(f"CRASH during _add_new_tab: {e}", exc_info=True)
             QMessageBox.critical(self, "Fatal Error", f"Could not create editor tab:\n\n{e}")
 
     def _post_init_setup(self):
+        self._update_watched_projects()
         self._update_recent_files_menu()
         self._update_window_title()
         if open_files := settings_manager.get("open_files", []):
@@ -206,7 +236,7 @@ class MainWindow(QMainWindow):
                 if index != -1:
                     self.tab_widget.setTabText(index, os.path.basename(new_path))
                     self.tab_widget.setTabToolTip(index, new_path)
-                    data['original_hash'] = hash(widget.get_text())
+                    widget.mark_clean()
                     self._on_content_changed(widget)
                 break
 
@@ -224,6 +254,9 @@ class MainWindow(QMainWindow):
         self.problems_panel = ProblemsPanel(self)
         self.add_dock_panel(self.problems_panel, "Problems", "bottom", "mdi.bug-outline")
         self.linter_manager.lint_results_ready.connect(self._update_problems_panel)
+        self.linter_manager.project_lint_partial_results.connect(self.problems_panel.apply_file_results)
+        self.linter_manager.project_lint_progress.connect(
+            lambda done, total: self.statusBar().showMessage(f"Linting project: {done}/{total} files", 2000))
         self.linter_manager.error_occurred.connect(
             lambda err: self.problems_panel.show_info_message(f"Linter Error: {err}"))
         self.problems_panel.problem_selected.connect(self._goto_definition_result)
@@ -235,6 +268,12 @@ class MainWindow(QMainWindow):
         self.add_dock_panel(self.source_control_panel, "Source Control", "bottom",
                             "mdi.git")
 
+    def _integrate_search_ui(self):
+        self.search_panel = SearchPanel(self.search_manager, self)
+        self.add_dock_panel(self.search_panel, "Search", "bottom", "mdi.magnify")
+        self.search_panel.match_selected.connect(self._goto_definition_result)
+        self.search_panel.replace_requested.connect(self._replace_in_project)
+
     def _integrate_global_drag_drop(self):
         self.setAcceptDrops(True)
 
@@ -249,10 +288,32 @@ class MainWindow(QMainWindow):
                     self._action_open_file(url.toLocalFile())
             event.acceptProposedAction()
 
+    def _update_watched_projects(self):
+        self.file_watch_service.set_roots(self.project_manager.get_open_projects())
+        self.git_status_service.set_roots(self.project_manager.get_open_projects())
+        self.symbol_index.set_projects(self.project_manager.get_open_projects())
+        self.search_manager.set_projects(self.project_manager.get_open_projects())
+
+    def _on_files_changed_on_disk(self, change_set):
+        """Reloads open files changed outside the editor, unless they have unsaved edits."""
+        for i in range(self.tab_widget.count()):
+            if not (isinstance(ed := self.tab_widget.widget(i), EditorWidget) and (
+                    fp := self.editor_tabs_data.get(ed, {}).get('filepath'))) or ed.is_loading(): continue
+            name, fp = os.path.basename(fp), os.path.normpath(fp)
+            if fp in change_set.deleted:
+                self.statusBar().showMessage(f"'{name}' was deleted on disk.", 5000); continue
+            if fp not in change_set.modified and fp not in change_set.created: continue
+            content, encoding = self.file_handler._read_with_encoding_detection(fp)
+            if content is None or content.replace('\r\n', '\n') == ed.get_text(): continue  # Unreadable, or our own save
+            if ed.is_modified():
+                self.statusBar().showMessage(f"'{name}' changed on disk; your unsaved edits were kept.", 5000); continue
+            ed.reload_text(content); self.editor_tabs_data[ed]['encoding'] = encoding
+            self.statusBar().showMessage(f"Reloaded '{name}', which changed on disk.", 3000)
+
     def _update_problems_panel(self, problems):
         if isinstance(editor := self.tab_widget.currentWidget(), EditorWidget) and (
                 fp := self.editor_tabs_data.get(editor, {}).get('filepath')):
-            self.problems_panel.update_problems({fp: problems})
+            self.problems_panel.apply_file_results({fp: problems})
 
     def _load_window_geometry(self):
         size = self.settings.get("window_size", [1600, 1000])
@@ -285,6 +346,9 @@ class MainWindow(QMainWindow):
             "save_as": ("Save &As...", self._action_save_as, "Ctrl+Shift+S", None),
             "save_all": ("Save A&ll", self._action_save_all, "Ctrl+Alt+S", None),
             "find_replace": ("&Find/Replace...", self.toggle_find_panel, "Ctrl+F", "mdi.magnify"),
+            "search_in_project": ("Searc&h in Project...", self._action_search_in_project, "Ctrl+Shift+F", 'mdi.file-search-outline'),
+            "goto_symbol": ("Go to &Symbol in Project...", self._action_goto_symbol, "Ctrl+T", 'mdi.code-braces'),
+            "goto_definition": ("Go to &Definition", self._action_goto_definition, "F12", None),
             "preferences": ("&Preferences...", self._action_open_preferences, "Ctrl+,", 'mdi.cog-outline'),
             "exit": ("E&xit", self.close, "Ctrl+Q", None),
             "force_quit": ("&Force Quit", self._action_force_quit, "Ctrl+Shift+Q", 'mdi.alert-outline')
@@ -320,6 +384,7 @@ class MainWindow(QMainWindow):
         self.file_menu.addSeparator();
         self.file_menu.addActions([self.actions["exit"], self.actions["force_quit"]])
         self.edit_menu.addAction(self.actions["find_replace"]);
+        self.edit_menu.addSeparator(); self.edit_menu.addActions([self.actions[k] for k in ["search_in_project", "goto_symbol", "goto_definition"]])
         self.theme_menu = self.view_menu.addMenu("&Themes");
         self.help_menu.addAction("About PuffinPyEditor", self._show_about_dialog);
         self.help_menu.addAction("View on GitHub", self._open_github_link)
@@ -359,6 +424,9 @@ class MainWindow(QMainWindow):
         self.setStatusBar(QStatusBar(self))
         self.encoding_label = QLabel(" UTF-8 ")
         self.cursor_label = QLabel(" Ln 1, Col 1 ")
+        self.load_progress_bar = QProgressBar(maximumWidth=160, textVisible=False)
+        self.load_progress_bar.hide()
+        self.statusBar().addPermanentWidget(self.load_progress_bar)
         self.statusBar().addPermanentWidget(self.encoding_label)
         self.statusBar().addPermanentWidget(self.cursor_label)
 
@@ -366,7 +434,7 @@ class MainWindow(QMainWindow):
         self.tab_widget.currentChanged.connect(self._on_tab_changed);
         self.tab_widget.tabCloseRequested.connect(self._action_close_tab_by_index);
         self.lint_timer.timeout.connect(self._trigger_file_linter);
-        self.completion_manager.definition_found.connect(self._goto_definition_result);
+        self.completion_manager.definition_found.connect(self._on_definition_found);
         self.auto_save_timer.timeout.connect(self._auto_save_current_tab)
         self.file_handler.recent_files_changed.connect(self._update_recent_files_menu)
         self.encoding_combo.activated.connect(self._on_encoding_changed_from_dropdown)
@@ -432,11 +500,14 @@ class MainWindow(QMainWindow):
     def _action_open_file(self, fp=None, content=None, encoding=None):
         if not (isinstance(fp, str) and fp): return
         np = os.path.normpath(fp)
+        if np in self._loading_files: return
         for i in range(self.tab_widget.count()):
             if isinstance(w := self.tab_widget.widget(i), EditorWidget) and self.editor_tabs_data.get(w, {}).get(
                     'filepath') == np: self.tab_widget.setCurrentIndex(i); return
+            if isinstance(w, LargeFileViewer) and w.filepath == np: self.tab_widget.setCurrentIndex(i); return
         if h := self.file_open_handlers.get(os.path.splitext(np)[1].lower()): h(
             np); self.file_handler._add_to_recent_files(np); return
+        if self.file_handler.should_open_in_viewer(np) and self._open_large_file_viewer(np): return
         
         # --- MODIFIED: Draft Checking Logic ---
         draft_path = helpers.get_draft_path(np)
@@ -462,6 +533,9 @@ class MainWindow(QMainWindow):
                 QMessageBox.warning(self, "Draft Read Error", "Could not read the draft file. Opening original.")
                 content, encoding = self.file_handler._read_with_encoding_detection(np)
         elif content is None:
+            if self.file_handler.should_load_async(np):
+                self._open_file_async(np)
+                return
             content, encoding = self.file_handler._read_with_encoding_detection(np)
 
         if content is None:
@@ -471,6 +545,63 @@ class MainWindow(QMainWindow):
         self._add_new_tab(np, content, encoding or 'utf-8')
         self.file_handler._add_to_recent_files(np)
 
+    def _open_large_file_viewer(self, np) -> bool:
+        """Opens np in a read-only LargeFileViewer tab. Returns False if the viewer cannot show it."""
+        try:
+            viewer = LargeFileViewer(np, self.theme_manager)
+        except ValueError as e:
+            log.warning(f"Large file viewer cannot open {np}: {e}")
+            self.statusBar().showMessage(f"{e} Opening it in the editor instead.", 4000)
+            return False
+        except OSError as e:
+            self.puffin_api.show_message("critical", "Error Opening File", f"Could not read file: {np}\n\n{e}")
+            return True
+        if self.tab_widget.count() == 1 and isinstance(self.tab_widget.widget(0), QLabel):
+            self.tab_widget.removeTab(0)
+        self.tab_widget.setTabsClosable(True)
+        viewer.cursor_position_display_updated.connect(lambda l, c: self.cursor_label.setText(f" Ln {l}, Col {c} "))
+        viewer.status_message_requested.connect(self.statusBar().showMessage)
+        self.theme_changed_signal.connect(viewer.update_theme)
+        idx = self.tab_widget.addTab(viewer, os.path.basename(np))
+        self.tab_widget.setTabToolTip(idx, f"{np} (read-only)")
+        self.tab_widget.setCurrentWidget(viewer)
+        self.file_handler._add_to_recent_files(np)
+        return True
+
+    def _open_file_async(self, np):
+        """Reads a large file on a worker thread; _on_file_loaded streams it into a new tab."""
+        worker = FileLoadWorker(np)
+        self._loading_files[np] = worker
+        worker.signals.finished.connect(self._on_file_loaded)
+        worker.signals.error.connect(self._on_file_load_failed)
+        self.load_progress_bar.setRange(0, 0)  # Busy until the file has been read and decoded
+        self.load_progress_bar.show()
+        self.statusBar().showMessage(f"Opening {os.path.basename(np)}...")
+        self.file_handler.threadpool.start(worker)
+
+    def _on_file_loaded(self, np, content, encoding):
+        self._loading_files.pop(np, None)
+        if self._is_app_closing or not (editor := self._add_new_tab(np, "", encoding)):
+            self.load_progress_bar.hide()
+            return
+        self.load_progress_bar.setRange(0, 100)
+        editor.load_progress.connect(self.load_progress_bar.setValue)
+        editor.load_finished.connect(partial(self._on_editor_load_finished, editor))
+        editor.load_text_in_chunks(content)
+        self.file_handler._add_to_recent_files(np)
+
+    def _on_editor_load_finished(self, editor):
+        if not self._loading_files: self.load_progress_bar.hide()
+        self._update_modified_marker(editor)
+        if data := self.editor_tabs_data.get(editor):
+            self.statusBar().showMessage(f"Opened {os.path.basename(data['filepath'])}", 3000)
+
+    def _on_file_load_failed(self, np, message):
+        self._loading_files.pop(np, None)
+        if not self._loading_files: self.load_progress_bar.hide()
+        self.statusBar().clearMessage()
+        self.puffin_api.show_message("critical", "Error Opening File", f"Could not read file: {np}\n\n{message}")
+
     def _action_open_file_dialog(self):
         fp, content, encoding, err = self.file_handler.open_file_dialog()
         if err:
@@ -514,6 +645,7 @@ class MainWindow(QMainWindow):
                 self.encoding_combo.setCurrentIndex(idx)
             
             self.encoding_combo.setEnabled(bool(data.get('filepath')))
+            self.lint_timer.start()
         else:
             self.cursor_label.setText("")
             self.encoding_label.setText("")
@@ -526,11 +658,11 @@ class MainWindow(QMainWindow):
         self.actions["find_replace"].setEnabled(is_editor)
 
     def _is_editor_modified(self, ed):
-        return isinstance(ed, EditorWidget) and (data := self.editor_tabs_data.get(ed)) and hash(ed.get_text()) != data[
-            'original_hash']
+        # The document's own modified flag; cheap enough to call on every keystroke.
+        return isinstance(ed, EditorWidget) and ed in self.editor_tabs_data and ed.is_modified()
 
-    def _on_content_changed(self, editor):
-        if not (isinstance(editor, EditorWidget) and self.tab_widget.isAncestorOf(editor)): return
+    def _update_modified_marker(self, editor, *_):
+        if not (isinstance(editor, EditorWidget) and self.tab_widget.isAncestorOf(editor)) or editor.is_loading(): return
         mod, idx = self._is_editor_modified(editor), self.tab_widget.indexOf(editor)
         if idx != -1:
             txt = self.tab_widget.tabText(idx)
@@ -539,12 +671,18 @@ class MainWindow(QMainWindow):
             elif not mod and txt.endswith(' *'):
                 self.tab_widget.setTabText(idx, txt[:-2])
         self._update_window_title()
+
+    def _on_content_changed(self, editor):
+        if not (isinstance(editor, EditorWidget) and self.tab_widget.isAncestorOf(editor)) or editor.is_loading(): return
+        self._update_modified_marker(editor)
+        mod = editor.is_modified()
         if self.settings.get("auto_save_enabled"): self.auto_save_timer.start(
             self.settings.get("auto_save_delay_seconds", 3) * 1000)
         
         # --- NEW: Trigger draft save on content change ---
         if mod:
             self.draft_save_timer.start()
+        self.lint_timer.start()
 
     def _update_window_title(self):
         proj = os.path.basename(self.project_manager.get_active_project_path() or "");
@@ -579,10 +717,10 @@ class MainWindow(QMainWindow):
             # This robustly handles the transition from an unsaved "Untitled" file to a saved file with a path.
             self.editor_tabs_data[editor] = {
                 'filepath': new_fp,
-                'original_hash': hash(content),
                 'encoding': new_encoding
             }
             # --- END FIX ---
+            editor.mark_clean()
             
             editor.set_filepath(new_fp)
             
@@ -633,6 +771,9 @@ class MainWindow(QMainWindow):
                 self._save_draft(widget)
             if widget in self.editor_tabs_data:
                 del self.editor_tabs_data[widget]
+        elif isinstance(widget, LargeFileViewer):
+            self.theme_changed_signal.disconnect(widget.update_theme)
+            widget.close_file()
 
         event.accept()
 
@@ -651,9 +792,9 @@ class MainWindow(QMainWindow):
         if act := self.sender(): self._action_open_file(act.data())
 
     def _trigger_file_linter(self):
-        if (editor := self.tab_widget.currentWidget()) and (
-                fp := self.editor_tabs_data.get(editor, {}).get('filepath')):
-            self.linter_manager.lint_file(fp)
+        if isinstance(editor := self.tab_widget.currentWidget(), EditorWidget) and (
+                fp := self.editor_tabs_data.get(editor, {}).get('filepath')) and fp.lower().endswith(('.py', '.pyw')):
+            self.linter_manager.lint_buffer(fp, editor.get_text())
 
     def _show_about_dialog(self):
         QMessageBox.about(self, "About", f"PuffinPyEditor v{versioning.APP_VERSION}")
@@ -683,6 +824,71 @@ class MainWindow(QMainWindow):
         log.warning("Force Quit triggered.");
         QApplication.instance().quit()
 
+    def _action_search_in_project(self):
+        self._bottom_dock_widget.show(); self._bottom_dock_widget.raise_(); self._bottom_tab_widget.setCurrentWidget(self.search_panel)
+        ed = self.tab_widget.currentWidget(); sel = ed.text_area.textCursor().selectedText() if isinstance(ed, EditorWidget) else ""
+        if sel and '\u2029' not in sel: self.search_panel.set_query(sel)
+        else: self.search_panel.query_input.setFocus(); self.search_panel.query_input.selectAll()
+
+    def _replace_in_project(self, query: str, replacement: str, options: dict):
+        """Previews replacing every match in the open projects and applies the files the user accepts."""
+        buffers = {d['filepath']: ed.get_text() for ed, d in self.editor_tabs_data.items()
+                   if isinstance(ed, EditorWidget) and d.get('filepath') and ed.is_modified() and not ed.is_loading()}
+        try: request_id = self.search_manager.preview_replace(query, replacement, buffers, **options)
+        except re.error as e: self.search_panel.summary_label.setText(f"Invalid pattern: {e}"); return
+        dialog = ReplacePreviewDialog(self.search_manager, request_id, f"Replace '{query}' with '{replacement}'", self.search_panel.display_path, self)
+        if not dialog.exec() or not (changes := dialog.accepted_changes()): return
+        self._apply_project_replace(changes, compile_query(query, options['regex'], options['case_sensitive'], options['whole_word']), replacement, options['regex'])
+        self.search_panel.start_search()
+
+    def _apply_project_replace(self, changes, pattern, replacement: str, regex: bool):
+        """
+        Writes the accepted files all or nothing, then updates open editors in place rather than reloading them: the
+        replacements go in as one undo step, keeping the cursor, scroll position and history. Files open with unsaved
+        edits were previewed from the editor's text and are only changed there.
+        """
+        editors = {os.path.normpath(d['filepath']): ed for ed, d in self.editor_tabs_data.items() if isinstance(ed, EditorWidget) and d.get('filepath')}
+        written, error = write_files_atomically([(path, new, encoding, stat) for path, encoding, stat, _, _, new in changes if stat is not None])
+        if error:
+            log.error(f"Replace in project: {error}"); QMessageBox.warning(self, "Replace in Project", error)
+            if not written: return
+        written, replaced, files = set(written), 0, 0
+        for path, _, stat, count, _, new in changes:
+            if stat is not None and path not in written: continue
+            replaced += count; files += 1
+            if (ed := editors.get(path)) is None or ed.is_loading(): continue
+            ed.apply_replacements(replacement_ranges(ed.get_text(), pattern, replacement, regex))
+            if stat is None: continue
+            if ed.get_text() != (saved := new.replace('\r\n', '\n').replace('\r', '\n')): ed.reload_text(saved)  # The editor was behind the disk
+            ed.mark_clean()
+        if files: self.statusBar().showMessage(f"Replaced {replaced} occurrences in {files} files.", 5000)
+
+    def _action_goto_symbol(self):
+        dialog = SymbolSearchDialog(self.symbol_index, self.project_manager.get_open_projects(), self)
+        dialog.symbol_chosen.connect(self._goto_definition_result); dialog.exec()
+
+    def _action_goto_definition(self):
+        """
+        Jumps straight to a class or function defined exactly once in the open
+        projects if the name under the cursor can only mean that one: it is not
+        an attribute and the file binds it to nothing else. Otherwise asks Jedi,
+        falling back to that class or function if Jedi finds nothing.
+        """
+        if not isinstance(ed := self.tab_widget.currentWidget(), EditorWidget): return
+        cur = ed.text_area.textCursor(); word_cur = QTextCursor(cur); word_cur.select(QTextCursor.SelectionType.WordUnderCursor)
+        name, fp, text = word_cur.selectedText(), self.editor_tabs_data.get(ed, {}).get('filepath') or "", ed.get_text()
+        hits = [s for s in self.symbol_index.definitions(name) if s[1] != 'variable']
+        self._definition_fallback = hits[0] if len(hits) == 1 else None
+        before = cur.block().text()[:word_cur.selectionStart() - cur.block().position()]
+        if self._definition_fallback and not before.rstrip().endswith('.') and only_binds_to(text, fp, name, hits[0]):
+            self._on_definition_found("", -1, -1); return
+        self.completion_manager.request_definition(text, cur.blockNumber() + 1, cur.positionInBlock(), fp)
+
+    def _on_definition_found(self, fp, line, col):
+        if not fp and (symbol := self._definition_fallback): fp, line, col = symbol[3], symbol[4], symbol[5]
+        self._definition_fallback = None
+        self._goto_definition_result(fp, line, col)
+
     def _goto_definition_result(self, fp, line, col):
         if not fp: self.statusBar().showMessage("Definition not found", 3000); return
         np = os.path.normpath(fp)
@@ -707,7 +913,7 @@ class MainWindow(QMainWindow):
         log.info("Shutting down core managers...");
         [m.shutdown() for m in
          [self.completion_manager, self.github_manager, self.git_manager,
-          self.linter_manager] if hasattr(m, 'shutdown')]
+          self.linter_manager, self.file_watch_service, self.git_status_service, self.symbol_index, self.search_manager] if hasattr(m, 'shutdown')]
 
     def closeEvent(self, e: QCloseEvent):
         if self._is_app_closing: e.accept(); return
@@ -723,6 +929,9 @@ class MainWindow(QMainWindow):
                 # --- NEW: Save final drafts on close ---
                 if self._is_editor_modified(widget):
                     self._save_draft(widget)
+            elif isinstance(widget, LargeFileViewer):
+                open_fps.append(widget.filepath)
+                widget.close_file()
 
         settings_manager.set("open_files", open_fps, save_immediately=False)
         if hasattr(self, 'explorer_panel'):
@@ -743,10 +952,10 @@ class MainWindow(QMainWindow):
             log.warning("Find called on non-editor widget.")
 
     def _on_active_project_changed(self, cur, _):
-        if not cur: return
+        if not cur.isValid(): return
         root = cur;
-        while parent := root.parent(): root = parent
-        if (data := root.data(0, Qt.ItemDataRole.UserRole)) and (path := data.get('path')):
+        while (parent := root.parent()).isValid(): root = parent
+        if (data := root.data(Qt.ItemDataRole.UserRole)) and (path := data.get('path')):
             self.project_manager.set_active_project(path)
             # Update completion manager context when active project changes
             self.completion_manager.update_project_path(path)
@@ -830,9 +1039,9 @@ class MainWindow(QMainWindow):
         saved_path, final_encoding = self.file_handler.save_file_content(filepath, content, save_as=False, encoding=new_encoding)
         
         if saved_path:
-            # Update the editor's data store with the new encoding and reset the hash
+            # Update the editor's data store with the new encoding and mark the text as saved
             data['encoding'] = final_encoding
-            data['original_hash'] = hash(content)
+            editor.mark_clean()
             self._on_content_changed(editor) # Update modification status
             self.statusBar().showMessage(f"File saved with new encoding: {self.reverse_encoding_map.get(final_encoding, final_encoding)}", 4000)
         else:
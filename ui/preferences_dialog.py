@@ -152,6 +152,10 @@ class PreferencesDialog(QDialog):
         self.auto_save_checkbox.setChecked(settings_manager.get("auto_save_enabled"))
         self.auto_save_delay_spinbox.setValue(settings_manager.get("auto_save_delay_seconds"))
         self.max_recent_files_spinbox.setValue(settings_manager.get("max_recent_files"))
+        self.lazy_highlight_spinbox.setValue(settings_manager.get("lazy_highlighting_threshold_lines"))
+        self.async_open_spinbox.setValue(settings_manager.get("async_open_threshold_mb"))
+        self.large_file_viewer_spinbox.setValue(settings_manager.get("large_file_viewer_threshold_mb"))
+        self.poll_interval_spinbox.setValue(settings_manager.get("file_watch_poll_interval_seconds"))
         self.python_path_edit.setText(settings_manager.get("python_interpreter_path", ""))
         if sys.platform == "win32":
             self.nsis_path_edit.setText(settings_manager.get("nsis_path", ""))
@@ -197,6 +201,10 @@ class PreferencesDialog(QDialog):
             "auto_save_enabled": self.auto_save_checkbox.isChecked(),
             "auto_save_delay_seconds": self.auto_save_delay_spinbox.value(),
             "max_recent_files": self.max_recent_files_spinbox.value(),
+            "lazy_highlighting_threshold_lines": self.lazy_highlight_spinbox.value(),
+            "async_open_threshold_mb": self.async_open_spinbox.value(),
+            "large_file_viewer_threshold_mb": self.large_file_viewer_spinbox.value(),
+            "file_watch_poll_interval_seconds": self.poll_interval_spinbox.value(),
             "python_interpreter_path": self.python_path_edit.text().strip(),
             "source_control_repos": self.staged_repos,
             "active_update_repo_id": self.staged_active_repo_id,
@@ -319,6 +327,36 @@ class PreferencesDialog(QDialog):
         file_layout.addRow(self.auto_save_checkbox)
         file_layout.addRow("Auto-Save Delay:", self.auto_save_delay_spinbox)
         file_layout.addRow("Max Recent Files:", self.max_recent_files_spinbox)
+        perf_layout = self._create_layout_in_groupbox("Performance", layout)
+        self.lazy_highlight_spinbox = QSpinBox()
+        self.lazy_highlight_spinbox.setRange(0, 10_000_000)
+        self.lazy_highlight_spinbox.setSingleStep(5000)
+        self.lazy_highlight_spinbox.setSuffix(" lines")
+        self.lazy_highlight_spinbox.setSpecialValueText("Disabled")
+        self.lazy_highlight_spinbox.setToolTip("Files with at least this many lines are highlighted "
+                                               "around the viewport first and in the background afterwards.")
+        perf_layout.addRow("Lazy Highlighting From:", self.lazy_highlight_spinbox)
+        self.async_open_spinbox = QSpinBox()
+        self.async_open_spinbox.setRange(0, 100_000)
+        self.async_open_spinbox.setSuffix(" MB")
+        self.async_open_spinbox.setSpecialValueText("Disabled")
+        self.async_open_spinbox.setToolTip("Files at least this large are read in the background and "
+                                           "loaded into the editor in chunks, keeping the window responsive.")
+        perf_layout.addRow("Open In Background From:", self.async_open_spinbox)
+        self.large_file_viewer_spinbox = QSpinBox()
+        self.large_file_viewer_spinbox.setRange(0, 1_000_000)
+        self.large_file_viewer_spinbox.setSingleStep(50)
+        self.large_file_viewer_spinbox.setSuffix(" MB")
+        self.large_file_viewer_spinbox.setSpecialValueText("Disabled")
+        self.large_file_viewer_spinbox.setToolTip("Files at least this large open in a read-only viewer that "
+                                                  "reads lines from disk instead of loading the whole file.")
+        perf_layout.addRow("Read-Only Viewer From:", self.large_file_viewer_spinbox)
+        self.poll_interval_spinbox = QSpinBox()
+        self.poll_interval_spinbox.setRange(1, 600)
+        self.poll_interval_spinbox.setSuffix(" s")
+        self.poll_interval_spinbox.setToolTip("How often projects are checked for changes made outside the editor "
+                                              "where the system cannot report them (non-Linux, or too many folders).")
+        perf_layout.addRow("Poll For File Changes Every:", self.poll_interval_spinbox)
         layout.addStretch()
         self.tab_widget.addTab(tab, qta.icon('fa5s.edit'), "Editor")
 
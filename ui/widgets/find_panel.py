@@ -1,4 +1,5 @@
 # /ui/widgets/find_panel.py
+import re
 from typing import Optional, TYPE_CHECKING
 from PyQt6.QtWidgets import (QWidget, QHBoxLayout, QVBoxLayout, QLineEdit,
                              QPushButton, QCheckBox, QToolButton, QFrame)
@@ -84,8 +85,11 @@ class FindPanel(QFrame):
         options_layout.setContentsMargins(25, 0, 0, 0)
         self.case_checkbox = QCheckBox("Case Sensitive")
         self.whole_word_checkbox = QCheckBox("Whole Word")
+        self.regex_checkbox = QCheckBox("Regex")
+        self.regex_checkbox.setToolTip("Python regular expressions; the replacement can use \\1 or \\g<name>.")
         options_layout.addWidget(self.case_checkbox)
         options_layout.addWidget(self.whole_word_checkbox)
+        options_layout.addWidget(self.regex_checkbox)
         options_layout.addStretch()
         expandable_layout.addLayout(options_layout)
 
@@ -158,6 +162,8 @@ class FindPanel(QFrame):
             settings_manager.get("search_case_sensitive", False))
         self.whole_word_checkbox.setChecked(
             settings_manager.get("search_whole_word", False))
+        self.regex_checkbox.setChecked(
+            settings_manager.get("search_regex", False))
 
     def save_settings(self):
         # Saves user preferences for search options.
@@ -165,6 +171,8 @@ class FindPanel(QFrame):
             "search_case_sensitive", self.case_checkbox.isChecked())
         settings_manager.set(
             "search_whole_word", self.whole_word_checkbox.isChecked())
+        settings_manager.set(
+            "search_regex", self.regex_checkbox.isChecked())
 
     def _update_button_states(self):
         # Disables buttons if there's no text to find.
@@ -191,7 +199,14 @@ class FindPanel(QFrame):
         flags = self._get_find_flags()
         if backwards:
             flags |= QTextDocument.FindFlag.FindBackward
-        if not self.editor.find_next(query, flags):
+        try:
+            found = self.editor.find_next(
+                query, flags, regex=self.regex_checkbox.isChecked())
+        except re.error as e:
+            self.status_message_requested.emit(
+                f"Invalid regular expression: {e}", 3000)
+            return
+        if not found:
             self.status_message_requested.emit(
                 f"No more occurrences of '{query}' found.", 2000)
         self.save_settings()
@@ -203,7 +218,14 @@ class FindPanel(QFrame):
         query = self.find_input.text()
         replace_text = self.replace_input.text()
         flags = self._get_find_flags()
-        if not self.editor.replace_current(query, replace_text, flags):
+        try:
+            replaced = self.editor.replace_current(
+                query, replace_text, flags, regex=self.regex_checkbox.isChecked())
+        except (re.error, IndexError) as e:
+            self.status_message_requested.emit(
+                f"Invalid regular expression or replacement: {e}", 3000)
+            return
+        if not replaced:
             self.status_message_requested.emit(
                 "Nothing selected to replace.", 2000)
         self.save_settings()
@@ -215,7 +237,13 @@ class FindPanel(QFrame):
         query = self.find_input.text()
         replace_text = self.replace_input.text()
         flags = self._get_find_flags()
-        count = self.editor.replace_all(query, replace_text, flags)
+        try:
+            count = self.editor.replace_all(
+                query, replace_text, flags, regex=self.regex_checkbox.isChecked())
+        except (re.error, IndexError) as e:
+            self.status_message_requested.emit(
+                f"Invalid regular expression or replacement: {e}", 3000)
+            return
         self.save_settings()
         self.status_message_requested.emit(
             f"Replaced {count} occurrence(s).", 3000)
\ No newline at end of file
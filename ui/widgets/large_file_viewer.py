@@ -0,0 +1,276 @@
+# PuffinPyEditor/ui/widgets/large_file_viewer.py
+from typing import Optional, Tuple, TYPE_CHECKING
+from PyQt6.QtWidgets import (QWidget, QAbstractScrollArea, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit,
+                             QToolButton, QCheckBox, QFrame, QApplication)
+from PyQt6.QtGui import QPainter, QColor, QFont, QFontMetrics, QKeyEvent, QMouseEvent, QPaintEvent, QKeySequence
+from PyQt6.QtCore import Qt, QRect, QThreadPool, pyqtSignal
+import qtawesome as qta
+
+from app_core.settings_manager import settings_manager
+from app_core.large_file_index import LargeFileIndex, LineIndexWorker
+from utils.logger import log
+
+if TYPE_CHECKING:
+    from app_core.theme_manager import ThemeManager
+
+
+class LargeFileView(QAbstractScrollArea):
+    """
+    Paints only the lines in view, read straight from a LargeFileIndex, with
+    a line number gutter drawn like the editor's. The vertical scrollbar
+    counts lines rather than pixels.
+    """
+    GUTTER_PADDING = 15
+    TEXT_MARGIN = 4
+
+    def __init__(self, index: LargeFileIndex, theme_manager: "ThemeManager", parent: Optional[QWidget] = None):
+        super().__init__(parent)
+        self.index = index
+        self.theme_manager = theme_manager
+        self.current_line = 0
+        self.match: Optional[Tuple[int, int, int]] = None  # (line, column, length) of the last search hit
+        self.tab_width = settings_manager.get("indent_width", 4)
+        self.setFont(QFont(settings_manager.get("font_family"), settings_manager.get("font_size")))
+        self.setFocusPolicy(Qt.FocusPolicy.StrongFocus)
+        self.update_scroll_range()
+
+    def line_height(self) -> int:
+        return QFontMetrics(self.font()).height() or 1
+
+    def visible_line_count(self) -> int:
+        return max(1, self.viewport().height() // self.line_height())
+
+    def first_visible_line(self) -> int:
+        return self.verticalScrollBar().value()
+
+    def gutter_width(self) -> int:
+        if not settings_manager.get("show_line_numbers", True):
+            return 0
+        digits = len(str(max(1, self.index.line_count())))
+        return QFontMetrics(self.font()).horizontalAdvance('9' * digits) + self.GUTTER_PADDING
+
+    def update_scroll_range(self):
+        bar = self.verticalScrollBar()
+        bar.setRange(0, max(0, self.index.line_count() - self.visible_line_count()))
+        bar.setPageStep(self.visible_line_count())
+        self.viewport().update()
+
+    def ensure_line_visible(self, line: int):
+        self.update_scroll_range()  # The index may have grown since the last progress report
+        first, rows = self.first_visible_line(), self.visible_line_count()
+        if not first <= line < first + rows:
+            self.verticalScrollBar().setValue(max(0, line - rows // 3))
+
+    def set_current_line(self, line: int):
+        self.current_line = max(0, min(line, self.index.line_count() - 1))
+        self.ensure_line_visible(self.current_line)
+        self.viewport().update()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.update_scroll_range()
+
+    def paintEvent(self, event: QPaintEvent):
+        painter = QPainter(self.viewport())
+        colors = self.theme_manager.current_theme_data.get('colors', {})
+        metrics, line_height = QFontMetrics(self.font()), self.line_height()
+        width, gutter = self.viewport().width(), self.gutter_width()
+        painter.fillRect(event.rect(), QColor(colors.get('editor.background', '#2f383e')))
+        painter.fillRect(QRect(0, 0, gutter, self.viewport().height()),
+                         QColor(colors.get('editorGutter.background', '#2f383e')))
+        painter.setFont(self.font())
+
+        first = self.first_visible_line()
+        lines = self.index.lines(first, self.visible_line_count() + 1)
+        x_offset = gutter + self.TEXT_MARGIN - self.horizontalScrollBar().value()
+        widest = 0
+        for row, text in enumerate(lines):
+            number, top = first + row, row * line_height
+            text = text.expandtabs(self.tab_width)
+            if number == self.current_line:
+                painter.fillRect(QRect(gutter, top, width - gutter, line_height),
+                                 QColor(colors.get('editor.lineHighlightBackground', '#222436')))
+            if self.match and self.match[0] == number:
+                _line, column, length = self.match
+                raw = self.index.line(number)
+                start_x = metrics.horizontalAdvance(raw[:column].expandtabs(self.tab_width))
+                match_width = metrics.horizontalAdvance(raw[column:column + length].expandtabs(self.tab_width))
+                painter.fillRect(QRect(x_offset + start_x, top, match_width, line_height),
+                                 QColor(colors.get('editor.selectionBackground', '#543a48')))
+            painter.setPen(QColor(colors.get('editor.foreground', '#d3c6aa')))
+            painter.setClipRect(QRect(gutter, 0, width - gutter, self.viewport().height()))
+            painter.drawText(QRect(x_offset, top, width - x_offset + self.horizontalScrollBar().value(), line_height),
+                             Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter, text)
+            painter.setClipping(False)
+            widest = max(widest, metrics.horizontalAdvance(text))
+            if gutter:
+                is_current = number == self.current_line and self.hasFocus()
+                painter.setPen(QColor(colors.get('editorLineNumber.activeForeground', '#d3c6aa') if is_current
+                                      else colors.get('editorLineNumber.foreground', '#5f6c6d')))
+                painter.drawText(QRect(0, top, gutter - 5, line_height),
+                                 Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter, str(number + 1))
+        # Only the visible lines are measured, so the horizontal range follows what is on screen.
+        h_bar = self.horizontalScrollBar()
+        h_bar.setRange(0, max(h_bar.value(), widest + self.TEXT_MARGIN * 2 - (width - gutter)))
+        h_bar.setPageStep(width - gutter)
+
+    def mousePressEvent(self, event: QMouseEvent):
+        if event.button() == Qt.MouseButton.LeftButton:
+            self.set_current_line(self.first_visible_line() + int(event.position().y()) // self.line_height())
+        super().mousePressEvent(event)
+
+    def keyPressEvent(self, event: QKeyEvent):
+        if event.matches(QKeySequence.StandardKey.Copy):
+            QApplication.clipboard().setText(self.index.line(self.current_line))
+            return
+        moves = {Qt.Key.Key_Up: -1, Qt.Key.Key_Down: 1,
+                 Qt.Key.Key_PageUp: -self.visible_line_count(), Qt.Key.Key_PageDown: self.visible_line_count()}
+        if event.key() in moves:
+            self.set_current_line(self.current_line + moves[event.key()])
+        elif event.key() == Qt.Key.Key_Home and event.modifiers() & Qt.KeyboardModifier.ControlModifier:
+            self.set_current_line(0)
+        elif event.key() == Qt.Key.Key_End and event.modifiers() & Qt.KeyboardModifier.ControlModifier:
+            self.set_current_line(self.index.line_count() - 1)
+        else:
+            super().keyPressEvent(event)
+
+
+class LargeFileViewer(QWidget):
+    """
+    A read-only tab for files above the "large_file_viewer_threshold_mb"
+    setting. The file is memory-mapped rather than loaded, its line index is
+    built in the background, and it offers goto-line and search.
+    """
+    cursor_position_display_updated = pyqtSignal(int, int)
+    status_message_requested = pyqtSignal(str, int)
+
+    def __init__(self, filepath: str, theme_manager: "ThemeManager", parent: Optional[QWidget] = None):
+        super().__init__(parent)
+        self.filepath = filepath
+        self.theme_manager = theme_manager
+        # Raises OSError/ValueError for unreadable or unsupported files; the caller reports it.
+        self.index = LargeFileIndex(filepath)
+        self.view = LargeFileView(self.index, theme_manager, self)
+        self._setup_ui()
+        self._connect_signals()
+        self.update_theme()
+
+        self.threadpool = QThreadPool.globalInstance()
+        self.index_worker: Optional[LineIndexWorker] = LineIndexWorker(self.index)
+        self.index_worker.signals.progress.connect(self._on_index_progress)
+        self.index_worker.signals.finished.connect(self._on_index_finished)
+        self.threadpool.start(self.index_worker)
+
+    def _setup_ui(self):
+        self.header = QFrame(self)
+        self.header.setObjectName("LargeFileViewerHeader")
+        header_layout = QHBoxLayout(self.header)
+        header_layout.setContentsMargins(5, 3, 5, 3)
+        self.info_label = QLabel()
+        header_layout.addWidget(self.info_label, 1)
+        self.goto_input = QLineEdit(placeholderText="Go to line", maximumWidth=110)
+        header_layout.addWidget(self.goto_input)
+        self.find_input = QLineEdit(placeholderText="Find", maximumWidth=220)
+        header_layout.addWidget(self.find_input)
+        self.find_prev_button = QToolButton(autoRaise=True, toolTip="Find Previous")
+        self.find_prev_button.setProperty("icon_name", 'mdi.arrow-up')
+        self.find_next_button = QToolButton(autoRaise=True, toolTip="Find Next")
+        self.find_next_button.setProperty("icon_name", 'mdi.arrow-down')
+        self.case_checkbox = QCheckBox("Case Sensitive")
+        self.case_checkbox.setChecked(settings_manager.get("search_case_sensitive", False))
+        for widget in (self.find_prev_button, self.find_next_button, self.case_checkbox):
+            header_layout.addWidget(widget)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(0)
+        layout.addWidget(self.header)
+        layout.addWidget(self.view, 1)
+        self._update_info_label()
+
+    def _connect_signals(self):
+        self.goto_input.returnPressed.connect(self._on_goto_requested)
+        self.find_input.returnPressed.connect(lambda: self.find(backwards=False))
+        self.find_next_button.clicked.connect(lambda: self.find(backwards=False))
+        self.find_prev_button.clicked.connect(lambda: self.find(backwards=True))
+        self.view.verticalScrollBar().valueChanged.connect(self._emit_cursor_position)
+
+    def update_theme(self):
+        colors = self.theme_manager.current_theme_data.get('colors', {})
+        self.header.setStyleSheet(
+            f"#LargeFileViewerHeader {{ background-color: {colors.get('sidebar.background', '#333')}; "
+            f"border-bottom: 1px solid {colors.get('input.border')}; }}")
+        for button in (self.find_prev_button, self.find_next_button):
+            button.setIcon(qta.icon(button.property("icon_name")))
+        self.view.viewport().update()
+
+    def _update_info_label(self, indexed_bytes: Optional[int] = None):
+        size_mb = self.index.size / (1024 * 1024)
+        if self.index.is_complete:
+            lines = f"{self.index.line_count():,} lines"
+        else:
+            percent = (indexed_bytes or 0) * 100 // max(1, self.index.size)
+            lines = f"indexing lines... {percent}%"
+        self.info_label.setText(f"Read-only large file view  |  {size_mb:,.1f} MB  |  {self.index.encoding}  |  {lines}")
+
+    def _on_index_progress(self, indexed_bytes: int):
+        self.view.update_scroll_range()
+        self._update_info_label(indexed_bytes)
+
+    def _on_index_finished(self, line_count: int):
+        self.index_worker = None
+        if line_count < 0:
+            self.status_message_requested.emit("Indexing of the large file was stopped.", 3000)
+        self.view.update_scroll_range()
+        self._update_info_label()
+
+    def _emit_cursor_position(self, *_):
+        self.cursor_position_display_updated.emit(self.view.current_line + 1, 0)
+
+    def _on_goto_requested(self):
+        text = self.goto_input.text().strip()
+        if text.isdigit():
+            self.goto_line_and_column(int(text), 0)
+        else:
+            self.status_message_requested.emit("Enter a line number.", 2000)
+
+    def goto_line_and_column(self, line: int, col: int):
+        """Moves to a 1-based line, matching EditorWidget.goto_line_and_column."""
+        if line > self.index.line_count() and not self.index.is_complete:
+            self.status_message_requested.emit(f"Line {line} has not been indexed yet.", 3000)
+            return
+        self.view.set_current_line(line - 1)
+        self.view.setFocus()
+        self._emit_cursor_position()
+
+    def find(self, backwards: bool = False):
+        text = self.find_input.text()
+        if not text:
+            return
+        start = (self.view.current_line, 0)
+        if self.view.match and self.view.match[0] == self.view.current_line:
+            line, column, length = self.view.match
+            start = (line, column) if backwards else (line, column + length)
+        QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
+        try:
+            found = self.index.find(text, start, self.case_checkbox.isChecked(), backwards)
+        finally:
+            QApplication.restoreOverrideCursor()
+        if found is None:
+            searched = "" if self.index.is_complete else " in the lines indexed so far"
+            self.status_message_requested.emit(f"'{text}' not found{searched}.", 2000)
+            return
+        self.view.match = found
+        self.view.set_current_line(found[0])
+        self._emit_cursor_position()
+
+    def close_file(self):
+        """Stops indexing and releases the file mapping."""
+        if (worker := self.index_worker) is not None:
+            # A running worker still holds the mapping and closes the index itself once it stops.
+            self.index_worker = None
+            worker.cancel()
+            if not worker.is_done:
+                return
+        self.index.close()
+        log.info(f"Closed large file view of {self.filepath}")
@@ -1,95 +1,442 @@
 # PuffinPyEditor/ui/widgets/problems_panel.py
 import os
-from typing import Dict, List, Optional
-from PyQt6.QtWidgets import QTreeWidget, QTreeWidgetItem, QHeaderView, QWidget
-from PyQt6.QtCore import pyqtSignal, Qt
+from array import array
+from bisect import bisect_left
+from itertools import count
+from typing import Any, Dict, List, Optional
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QTreeView, QHeaderView, QLineEdit,
+                             QComboBox, QLabel)
+from PyQt6.QtCore import pyqtSignal, Qt, QAbstractItemModel, QModelIndex, QTimer
 from utils.logger import log
 
+SEVERITIES = ("Error", "Warning", "Info")
 
-class ProblemsPanel(QTreeWidget):
+
+def severity_of(code: str) -> str:
+    """Syntax errors (E9) and pyflakes findings (F) are errors; other pycodestyle/mccabe codes are warnings."""
+    if code.startswith(("E9", "F")):
+        return "Error"
+    if code.startswith(("E", "W", "C")):
+        return "Warning"
+    return "Info"
+
+
+class _FileProblems:
+    """One file's problems, stored column-wise in arrays rather than as an object per problem."""
+    __slots__ = ('uid', 'filepath', 'name', 'lines', 'cols', 'codes', 'descriptions', 'order', 'loaded', 'row')
+
+    def __init__(self, uid: int, filepath: str, lines: array, cols: array, codes: array, descriptions: List[str]):
+        self.uid, self.filepath, self.name = uid, filepath, os.path.basename(filepath)
+        self.lines, self.cols, self.codes, self.descriptions = lines, cols, codes, descriptions
+        self.order = array('I')  # Indices of the problems passing the filter, in sort order
+        self.loaded = 0  # How many of them the view has fetched as child rows
+        self.row = -1  # Top-level row, or -1 while filtered out
+
+    def same_problems(self, other: '_FileProblems') -> bool:
+        return (self.lines == other.lines and self.cols == other.cols and self.codes == other.codes
+                and self.descriptions == other.descriptions)
+
+
+class ProblemsModel(QAbstractItemModel):
+    """
+    Problems grouped by file: top-level rows are files, their children the
+    problems. Nothing is stored per row; indexes are made on demand from
+    the arrays in _FileProblems, and children are fetched in batches of
+    FETCH_BATCH as the view scrolls to them. Filtering and sorting work
+    on those arrays too.
+    """
+    HEADERS = ("Description", "File", "Line", "Code")
+    FETCH_BATCH = 500
+    BULK_RESET_FILES = 32
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._files: Dict[str, _FileProblems] = {}
+        self._by_uid: Dict[int, _FileProblems] = {}
+        self._rows: List[_FileProblems] = []
+        self._uids = count(1)
+        self._codes: List[str] = []
+        self._code_ids: Dict[str, int] = {}
+        self._code_severity: List[str] = []
+        self._filter_text = ""
+        self._severity: Optional[str] = None
+        self._sort_column = 1
+        self._sort_order = Qt.SortOrder.AscendingOrder
+
+    # --- Data updates ---
+
+    def set_file_problems(self, filepath: str, problems: List[Dict]):
+        """Adds, replaces or removes one file's problems; an empty list removes it."""
+        old = self._files.get(filepath)
+        new = self._make_entry(filepath, problems) if problems else None
+        if old is not None and new is not None and old.same_problems(new):
+            return
+        if old is not None:
+            del self._files[filepath]
+            self._remove_row(old)
+            # Only now: until endRemoveRows() the view still maps the old problem rows to their file through parent().
+            del self._by_uid[old.uid]
+        if new is not None:
+            self._files[filepath], self._by_uid[new.uid] = new, new
+            self._refilter(new)
+            self._insert_row(new)
+
+    def set_many_file_problems(self, problems_by_file: Dict[str, List[Dict]]):
+        """
+        Like set_file_problems for each file, but a large batch resets the
+        model once instead of moving rows one at a time.
+        """
+        if len(problems_by_file) <= self.BULK_RESET_FILES:
+            for filepath, problems in problems_by_file.items():
+                self.set_file_problems(filepath, problems)
+            return
+        self.beginResetModel()
+        replaced = []
+        for filepath, problems in problems_by_file.items():
+            if (old := self._files.pop(filepath, None)) is not None:
+                replaced.append(old.uid)
+            if problems:
+                new = self._files[filepath] = self._make_entry(filepath, problems)
+                self._by_uid[new.uid] = new
+                self._refilter(new)
+        self._rebuild_rows()
+        self.endResetModel()
+        for uid in replaced:
+            del self._by_uid[uid]
+
+    def clear(self):
+        self.beginResetModel()
+        self._files.clear()
+        self._by_uid.clear()
+        self._rows = []
+        self.endResetModel()
+
+    def file_count(self) -> int:
+        return len(self._files)
+
+    def filepaths(self) -> List[str]:
+        return list(self._files)
+
+    def problem_count(self) -> int:
+        return sum(len(entry.lines) for entry in self._files.values())
+
+    def visible_problem_count(self) -> int:
+        return sum(len(entry.order) for entry in self._rows)
+
+    def _make_entry(self, filepath: str, problems: List[Dict]) -> _FileProblems:
+        lines, cols, codes, descriptions = array('I'), array('I'), array('H'), []
+        for problem in problems:
+            lines.append(max(0, int(problem.get("line") or 0)))
+            cols.append(max(0, int(problem.get("col") or 0)))
+            codes.append(self._code_id(problem.get("code", "")))
+            descriptions.append(problem.get("description", ""))
+        return _FileProblems(next(self._uids), filepath, lines, cols, codes, descriptions)
+
+    def _code_id(self, code: str) -> int:
+        if (code_id := self._code_ids.get(code)) is None:
+            code_id = self._code_ids[code] = len(self._codes)
+            self._codes.append(code)
+            self._code_severity.append(severity_of(code))
+        return code_id
+
+    # --- Filtering and sorting ---
+
+    def set_filter(self, text: str, severity: Optional[str]):
+        """Shows problems whose code starts with text, or whose file or description contains it."""
+        self.beginResetModel()
+        self._filter_text, self._severity = text.strip().lower(), severity
+        for entry in self._files.values():
+            self._refilter(entry)
+        self._rebuild_rows()
+        self.endResetModel()
+
+    def sort(self, column: int, order: Qt.SortOrder = Qt.SortOrder.AscendingOrder):
+        self.beginResetModel()
+        self._sort_column, self._sort_order = column, order
+        for entry in self._files.values():
+            self._refilter(entry)
+        self._rebuild_rows()
+        self.endResetModel()
+
+    def _refilter(self, entry: _FileProblems):
+        codes, severity_of_code = entry.codes, self._code_severity
+        indices = range(len(entry.lines))
+        if self._severity:
+            indices = [i for i in indices if severity_of_code[codes[i]] == self._severity]
+        if text := self._filter_text:
+            if text not in entry.name.lower():
+                lowered = [code.lower() for code in self._codes]
+                descriptions = entry.descriptions
+                indices = [i for i in indices
+                           if lowered[codes[i]].startswith(text) or text in descriptions[i].lower()]
+        key = {0: entry.descriptions.__getitem__,
+               3: lambda i: (self._codes[codes[i]], entry.lines[i])}.get(self._sort_column, entry.lines.__getitem__)
+        reverse = self._sort_order == Qt.SortOrder.DescendingOrder and self._sort_column != 1
+        entry.order = array('I', sorted(indices, key=key, reverse=reverse))
+        entry.loaded = 0
+
+    def _file_key(self, entry: _FileProblems):
+        return entry.name.lower(), entry.filepath
+
+    def _rebuild_rows(self):
+        self._rows = sorted((entry for entry in self._files.values() if entry.order), key=self._file_key,
+                            reverse=self._sort_column == 1 and self._sort_order == Qt.SortOrder.DescendingOrder)
+        for entry in self._files.values():
+            entry.row = -1
+        for row, entry in enumerate(self._rows):
+            entry.row = row
+
+    def _insert_row(self, entry: _FileProblems):
+        if not entry.order:
+            return
+        keys = [self._file_key(existing) for existing in self._rows]
+        descending = self._sort_column == 1 and self._sort_order == Qt.SortOrder.DescendingOrder
+        if descending:
+            keys.reverse()
+            row = len(keys) - bisect_left(keys, self._file_key(entry))
+        else:
+            row = bisect_left(keys, self._file_key(entry))
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._rows.insert(row, entry)
+        for index in range(row, len(self._rows)):
+            self._rows[index].row = index
+        self.endInsertRows()
+
+    def _remove_row(self, entry: _FileProblems):
+        if (row := entry.row) < 0:
+            return
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._rows[row]
+        entry.row = -1
+        for index in range(row, len(self._rows)):
+            self._rows[index].row = index
+        self.endRemoveRows()
+
+    # --- QAbstractItemModel ---
+
+    def index(self, row: int, column: int, parent: QModelIndex = QModelIndex()) -> QModelIndex:
+        if not parent.isValid():
+            return self.createIndex(row, column, 0) if 0 <= row < len(self._rows) else QModelIndex()
+        if parent.internalId() == 0 and 0 <= parent.row() < len(self._rows):
+            entry = self._rows[parent.row()]
+            if 0 <= row < entry.loaded:
+                return self.createIndex(row, column, entry.uid)
+        return QModelIndex()
+
+    def parent(self, index: QModelIndex = QModelIndex()) -> QModelIndex:
+        if not index.isValid() or index.internalId() == 0:
+            return QModelIndex()
+        entry = self._by_uid.get(index.internalId())
+        return self.createIndex(entry.row, 0, 0) if entry and entry.row >= 0 else QModelIndex()
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        if not parent.isValid():
+            return len(self._rows)
+        if parent.internalId() == 0 and parent.column() == 0:
+            return self._rows[parent.row()].loaded
+        return 0
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return len(self.HEADERS)
+
+    def hasChildren(self, parent: QModelIndex = QModelIndex()) -> bool:
+        if not parent.isValid():
+            return bool(self._rows)
+        return parent.internalId() == 0 and parent.column() == 0 and bool(self._rows[parent.row()].order)
+
+    def canFetchMore(self, parent: QModelIndex) -> bool:
+        if not parent.isValid() or parent.internalId() != 0 or parent.column() != 0:
+            return False
+        entry = self._rows[parent.row()]
+        return entry.loaded < len(entry.order)
+
+    def fetchMore(self, parent: QModelIndex):
+        if not self.canFetchMore(parent):
+            return
+        entry = self._rows[parent.row()]
+        count_to_add = min(self.FETCH_BATCH, len(entry.order) - entry.loaded)
+        if count_to_add <= 0:
+            return
+        self.beginInsertRows(parent, entry.loaded, entry.loaded + count_to_add - 1)
+        entry.loaded += count_to_add
+        self.endInsertRows()
+
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if not index.isValid():
+            return None
+        if index.internalId() == 0:
+            entry = self._rows[index.row()]
+            if role == Qt.ItemDataRole.DisplayRole and index.column() == 0:
+                return f"{entry.name} ({len(entry.order)} issues)"
+            if role == Qt.ItemDataRole.ToolTipRole:
+                return entry.filepath
+            if role == Qt.ItemDataRole.UserRole:
+                return {'is_file_node': True}
+            return None
+        entry = self._by_uid[index.internalId()]
+        i = entry.order[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            column = index.column()
+            if column == 0:
+                return entry.descriptions[i]
+            if column == 1:
+                return entry.name
+            if column == 2:
+                return str(entry.lines[i])
+            return self._codes[entry.codes[i]]
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return f"{self._code_severity[entry.codes[i]]}: {entry.descriptions[i]}"
+        if role == Qt.ItemDataRole.UserRole:
+            return {'filepath': entry.filepath, 'line': entry.lines[i], 'col': entry.cols[i]}
+        return None
+
+
+class ProblemsPanel(QWidget):
     """
     A widget that displays linting problems in a hierarchical tree view,
-    grouped by file.
+    grouped by file, with a filter bar. Results are applied per file, so
+    streaming in a project lint or re-linting one file only touches that
+    file's row, and the view only ever creates the rows it shows.
     """
     problem_selected = pyqtSignal(str, int, int)
+    AUTO_EXPAND_LIMIT = 2000
 
     def __init__(self, parent: Optional[QWidget] = None):
         super().__init__(parent)
         log.info("ProblemsPanel initializing...")
 
-        self.setColumnCount(4)
-        self.setHeaderLabels(["Description", "File", "Line", "Code"])
-        self.setSelectionBehavior(QTreeWidget.SelectionBehavior.SelectRows)
-        self.setSelectionMode(QTreeWidget.SelectionMode.SingleSelection)
-        self.setEditTriggers(QTreeWidget.EditTrigger.NoEditTriggers)
-        self.setAlternatingRowColors(True)
-        self.setIndentation(12)
-        self.setSortingEnabled(True)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(2)
+
+        filter_layout = QHBoxLayout()
+        filter_layout.setContentsMargins(4, 2, 4, 0)
+        self.filter_input = QLineEdit()
+        self.filter_input.setPlaceholderText("Filter by code, file or text")
+        self.filter_input.setClearButtonEnabled(True)
+        self.severity_combo = QComboBox()
+        self.severity_combo.addItem("All Severities", None)
+        for severity in SEVERITIES:
+            self.severity_combo.addItem(f"{severity}s", severity)
+        self.summary_label = QLabel()
+        filter_layout.addWidget(self.filter_input, 1)
+        filter_layout.addWidget(self.severity_combo)
+        filter_layout.addWidget(self.summary_label)
+        layout.addLayout(filter_layout)
+
+        self.model = ProblemsModel(self)
+        self.view = QTreeView()
+        self.view.setModel(self.model)
+        self.view.setUniformRowHeights(True)
+        self.view.setSelectionBehavior(QTreeView.SelectionBehavior.SelectRows)
+        self.view.setSelectionMode(QTreeView.SelectionMode.SingleSelection)
+        self.view.setEditTriggers(QTreeView.EditTrigger.NoEditTriggers)
+        self.view.setAlternatingRowColors(True)
+        self.view.setIndentation(12)
+        self.view.setSortingEnabled(True)
+        self.view.sortByColumn(1, Qt.SortOrder.AscendingOrder)
+        layout.addWidget(self.view)
+
+        self.info_label = QLabel()
+        self.info_label.setContentsMargins(6, 4, 6, 4)
+        self.info_label.setEnabled(False)
+        self.info_label.hide()
+        layout.addWidget(self.info_label)
 
-        header = self.header()
+        header = self.view.header()
         header.setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
-        header.setSectionResizeMode(1, QHeaderView.ResizeMode.ResizeToContents)
-        header.setSectionResizeMode(2, QHeaderView.ResizeMode.ResizeToContents)
-        header.setSectionResizeMode(3, QHeaderView.ResizeMode.ResizeToContents)
+        for column in (1, 2, 3):
+            # ResizeToContents would measure every row; these columns are short anyway.
+            header.setSectionResizeMode(column, QHeaderView.ResizeMode.Interactive)
+            header.resizeSection(column, 110 if column == 1 else 60)
 
-        self.itemDoubleClicked.connect(self._on_item_double_clicked)
-        log.info("ProblemsPanel initialized as QTreeWidget.")
+        # Typing in the filter refilters once the user pauses.
+        self._filter_timer = QTimer(self)
+        self._filter_timer.setSingleShot(True)
+        self._filter_timer.setInterval(200)
+        self._filter_timer.timeout.connect(self._apply_filter)
+        self.filter_input.textChanged.connect(self._filter_timer.start)
+        self.severity_combo.currentIndexChanged.connect(self._apply_filter)
+
+        self.model.modelReset.connect(self._expand_and_span_all)
+        self.model.rowsInserted.connect(self._on_rows_inserted)
+        self.view.doubleClicked.connect(self._on_item_double_clicked)
+        log.info("ProblemsPanel initialized with a model/view tree.")
 
     def update_problems(self, problems_by_file: Dict[str, List[Dict]]):
         """
-        Clears and repopulates the tree with a new set of problems.
+        Replaces the panel's contents with a new set of problems. Only the
+        files whose problems changed are touched.
         """
-        self.clear()
-        self.setSortingEnabled(False)
+        gone = {filepath: [] for filepath in self.model.filepaths() if filepath not in problems_by_file}
+        self.apply_file_results({**gone, **problems_by_file})
 
-        if not problems_by_file:
+    def apply_file_results(self, problems_by_file: Dict[str, List[Dict]]):
+        """
+        Adds, replaces or removes each given file's problems, leaving all
+        other files alone. An empty list means the file has no problems.
+        """
+        self.model.set_many_file_problems(problems_by_file)
+        if not self.model.file_count():
             self.show_info_message("No problems found.")
-            return
-
-        for filepath, problems in problems_by_file.items():
-            if not problems:
-                continue
-
-            file_node = QTreeWidgetItem(self)
-            file_node.setText(
-                0, f"{os.path.basename(filepath)} ({len(problems)} issues)")
-            file_node.setData(
-                0, Qt.ItemDataRole.UserRole, {'is_file_node': True})
-            file_node.setFirstColumnSpanned(True)
-
-            for problem in problems:
-                problem_node = QTreeWidgetItem(file_node)
-                problem_node.setText(0, problem.get("description", ""))
-                problem_node.setText(1, os.path.basename(filepath))
-                problem_node.setText(2, str(problem.get("line", "")))
-                problem_node.setText(3, problem.get("code", ""))
-                problem_node.setData(0, Qt.ItemDataRole.UserRole, {
-                    'filepath': filepath,
-                    'line': problem.get("line"),
-                    'col': problem.get("col")
-                })
-        self.expandAll()
-        self.setSortingEnabled(True)
-        self.sortByColumn(1, Qt.SortOrder.AscendingOrder)
+        else:
+            self._show_tree()
+        self._update_summary()
 
     def clear_problems(self):
         """Clears all items from the panel."""
-        self.clear()
+        self.model.clear()
+        self._update_summary()
 
     def show_info_message(self, message: str):
         """Displays a single, un-clickable informational message."""
-        self.clear()
-        info_item = QTreeWidgetItem(self, [message])
-        info_item.setFirstColumnSpanned(True)
-        info_item.setDisabled(True)
+        self.model.clear()
+        self.info_label.setText(message)
+        self.view.hide()
+        self.info_label.show()
+        self._update_summary()
+
+    def _show_tree(self):
+        if self.info_label.isVisible():
+            self.info_label.hide()
+            self.view.show()
+
+    def _apply_filter(self):
+        self.model.set_filter(self.filter_input.text(), self.severity_combo.currentData())
+        self._update_summary()
+
+    def _update_summary(self):
+        total, shown = self.model.problem_count(), self.model.visible_problem_count()
+        self.summary_label.setText(f"{shown} of {total}" if shown != total else f"{total} problems")
+
+    def _expand_and_span_all(self):
+        for row in range(self.model.rowCount()):
+            self.view.setFirstColumnSpanned(row, QModelIndex(), True)
+        # Expanding fetches every child row, so large result sets start collapsed.
+        if self.model.visible_problem_count() <= self.AUTO_EXPAND_LIMIT:
+            self.view.expandAll()
+
+    def _on_rows_inserted(self, parent: QModelIndex, first: int, last: int):
+        if parent.isValid():
+            return
+        expand = self.model.visible_problem_count() <= self.AUTO_EXPAND_LIMIT
+        for row in range(first, last + 1):
+            self.view.setFirstColumnSpanned(row, QModelIndex(), True)
+            if expand:
+                self.view.expand(self.model.index(row, 0))
 
-    def _on_item_double_clicked(self, item: QTreeWidgetItem, column: int):
+    def _on_item_double_clicked(self, index: QModelIndex):
         """Emits a signal when a specific problem item is double-clicked."""
-        problem_data = item.data(0, Qt.ItemDataRole.UserRole)
+        problem_data = index.data(Qt.ItemDataRole.UserRole)
         if problem_data and not problem_data.get('is_file_node', False):
             filepath = problem_data.get("filepath")
             line = problem_data.get("line")
             col = problem_data.get("col")
             if filepath and line is not None:
                 log.debug(f"Problem selected: Go to {filepath}:{line}:{col}")
-                self.problem_selected.emit(filepath, line, col)
\ No newline at end of file
+                self.problem_selected.emit(filepath, line, col)
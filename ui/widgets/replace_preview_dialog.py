@@ -0,0 +1,194 @@
+# PuffinPyEditor/ui/widgets/replace_preview_dialog.py
+from typing import Callable, Dict, List, Optional, TYPE_CHECKING
+from PyQt6.QtWidgets import QDialog, QVBoxLayout, QLabel, QTreeView, QDialogButtonBox, QWidget
+from PyQt6.QtGui import QColor, QFontDatabase
+from PyQt6.QtCore import Qt, QAbstractItemModel, QModelIndex
+import qtawesome as qta
+
+from app_core.project_replace import FileReplacement
+
+if TYPE_CHECKING:
+    from app_core.search_manager import ProjectSearchManager
+
+DIFF_COLORS = {'+': QColor("#a7c080"), '-': QColor("#e67e80"), '@': QColor("#83c092")}
+FILE_ROW = 0  # internalId of file rows; a diff line's is its file's row + 1
+
+
+class ReplacePreviewModel(QAbstractItemModel):
+    """
+    The changed files, checkable, with the lines of their diffs as children.
+    A diff is only split into lines once its file is expanded, and the view
+    only creates the rows on screen, so previews of thousands of files and
+    long diffs stay cheap.
+    """
+
+    def __init__(self, display_path: Callable[[str], str], parent: Optional[QWidget] = None):
+        super().__init__(parent)
+        self.display_path = display_path
+        self.changes: List[FileReplacement] = []
+        self._checked: List[bool] = []
+        self._lines: Dict[int, List[str]] = {}
+        self._file_icon, self._buffer_icon = qta.icon('mdi.file-outline'), qta.icon('mdi.file-edit-outline')
+        self._mono_font = QFontDatabase.systemFont(QFontDatabase.SystemFont.FixedFont)
+
+    def add_changes(self, changes: List[FileReplacement]):
+        first = len(self.changes)
+        self.beginInsertRows(QModelIndex(), first, first + len(changes) - 1)
+        self.changes.extend(changes)
+        self._checked.extend([True] * len(changes))
+        self.endInsertRows()
+
+    def checked_changes(self) -> List[FileReplacement]:
+        return [change for change, checked in zip(self.changes, self._checked) if checked]
+
+    def has_checked(self) -> bool:
+        return any(self._checked)
+
+    def set_all_checked(self, checked: bool):
+        if self.changes:
+            self._checked = [checked] * len(self.changes)
+            self.dataChanged.emit(self.index(0, 0), self.index(len(self.changes) - 1, 0),
+                                  [Qt.ItemDataRole.CheckStateRole])
+
+    def _diff_lines(self, row: int) -> List[str]:
+        if row not in self._lines:
+            # The ---/+++ header repeats the file row; hunks start at the first @@.
+            lines = self.changes[row][4].splitlines()
+            self._lines[row] = [line.rstrip('\r') for line in lines[2:]]
+        return self._lines[row]
+
+    def index(self, row: int, column: int, parent: QModelIndex = QModelIndex()) -> QModelIndex:
+        if not self.hasIndex(row, column, parent):
+            return QModelIndex()
+        return self.createIndex(row, column, parent.row() + 1 if parent.isValid() else FILE_ROW)
+
+    def parent(self, index: QModelIndex) -> QModelIndex:
+        if not index.isValid() or index.internalId() == FILE_ROW:
+            return QModelIndex()
+        return self.createIndex(index.internalId() - 1, 0, FILE_ROW)
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        if not parent.isValid():
+            return len(self.changes)
+        return len(self._diff_lines(parent.row())) if parent.internalId() == FILE_ROW else 0
+
+    def hasChildren(self, parent: QModelIndex = QModelIndex()) -> bool:
+        return not parent.isValid() or parent.internalId() == FILE_ROW
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 1
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        if index.internalId() != FILE_ROW:
+            line = self._diff_lines(index.internalId() - 1)[index.row()]
+            if role == Qt.ItemDataRole.DisplayRole:
+                return line
+            if role == Qt.ItemDataRole.ForegroundRole:
+                return DIFF_COLORS.get(line[:1])
+            if role == Qt.ItemDataRole.FontRole:
+                return self._mono_font
+            return None
+        path, _, stat, count, _, _ = self.changes[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            unsaved = "  [unsaved editor]" if stat is None else ""
+            return f"{self.display_path(path)}  ({count}){unsaved}"
+        if role == Qt.ItemDataRole.CheckStateRole:
+            return Qt.CheckState.Checked if self._checked[index.row()] else Qt.CheckState.Unchecked
+        if role == Qt.ItemDataRole.DecorationRole:
+            return self._file_icon if stat is not None else self._buffer_icon
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return path if stat is not None else f"{path}\nReplaced in the open editor, which has unsaved edits"
+        return None
+
+    def setData(self, index: QModelIndex, value, role: int = Qt.ItemDataRole.EditRole) -> bool:
+        if role != Qt.ItemDataRole.CheckStateRole or not index.isValid() or index.internalId() != FILE_ROW:
+            return False
+        self._checked[index.row()] = Qt.CheckState(value) == Qt.CheckState.Checked
+        self.dataChanged.emit(index, index, [Qt.ItemDataRole.CheckStateRole])
+        return True
+
+    def flags(self, index: QModelIndex) -> Qt.ItemFlag:
+        if not index.isValid():
+            return Qt.ItemFlag.NoItemFlags
+        flags = Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
+        return flags | Qt.ItemFlag.ItemIsUserCheckable if index.internalId() == FILE_ROW else flags
+
+
+class ReplacePreviewDialog(QDialog):
+    """
+    "Replace in Project" preview: the diff of every file a replacement
+    changes, grouped by file, filled in as the search manager streams them.
+    Files can be left out by unchecking them; accepting the dialog hands the
+    checked changes to the caller, which applies them.
+    """
+
+    def __init__(self, search_manager: 'ProjectSearchManager', request_id: int, description: str,
+                 display_path: Callable[[str], str], parent: Optional[QWidget] = None):
+        super().__init__(parent)
+        self.search_manager = search_manager
+        self.request_id = request_id
+        self._finished = False
+        self.setWindowTitle("Replace in Project")
+        self.resize(900, 600)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(6, 6, 6, 6)
+        self.description_label = QLabel(description)
+        self.description_label.setTextFormat(Qt.TextFormat.PlainText)
+        layout.addWidget(self.description_label)
+        self.model = ReplacePreviewModel(display_path, self)
+        self.view = QTreeView()
+        self.view.setModel(self.model)
+        self.view.setHeaderHidden(True)
+        self.view.setUniformRowHeights(True)
+        self.view.setIndentation(12)
+        layout.addWidget(self.view)
+        self.summary_label = QLabel("Finding matches...")
+        layout.addWidget(self.summary_label)
+        self.button_box = QDialogButtonBox(QDialogButtonBox.StandardButton.Cancel)
+        self.replace_button = self.button_box.addButton("Replace", QDialogButtonBox.ButtonRole.AcceptRole)
+        self.replace_button.setEnabled(False)
+        self.select_all_button = self.button_box.addButton("Select All", QDialogButtonBox.ButtonRole.ActionRole)
+        self.select_none_button = self.button_box.addButton("Select None", QDialogButtonBox.ButtonRole.ActionRole)
+        layout.addWidget(self.button_box)
+        self.button_box.accepted.connect(self.accept)
+        self.button_box.rejected.connect(self.reject)
+        self.select_all_button.clicked.connect(lambda: self.model.set_all_checked(True))
+        self.select_none_button.clicked.connect(lambda: self.model.set_all_checked(False))
+        self.model.dataChanged.connect(self._update_replace_button)
+        self.search_manager.replace_preview_found.connect(self._on_preview_found)
+        self.search_manager.replace_preview_finished.connect(self._on_preview_finished)
+
+    def done(self, result: int):
+        self.search_manager.replace_preview_found.disconnect(self._on_preview_found)
+        self.search_manager.replace_preview_finished.disconnect(self._on_preview_finished)
+        if not self._finished:
+            self.search_manager.cancel_replace_preview()
+        super().done(result)
+
+    def accepted_changes(self) -> List[FileReplacement]:
+        return self.model.checked_changes()
+
+    def _on_preview_found(self, request_id: int, changes: List):
+        if request_id != self.request_id:
+            return
+        self.model.add_changes(changes)
+        if self.model.rowCount() == len(changes):
+            self.view.expand(self.model.index(0, 0))
+        self.summary_label.setText(f"{self.model.rowCount()} files so far...")
+
+    def _on_preview_finished(self, request_id: int, files: int, replacements: int, seconds: float):
+        if request_id != self.request_id:
+            return
+        self._finished = True
+        self.summary_label.setToolTip(f"Previewed in {seconds * 1000:.0f} ms")
+        if not files:
+            self.summary_label.setText("No matches to replace.")
+            return
+        self.summary_label.setText(f"{replacements} replacements in {files} files. "
+                                   "Uncheck the files to leave unchanged.")
+        self._update_replace_button()
+
+    def _update_replace_button(self):
+        self.replace_button.setEnabled(self._finished and self.model.has_checked())
@@ -0,0 +1,173 @@
+# PuffinPyEditor/ui/widgets/search_panel.py
+import os
+import re
+from typing import Dict, List, Optional, TYPE_CHECKING
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLineEdit, QToolButton, QTreeWidget,
+                             QTreeWidgetItem, QLabel)
+from PyQt6.QtCore import Qt, QTimer, pyqtSignal
+import qtawesome as qta
+
+if TYPE_CHECKING:
+    from app_core.search_manager import ProjectSearchManager
+
+MATCH_ROLE = Qt.ItemDataRole.UserRole
+
+
+class SearchPanel(QWidget):
+    """
+    "Search in Project": a query box with case, whole-word and regex toggles
+    over the project search index. Searching starts once typing pauses and
+    results are added per file as the search streams them in. "Replace All"
+    asks for the matches to be replaced with the replace box's text.
+    """
+    match_selected = pyqtSignal(str, int, int)  # path, line (1-based), column (0-based)
+    replace_requested = pyqtSignal(str, str, dict)  # query, replacement, search options
+    AUTO_EXPAND_LIMIT = 2000  # Files start collapsed once this many matches are shown
+
+    def __init__(self, search_manager: 'ProjectSearchManager', parent: Optional[QWidget] = None):
+        super().__init__(parent)
+        self.search_manager = search_manager
+        self._request_id = 0
+        self._match_count = 0
+        self._file_items: Dict[str, QTreeWidgetItem] = {}
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(2)
+        query_layout = QHBoxLayout()
+        query_layout.setContentsMargins(4, 2, 4, 0)
+        self.query_input = QLineEdit()
+        self.query_input.setPlaceholderText("Search in the open projects")
+        self.query_input.setClearButtonEnabled(True)
+        query_layout.addWidget(self.query_input, 1)
+        self.case_button = self._add_toggle(query_layout, 'mdi.format-letter-case', "Match Case")
+        self.word_button = self._add_toggle(query_layout, 'mdi.format-letter-matches', "Whole Word")
+        self.regex_button = self._add_toggle(query_layout, 'mdi.regex', "Regular Expression")
+        self.summary_label = QLabel()
+        query_layout.addWidget(self.summary_label)
+        layout.addLayout(query_layout)
+        replace_layout = QHBoxLayout()
+        replace_layout.setContentsMargins(4, 0, 4, 0)
+        self.replace_input = QLineEdit()
+        self.replace_input.setPlaceholderText("Replace with")
+        self.replace_input.setClearButtonEnabled(True)
+        replace_layout.addWidget(self.replace_input, 1)
+        self.replace_all_button = QToolButton()
+        self.replace_all_button.setIcon(qta.icon('mdi.file-replace-outline'))
+        self.replace_all_button.setToolTip("Replace All in Project...")
+        self.replace_all_button.setAutoRaise(True)
+        self.replace_all_button.setEnabled(False)
+        replace_layout.addWidget(self.replace_all_button)
+        layout.addLayout(replace_layout)
+
+        self.results_tree = QTreeWidget()
+        self.results_tree.setHeaderHidden(True)
+        self.results_tree.setUniformRowHeights(True)
+        self.results_tree.setIndentation(12)
+        layout.addWidget(self.results_tree)
+
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(300)
+        self._search_timer.timeout.connect(self.start_search)
+        self.query_input.textChanged.connect(self._search_timer.start)
+        self.query_input.returnPressed.connect(self.start_search)
+        for button in (self.case_button, self.word_button, self.regex_button):
+            button.toggled.connect(self.start_search)
+        self.query_input.textChanged.connect(lambda text: self.replace_all_button.setEnabled(bool(text)))
+        self.replace_all_button.clicked.connect(self.request_replace)
+        self.replace_input.returnPressed.connect(self.request_replace)
+        self.results_tree.itemActivated.connect(self._on_item_activated)
+        self.search_manager.results_found.connect(self._on_results_found)
+        self.search_manager.search_finished.connect(self._on_search_finished)
+
+    def _add_toggle(self, layout: QHBoxLayout, icon_name: str, tooltip: str) -> QToolButton:
+        button = QToolButton()
+        button.setIcon(qta.icon(icon_name))
+        button.setToolTip(tooltip)
+        button.setCheckable(True)
+        button.setAutoRaise(True)
+        layout.addWidget(button)
+        return button
+
+    def set_query(self, text: str):
+        """Fills in the query box and searches right away."""
+        self.query_input.setText(text)
+        self.query_input.selectAll()
+        self.query_input.setFocus()
+        self.start_search()
+
+    def start_search(self):
+        self._search_timer.stop()
+        self.results_tree.clear()
+        self._file_items.clear()
+        self._match_count = 0
+        query = self.query_input.text()
+        if not query:
+            self.search_manager.cancel_search()
+            self.summary_label.clear()
+            return
+        try:
+            self._request_id = self.search_manager.search(
+                query, regex=self.regex_button.isChecked(), case_sensitive=self.case_button.isChecked(),
+                whole_word=self.word_button.isChecked())
+        except re.error as e:
+            self.search_manager.cancel_search()
+            self.summary_label.setText(f"Invalid pattern: {e}")
+            return
+        self.summary_label.setText("Searching...")
+
+    def request_replace(self):
+        if query := self.query_input.text():
+            self.replace_requested.emit(query, self.replace_input.text(), {
+                'regex': self.regex_button.isChecked(), 'case_sensitive': self.case_button.isChecked(),
+                'whole_word': self.word_button.isChecked()})
+
+    def _on_results_found(self, request_id: int, results: List):
+        if request_id != self._request_id:
+            return
+        self.results_tree.setUpdatesEnabled(False)
+        for path, matches in results:
+            file_item = QTreeWidgetItem([f"{self.display_path(path)}  ({len(matches)})"])
+            file_item.setIcon(0, qta.icon('mdi.file-outline'))
+            file_item.setToolTip(0, path)
+            file_item.setData(0, MATCH_ROLE, (path, 1, 0))
+            children = []
+            for line, col, length, text in matches:
+                child = QTreeWidgetItem([f"{line}:  {text.strip()}"])
+                child.setToolTip(0, text[col:col + length])
+                child.setData(0, MATCH_ROLE, (path, line, col))
+                children.append(child)
+            file_item.addChildren(children)
+            self.results_tree.addTopLevelItem(file_item)
+            self._file_items[path] = file_item
+            self._match_count += len(matches)
+            file_item.setExpanded(self._match_count <= self.AUTO_EXPAND_LIMIT)
+        self.results_tree.setUpdatesEnabled(True)
+        self.summary_label.setText(f"{self._match_count} matches in {len(self._file_items)} files...")
+
+    def _on_search_finished(self, request_id: int, searched: int, matches: int, truncated: bool,
+                            searched_bytes: int, seconds: float):
+        if request_id != self._request_id:
+            return
+        indexing = " (indexing...)" if self.search_manager.is_indexing() else ""
+        megabytes, seconds = searched_bytes / (1024 * 1024), max(seconds, 1e-6)
+        self.summary_label.setToolTip(f"Read {searched} files, {megabytes:.1f} MB in {seconds * 1000:.0f} ms\n"
+                                      f"{megabytes / seconds:.1f} MB/s, {searched / seconds:.0f} files/s")
+        if not matches:
+            self.summary_label.setText(f"No matches in {searched} files{indexing}")
+            return
+        more = "+" if truncated else ""
+        self.summary_label.setText(f"{matches}{more} matches in {len(self._file_items)} files{indexing}")
+
+    def display_path(self, path: str) -> str:
+        for root in self.search_manager.projects():
+            if path.startswith(root + os.sep):
+                return os.path.relpath(path, os.path.dirname(root))
+        return path
+
+    def _on_item_activated(self, item: QTreeWidgetItem, _column: int):
+        if item.childCount() and item.parent() is None:
+            return  # Enter or double-click on a file row expands it
+        if data := item.data(0, MATCH_ROLE):
+            self.match_selected.emit(*data)
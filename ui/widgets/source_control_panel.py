@@ -322,6 +322,14 @@ class ProjectSourceControlPanel(QWidget):
             self.project_tree.clear()
             self.set_ui_locked(False, "No projects open.")
 
+    def on_files_changed(self, change_set):
+        """Refreshes the file lists of git projects with changes on disk."""
+        root = self.project_tree.invisibleRootItem()
+        for i in range(root.childCount()):
+            data = root.child(i).data(0, Qt.ItemDataRole.UserRole)
+            if data and data.get('type') == 'project' and change_set.touches(data['path']):
+                self.git_manager.get_status(data['path'])
+
     def _populate_tree(self, summaries: Dict[str, Dict]):
         self.project_tree.clear()
         git_project_paths = summaries.keys()
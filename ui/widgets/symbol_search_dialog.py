@@ -0,0 +1,90 @@
+# PuffinPyEditor/ui/widgets/symbol_search_dialog.py
+import os
+from typing import List, Optional, TYPE_CHECKING
+from PyQt6.QtWidgets import QDialog, QVBoxLayout, QLineEdit, QListWidget, QListWidgetItem, QLabel, QWidget
+from PyQt6.QtGui import QKeyEvent
+from PyQt6.QtCore import Qt, pyqtSignal
+import qtawesome as qta
+
+from app_core.symbol_index import CLASS, FUNCTION, METHOD, Symbol
+
+if TYPE_CHECKING:
+    from app_core.symbol_index import SymbolIndexManager
+
+KIND_ICONS = {CLASS: 'mdi.alpha-c-box-outline', FUNCTION: 'mdi.function', METHOD: 'mdi.function-variant'}
+
+
+class SymbolSearchDialog(QDialog):
+    """
+    "Go to Symbol in Project": a filter box over the project symbol index.
+    Results update on every keystroke; Enter or a double-click picks one.
+    """
+    symbol_chosen = pyqtSignal(str, int, int)  # path, line (1-based), column (0-based)
+
+    def __init__(self, symbol_index: 'SymbolIndexManager', project_roots: List[str], parent: Optional[QWidget] = None):
+        super().__init__(parent)
+        self.symbol_index = symbol_index
+        self.project_roots = project_roots
+        self._results: List[Symbol] = []
+        self._icons = {kind: qta.icon(name) for kind, name in KIND_ICONS.items()}
+        self._default_icon = qta.icon('mdi.variable')
+        self.setWindowTitle("Go to Symbol in Project")
+        self.resize(640, 420)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(6, 6, 6, 6)
+        self.query_input = QLineEdit()
+        self.query_input.setPlaceholderText("Type a class, function or variable name")
+        self.query_input.installEventFilter(self)
+        self.results_list = QListWidget()
+        self.results_list.setUniformItemSizes(True)
+        self.status_label = QLabel()
+        layout.addWidget(self.query_input)
+        layout.addWidget(self.results_list)
+        layout.addWidget(self.status_label)
+        self.query_input.textChanged.connect(self._update_results)
+        self.query_input.returnPressed.connect(self._choose_current)
+        self.results_list.itemActivated.connect(self._choose_current)
+        self.symbol_index.index_updated.connect(self._update_results)
+        self._update_results()
+
+    def eventFilter(self, obj, event) -> bool:
+        # Up/Down/PageUp/PageDown in the filter box move through the results.
+        if obj is self.query_input and isinstance(event, QKeyEvent) and event.type() == QKeyEvent.Type.KeyPress \
+                and event.key() in (Qt.Key.Key_Up, Qt.Key.Key_Down, Qt.Key.Key_PageUp, Qt.Key.Key_PageDown):
+            self.results_list.keyPressEvent(event)
+            return True
+        return super().eventFilter(obj, event)
+
+    def done(self, result: int):
+        self.symbol_index.index_updated.disconnect(self._update_results)
+        super().done(result)
+
+    def _update_results(self):
+        self._results = self.symbol_index.search(self.query_input.text())
+        self.results_list.clear()
+        for name, kind, container, path, line, _ in self._results:
+            location = f"{self._display_path(path)}:{line}"
+            item = QListWidgetItem(self._icons.get(kind, self._default_icon),
+                                   f"{name}    {container + '  ·  ' if container else ''}{location}")
+            item.setToolTip(f"{kind} {container + '.' if container else ''}{name}\n{path}:{line}")
+            self.results_list.addItem(item)
+        if self._results:
+            self.results_list.setCurrentRow(0)
+        indexing = " (indexing...)" if self.symbol_index.is_indexing() else ""
+        if not self.query_input.text().strip():
+            self.status_label.setText(f"Search the symbols of the open projects{indexing}")
+        else:
+            self.status_label.setText(f"{len(self._results) or 'No'} matches{indexing}")
+
+    def _display_path(self, path: str) -> str:
+        for root in self.project_roots:
+            if path.startswith(os.path.normpath(root) + os.sep):
+                return os.path.relpath(path, os.path.dirname(os.path.normpath(root)))
+        return path
+
+    def _choose_current(self, *_):
+        row = self.results_list.currentRow()
+        if 0 <= row < len(self._results):
+            _, _, _, path, line, col = self._results[row]
+            self.symbol_chosen.emit(path, line, col)
+            self.accept()